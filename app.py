@@ -1,26 +1,82 @@
+import time
+_import_started = time.perf_counter()
+
 from fastapi import FastAPI, Request
-import httpx
-from main import setup_models
-from config import TELEGRAM_BOT_TOKEN, UPLOAD_DIR_TG
-from langchain.chains import RetrievalQA
-from langchain.prompts import PromptTemplate
-from langchain.document_loaders import PyPDFLoader, Docx2txtLoader, TextLoader
+from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
+from main import models, setup_models
+from config import (
+    TELEGRAM_BOT_TOKEN, UPLOAD_DIR_TG, JOB_WORKERS, JOB_QUEUE_LIMIT,
+    JOB_QUEUE_PER_CHAT_LIMIT, JOB_QUEUE_DRAIN_TIMEOUT, TELEGRAM_API_BASE,
+    TELEGRAM_MAX_CONNECTIONS, TELEGRAM_TIMEOUT, TELEGRAM_MAX_RETRIES, MAX_UPLOAD_BYTES,
+    MODEL_WARMUP, STREAM_RESPONSES, STREAM_EDIT_INTERVAL,
+)
+from utils.executor import run_blocking, shutdown_executor
+from utils.job_queue import ChatJobQueue, REJECTED
+from utils.telegram_client import TelegramClient, FileTooLargeError
+from utils.telegram_stream import MessageStreamer, MAX_MESSAGE_LENGTH
+import asyncio
+import logging
 import os
-import tempfile
 import uuid
 from typing import List
 
-app = FastAPI()
-
-# Telegram bot token ve API URL
-TELEGRAM_API_URL = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}"
-
-# Modelleri ve retriever'ı kur
-retriever, chat_model = setup_models()
+startup_report = {}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await telegram.start()
+    job_queue.start()
+    startup_report["startup_seconds"] = round(time.perf_counter() - _import_started, 3)
+    logging.info(f"Uygulama {startup_report['startup_seconds']} sn'de hazır (modeller henüz yüklenmedi).")
+    if MODEL_WARMUP:
+        # Modeller arka planda yüklenir; bu sırada gelen mesajlar yüklemenin bitmesini bekler
+        app.state.warmup = asyncio.create_task(run_blocking(models.warm_up, ["qa_chain"]))
+        app.state.warmup.add_done_callback(
+            lambda _: logging.info(f"Model ısınması tamamlandı: {models.report()}")
+        )
+    yield
+    # Kuyruktaki cevapların gönderilmesine süre tanı
+    await job_queue.stop(timeout=JOB_QUEUE_DRAIN_TIMEOUT)
+    await telegram.close()
+    # Bekleyen senkron işlerin bitmesini bekle
+    shutdown_executor()
+
+app = FastAPI(lifespan=lifespan)
+
+# Tüm Telegram API trafiği için uygulama ömrü boyunca paylaşılan istemci
+telegram = TelegramClient(
+    TELEGRAM_BOT_TOKEN,
+    api_base=TELEGRAM_API_BASE,
+    max_connections=TELEGRAM_MAX_CONNECTIONS,
+    read_timeout=TELEGRAM_TIMEOUT,
+    max_retries=TELEGRAM_MAX_RETRIES,
+)
+
+def build_qa_chain():
+    """
+    Modelleri ve retriever'ı kurar, önünde cevap önbelleği olan RetrievalQA zincirini döndürür.
+    """
+    from chains.qa_chain import get_cached_qa_chain, OKAI_PROMPT_TEMPLATE
+
+    retriever, chat_model = setup_models()
+    return get_cached_qa_chain(retriever, chat_model, OKAI_PROMPT_TEMPLATE)
+
+# RetrievalQA zinciri ilk kullanımda (ya da ısınmada) bir kez kurulur, her mesajda yeniden kullanılır.
+# Önündeki cevap önbelleği tekrar eden soruları LLM'e gitmeden cevaplar.
+models.register("qa_chain", build_qa_chain)
+
+async def get_app_qa_chain():
+    if models.is_loaded("qa_chain"):
+        return models.get("qa_chain")
+    # İlk yükleme uzun sürer; event loop'u bloklamasın
+    return await run_blocking(models.get, "qa_chain")
 
 os.makedirs(UPLOAD_DIR_TG, exist_ok=True)
 
 def load_documents_from_file(file_path: str) -> List:
+    from langchain.document_loaders import PyPDFLoader, Docx2txtLoader, TextLoader
+
     _, ext = os.path.splitext(file_path)
     ext = ext.lower()
     
@@ -36,34 +92,27 @@ def load_documents_from_file(file_path: str) -> List:
     return loader.load()
 
 async def download_file(file_id: str, file_extension: str) -> str:
-      async with httpx.AsyncClient() as client:
-        response = await client.get(f"{TELEGRAM_API_URL}/getFile?file_id={file_id}")
-        response.raise_for_status()
-        file_path_tg = response.json()["result"]["file_path"]
-        
-        download_url = f"https://api.telegram.org/file/bot{TELEGRAM_BOT_TOKEN}/{file_path_tg}"    
-        response = await client.get(download_url)
-        response.raise_for_status()
-        
-        tempdir = tempfile.mkdtemp()
-        file_path = os.path.join(tempdir, f"{uuid.uuid4()}{file_extension}")
-        
-        with open(file_path, "wb") as file:
-            file.write(response.content)
-        return file_path
-        
-# Telegram webhook endpoint'i
-@app.post("/webhook")
-async def webhook(request: Request):
-    data = await request.json()
-    message = data.get("message", {})
-    chat_id = message.get("chat", {}).get("id")
+    """
+    Telegram dosyasını UPLOAD_DIR_TG altına parça parça indirir ve yolunu döndürür.
+    """
+    file_info = await telegram.get_file(file_id)
+    # getFile cevabındaki boyut, indirmeye başlamadan önce kontrol edilir
+    if file_info.get("file_size") and file_info["file_size"] > MAX_UPLOAD_BYTES:
+        raise FileTooLargeError(file_info["file_size"], MAX_UPLOAD_BYTES)
+
+    file_path = os.path.join(UPLOAD_DIR_TG, f"{uuid.uuid4()}{file_extension}")
+    await telegram.download_file(file_info["file_path"], file_path, max_bytes=MAX_UPLOAD_BYTES)
+    return file_path
+    
+async def process_message(message: dict):
+    """
+    Kuyruktan alınan bir Telegram mesajını işler ve cevabı sendMessage ile gönderir.
+    """
+    chat_id = message["chat"]["id"]
+    qa_chain = await get_app_qa_chain()
     text = message.get("text")
     document = message.get("document")
 
-    if not chat_id:
-        return {"status": "ok", "message": "Chat ID bulunamadı."}
-
     query = None  # Initialize query here
 
     if text:
@@ -73,64 +122,100 @@ async def webhook(request: Request):
         file_name = document.get("file_name", "unknown")
         file_extension = os.path.splitext(file_name)[1]
         
+        # Telegram mesajındaki boyut bilgisiyle büyük dosyalar hiç indirilmeden reddedilir
+        if document.get("file_size") and document["file_size"] > MAX_UPLOAD_BYTES:
+            await telegram.send_message(chat_id, str(FileTooLargeError(document["file_size"], MAX_UPLOAD_BYTES)))
+            return
+
         try:
             file_path = await download_file(file_id, file_extension)
-            documents = load_documents_from_file(file_path)
+            # PDF ayrıştırma ve embedding CPU yoğun; event loop'u bloklamasın
+            documents = await run_blocking(load_documents_from_file, file_path)
+            # Geçici dosya adı yerine Telegram'ın kalıcı dosya kimliği kaynak olarak kullanılır;
+            # aynı dosya tekrar gönderildiğinde indeksleyici onu tanır ve yeniden embed etmez.
+            for doc in documents:
+                doc.metadata["source"] = f"telegram/{document.get('file_unique_id', file_id)}"
+                doc.metadata["file_name"] = file_name
             
-            retriever.add_documents(documents)
+            # Önbellekteki cevaplar yeni dokümanı bilmediğinden qa_chain üzerinden eklenir
+            await run_blocking(qa_chain.add_documents, documents)
             query = "Sana gönderdiğim bu dosyayı incele sana bu dosya üzerinden sorular soracağım ve bu dosyayı göz önüne alarak cevap vermeni istiyorum."
         except Exception as e:
-            async with httpx.AsyncClient() as client:
-                await client.post(
-                    f"{TELEGRAM_API_URL}/sendMessage",
-                    json={"chat_id": chat_id, "text": f"Dosya yüklenirken bir hata oluştu: {e}"}
-                )
-                return {'status': "error", 'message': str(e)}
+            await telegram.send_message(chat_id, f"Dosya yüklenirken bir hata oluştu: {e}")
+            return
         finally:
             if 'file_path' in locals() and os.path.exists(file_path):
                 os.remove(file_path)
-                os.rmdir(os.path.dirname(file_path))
 
     # This check should be OUTSIDE the elif document block
     if query is None:  
-        async with httpx.AsyncClient() as client:
-            await client.post(
-                f"{TELEGRAM_API_URL}/sendMessage",
-                json={"chat_id": chat_id, "text": "Lütfen yazı ya da bir doküman gönderin."}
-            )
-        return {'status': "ok"}
-
-    # Sistem mesajını içeren bir prompt şablonu oluştur
-    prompt_template = """
-        Sen Ondokuz Mayıs Üniversitesi adına çalışan yardımcı bir sohbet robotusun. 
-        İsmin OkAI. Sana sorulan sorulara doğru, hızlı ve dostane bir şekilde cevap ver. 
-        Eğer doğru cevabı bilmiyorsan cevabı bilmediğini kullanıcıya bildir.
-    {context}
-
-    Soru: {question}
-    Cevap:"""
-
-    PROMPT = PromptTemplate(
-        template=prompt_template, input_variables=["context", "question"]
-    )
-
-    # RetrievalQA zincirini oluştururken, chain_type_kwargs ile prompt'u özelleştir.
-    qa_chain = RetrievalQA.from_chain_type(
-        llm=chat_model,
-        retriever=retriever,
-        return_source_documents=True,
-        chain_type_kwargs={"prompt": PROMPT},
-    )
-
-
-    # LLM'e soru sor ve cevabı kullanıcıya ilet.
-    response = qa_chain.invoke({"query": query})
-    response_text = response["result"]
-
-    # Telegram'a cevap gönder
-    async with httpx.AsyncClient() as client:
-        await client.post(
-            f"{TELEGRAM_API_URL}/sendMessage",
-            json={"chat_id": chat_id, "text": f"{response_text}\n{response['source_documents']}"}
-        )
+        await telegram.send_message(chat_id, "Lütfen yazı ya da bir doküman gönderin.")
+        return
+
+    if not STREAM_RESPONSES:
+        # LLM'e soru sor ve cevabı kullanıcıya ilet.
+        response = await qa_chain.ainvoke({"query": query})
+        await telegram.send_message(chat_id, format_response(response))
+        return
+
+    # Cevap token'lar geldikçe aynı mesaj düzenlenerek yazılır; son düzenleme kaynakları da ekler
+    streamer = MessageStreamer(telegram, chat_id, min_interval=STREAM_EDIT_INTERVAL)
+    try:
+        response = await qa_chain.ainvoke({"query": query}, config={"callbacks": [streamer.callback]})
+    except BaseException:
+        await streamer.cancel()
+        raise
+    await streamer.finish(format_response(response))
+
+def format_response(response):
+    text = f"{response['result']}\n{response['source_documents']}"
+    # Telegram MAX_MESSAGE_LENGTH karakterden uzun mesajları reddeder
+    return text[:MAX_MESSAGE_LENGTH]
+
+async def notify_failure(chat_id, message, error):
+    """
+    process_message hata verdiğinde (ör. LLM sağlayıcısı hatası) kullanıcıya kısa bir mesaj gönderir.
+    """
+    await telegram.send_message(chat_id, "Sorunuz cevaplanırken bir hata oluştu, lütfen daha sonra tekrar deneyin.")
+
+# Güncellemeler webhook'ta sıraya alınır, cevaplar arka plandaki worker'lardan gönderilir
+job_queue = ChatJobQueue(
+    process_message,
+    workers=JOB_WORKERS,
+    max_pending=JOB_QUEUE_LIMIT,
+    max_pending_per_chat=JOB_QUEUE_PER_CHAT_LIMIT,
+    on_error=notify_failure,
+)
+
+# Cevap önbelleği istatistikleri (isabet oranı, kazanılan süre)
+@app.get("/cache/stats")
+async def cache_stats():
+    if not models.is_loaded("qa_chain"):
+        return {"enabled": False, "loaded": False}
+    qa_chain = models.get("qa_chain")
+    if qa_chain.cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **qa_chain.cache.stats()}
+
+# Başlangıç süresi ve model başına yüklenme süreleri
+@app.get("/models/stats")
+async def model_stats():
+    return {**startup_report, "models": models.report()}
+
+# Telegram webhook endpoint'i
+@app.post("/webhook")
+async def webhook(request: Request):
+    data = await request.json()
+    message = data.get("message", {})
+    chat_id = message.get("chat", {}).get("id")
+
+    if not chat_id:
+        return {"status": "ok", "message": "Chat ID bulunamadı."}
+
+    # Telegram'a hemen cevap dön; yavaş webhook'lar Telegram tarafından yeniden denenir.
+    # Aynı update_id tekrar gelirse kuyruk onu yok sayar.
+    status = job_queue.submit(chat_id, message, update_id=data.get("update_id"))
+    if status == REJECTED:
+        # 503 ile Telegram güncellemeyi daha sonra tekrar gönderir
+        return JSONResponse(status_code=503, content={"status": "busy"})
     return {"status": "ok"}
\ No newline at end of file
@@ -0,0 +1,72 @@
+"""
+BM25 indeksinin kurulum süresini ve sorgu başı arama gecikmesini yapay bir
+yönetmelik korpusu üzerinde ölçer.
+
+Çalıştırma: python -m benchmarks.bm25_benchmark --chunks 20000
+"""
+import sys
+import os
+import argparse
+import random
+import statistics
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.documents import Document
+
+from retriever.hybrid import BM25Index
+
+WORDS = (
+    "öğrenci sınav bütünleme mazeret final vize ders kredi yarıyıl akademik takvim "
+    "yönetmelik senato fakülte bölüm danışman kayıt dondurma izin rapor not ortalama "
+    "mezuniyet staj yaz okulu devam zorunluluğu ilişik kesme itiraz harç burs diploma"
+).split()
+
+QUERIES = [
+    "Bütünleme sınavına kimler girebilir?",
+    "Mazeret sınavı için rapor gerekli mi?",
+    "Madde 12 ne diyor?",
+    "Yaz okulunda kaç ders alınabilir?",
+    "Kayıt dondurma şartları nelerdir?",
+]
+
+
+def make_corpus(chunks, seed=0):
+    rng = random.Random(seed)
+    corpus = {}
+    for i in range(chunks):
+        text = f"Madde {i % 200} - " + " ".join(rng.choice(WORDS) for _ in range(40))
+        corpus[f"chunk-{i}"] = Document(page_content=text)
+    return corpus
+
+
+def main(chunks, iterations):
+    corpus = make_corpus(chunks)
+    index = BM25Index()
+
+    start = time.perf_counter()
+    index.update(corpus, [])
+    index.search("ısınma")
+    build = time.perf_counter() - start
+
+    latencies = []
+    for i in range(iterations):
+        query = QUERIES[i % len(QUERIES)]
+        start = time.perf_counter()
+        index.search(query, k=20)
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    print(f"Parça sayısı   : {chunks}")
+    print(f"Kurulum        : {build:8.2f} s")
+    print(f"Arama p50      : {statistics.median(latencies) * 1e3:8.3f} ms")
+    print(f"Arama p99      : {latencies[int(0.99 * (len(latencies) - 1))] * 1e3:8.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args()
+    main(args.chunks, args.iterations)
@@ -0,0 +1,133 @@
+"""
+Eski thread havuzlu scraper (her görev bir bölüm, haberler sırayla requests.get ile)
+ile asenkron Crawler'ı (global frontier, host başına sınır) yerel sahte bölüm sitelerine
+karşı karşılaştırır. Her bölüm ayrı bir porttan (ayrı host) sunulur; --slow-latency ile
+bir bölüm yavaşlatılarak tek yavaş host'un toplam süreye etkisi görülebilir.
+MongoDB kaydı ölçüme dahil edilmez.
+
+Çalıştırma: python -m benchmarks.crawler_benchmark --departments 10 --pages 3 --articles 10
+"""
+import sys
+import os
+import argparse
+import asyncio
+import concurrent.futures
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import scraper.scraper as scraper
+from utils.crawler import Crawler
+
+ARTICLE_HTML = """<html><body><a href="/">Mühendislik Fakültesi</a>
+<h1 class="heading-title">Duyuru {slug}</h1>
+<div class="news-wrapper"><p class="meta text-muted">Yazar: Bölüm Sekreterliği | Tarih: 10 Ocak 2024</p>
+<p>Yaz okulu başvuruları {slug} tarihine kadar uzatılmıştır.</p></div></body></html>"""
+
+
+class StubDepartmentSite:
+    """Haber listesi ve haber sayfalarını sabit gecikmeyle sunan keep-alive HTTP/1.1 sunucusu."""
+
+    def __init__(self, articles_per_page, latency):
+        self.articles_per_page = articles_per_page
+        self.latency = latency
+        self.connections = 0
+        self.requests = 0
+        self.server = None
+
+    def body(self, path):
+        if path.startswith("/haberler/"):
+            page = path.rsplit(":", 1)[-1] if "page:" in path else "1"
+            return "".join(
+                f'<article class="news-item"><a href="/haber/{page}-{i}">Haber</a></article>'
+                for i in range(self.articles_per_page)
+            )
+        return ARTICLE_HTML.format(slug=path.rsplit("/", 1)[-1])
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                path = head.split(b" ", 2)[1].decode()
+                await asyncio.sleep(self.latency)
+                self.requests += 1
+                body = self.body(path).encode("utf-8")
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n"
+                    b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+
+def start_sites(departments, articles_per_page, latency, slow_latency):
+    """Siteleri ayrı bir thread'deki event loop'ta başlatır; bölüm -> adres ve siteleri döndürür."""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    sites, url_map = [], {}
+    for i in range(departments):
+        site = StubDepartmentSite(articles_per_page, slow_latency if i == 0 and slow_latency else latency)
+        port = asyncio.run_coroutine_threadsafe(site.start(), loop).result()
+        sites.append(site)
+        url_map[f"bolum-{i}"] = f"http://127.0.0.1:{port}"
+    return sites, url_map
+
+
+def run_threaded(url_map, pagination):
+    """Eski main: liste sayfaları ve haberler bölüm başına bir thread görevinde sırayla getirilir."""
+    num_threads = max(1, min(len(url_map), os.cpu_count() or 1) * 2)
+    list_urls = scraper.prepare_urls(url_map, pagination)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=num_threads) as executor:
+        page_urls = dict(zip(url_map, executor.map(lambda d: scraper.get_page_urls(d, list_urls[d]), url_map)))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=num_threads) as executor:
+        results = list(executor.map(lambda d: scraper.scrape_department(d, page_urls[d]), url_map))
+    return sum(len(pages) for pages in results)
+
+
+def run_async(url_map, pagination, per_host, delay):
+    crawler = Crawler(per_host_concurrency=per_host, delay=delay)
+    results = asyncio.run(scraper.crawl(url_map, pagination, crawler=crawler))
+    return sum(len(pages) for pages in results.values())
+
+
+def main(departments, pages, articles, latency, slow_latency, per_host, delay):
+    # Ölçüm yalnızca ağ ve ayrıştırma; kayıt sahte
+    scraper.save_page_content_to_db = lambda page_data: "sahte-id"
+
+    print(f"{departments} bölüm x {pages} liste sayfası x {articles} haber, istek gecikmesi {latency * 1000:.0f} ms"
+          + (f" (bir bölüm {slow_latency * 1000:.0f} ms)" if slow_latency else ""))
+    print(f"{'yöntem':<34}{'sayfa':>7}{'süre sn':>9}{'sayfa/sn':>10}{'bağlantı':>10}")
+    runs = [
+        ("Thread havuzu (bölüm başına görev)", lambda url_map: run_threaded(url_map, pages)),
+        (f"Crawler (host başına {per_host})", lambda url_map: run_async(url_map, pages, per_host, delay)),
+    ]
+    for name, run in runs:
+        sites, url_map = start_sites(departments, articles, latency, slow_latency)
+        scraper.url_list = url_map
+        start = time.perf_counter()
+        count = run(url_map)
+        elapsed = time.perf_counter() - start
+        connections = sum(site.connections for site in sites)
+        print(f"{name:<34}{count:>7}{elapsed:>9.2f}{count / elapsed:>10.1f}{connections:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--departments", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--articles", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--slow-latency", type=float, default=0.3)
+    parser.add_argument("--per-host", type=int, default=4)
+    parser.add_argument("--delay", type=float, default=0.0)
+    args = parser.parse_args()
+    main(args.departments, args.pages, args.articles, args.latency, args.slow_latency, args.per_host, args.delay)
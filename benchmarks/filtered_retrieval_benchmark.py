@@ -0,0 +1,103 @@
+"""
+Bölüm filtresiyle aramayı iki yolla karşılaştırır:
+- son filtre: tüm vektörler taranır, fazla aday alınıp filtreye uymayanlar atılır
+- ön filtre: metadata ikincil indeksiyle uygun satırlar seçilir, yalnızca onlar taranır
+
+Yapay külliyat scraper'daki 10 bölüme eşit dağıtılır; her sorgu bir bölümle sınırlanır.
+Gecikme ve son filtrede k sonucun dolmadığı sorgu oranı raporlanır.
+
+Çalıştırma: python -m benchmarks.filtered_retrieval_benchmark --vectors 50000
+"""
+import sys
+import os
+import argparse
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from benchmarks.quantized_store_benchmark import LookupEmbeddings, make_vectors
+from retriever.mmap_store import MmapVectorStore
+from retriever.quantized_store import QuantizedVectorStore
+
+K = 10
+
+# scraper.scraper.url_list anahtarları (modül içe aktarılınca log dosyası ve MongoDB bağlantısı kurar)
+DEPARTMENTS = [
+    "bilgisayar-muhendisligi",
+    "cevre-muhendisligi",
+    "elektrik-elektronik-muhendisligi",
+    "insaat-muhendisligi",
+    "endustri-muhendisligi",
+    "gida-muhendisligi",
+    "harita-muhendisligi",
+    "kimya-muhendisligi",
+    "makine-muhendisligi",
+    "metalurji-ve-malzeme-muhendisligi",
+]
+
+
+def measure(search, queries):
+    latencies = []
+    short = 0
+    for query, department in queries:
+        start = time.perf_counter()
+        found = search(query, department)
+        latencies.append(time.perf_counter() - start)
+        short += len(found) < K
+    latencies = np.array(latencies) * 1000
+    return np.percentile(latencies, 50), np.percentile(latencies, 95), short / len(queries)
+
+
+def main(n, dim, n_queries, overfetch):
+    vectors = make_vectors(n, dim)
+    ids = [str(i) for i in range(n)]
+    metadatas = [
+        {"department": DEPARTMENTS[i % len(DEPARTMENTS)], "date": f"20{18 + i % 7}-0{1 + i % 9}-01"}
+        for i in range(n)
+    ]
+    embedding = LookupEmbeddings(vectors)
+    rng = np.random.default_rng(1)
+    queries = [(int(q), DEPARTMENTS[rng.integers(len(DEPARTMENTS))]) for q in rng.integers(0, n, n_queries)]
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        stores = {
+            "mmap": MmapVectorStore(embedding, os.path.join(directory, "mmap"), auto_compact=False),
+            "int8": QuantizedVectorStore(embedding, os.path.join(directory, "int8"), quantization="int8"),
+        }
+        for name, store in stores.items():
+            for start in range(0, n, 5000):
+                store.add_texts(ids[start:start + 5000], metadatas[start:start + 5000], ids=ids[start:start + 5000])
+            if name == "mmap":
+                store.compact()
+
+            def post_filter(query, department):
+                found = store.similarity_search_by_vector(vectors[query], k=K * overfetch)
+                return [d for d in found if d.metadata["department"] == department][:K]
+
+            def pre_filter(query, department):
+                return store.similarity_search_by_vector(vectors[query], k=K, filter={"department": department})
+
+            # İlk çağrılar indeksi kurar ve sayfa önbelleğini ısıtır
+            for search in (post_filter, pre_filter):
+                search(*queries[0])
+            rows.append((f"{name} son filtre", *measure(post_filter, queries)))
+            rows.append((f"{name} ön filtre", *measure(pre_filter, queries)))
+
+    print(f"{n} vektör, {dim} boyut, {len(DEPARTMENTS)} bölüm, {n_queries} sorgu, k={K}")
+    print(f"{'yöntem':<20}{'p50 ms':>10}{'p95 ms':>10}{'eksik sonuç':>14}")
+    for name, p50, p95, short in rows:
+        print(f"{name:<20}{p50:>10.2f}{p95:>10.2f}{short:>14.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vectors", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--overfetch", type=int, default=3, help="son filtrede alınan aday çarpanı")
+    args = parser.parse_args()
+    main(args.vectors, args.dim, args.queries, args.overfetch)
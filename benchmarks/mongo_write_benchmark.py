@@ -0,0 +1,131 @@
+"""
+Eski kayıt yolunu (her haber için find_one_and_update, her sayfanın ekleri için ayrı bir
+bulk_write) write-behind BulkWriter ile karşılaştırır. Varsayılan olarak mongomock
+kullanılır ve her MongoDB isteğine --latency kadar ağ gecikmesi eklenir; --uri verilirse
+gerçek bir MongoDB'ye (benchmark_scraped_data veritabanı) yazılır. Haberler --threads
+worker thread'inden kaydedilir; sonuç doküman/sn olarak raporlanır.
+
+mongomock requirements-dev.txt ile kurulur.
+
+Çalıştırma: python -m benchmarks.mongo_write_benchmark --pages 500 --attachments 2 --latency 0.01
+"""
+import sys
+import os
+import argparse
+import concurrent.futures
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import mongomock
+import pymongo
+
+import tests.mongomock_compat  # noqa: F401  mongomock / pymongo bulk_write uyumu
+import scraper.scraper as scraper
+
+
+class LatencyCollection:
+    """Her isteğe sabit ağ gecikmesi ekleyen koleksiyon sarmalayıcısı."""
+
+    def __init__(self, collection, latency):
+        self.collection = collection
+        self.latency = latency
+
+    def __getattr__(self, name):
+        attribute = getattr(self.collection, name)
+        if not callable(attribute) or name not in ("find_one_and_update", "bulk_write", "find", "insert_one"):
+            return attribute
+
+        def call(*args, **kwargs):
+            time.sleep(self.latency)
+            return attribute(*args, **kwargs)
+
+        return call
+
+
+class LatencyDatabase:
+    def __init__(self, db, latency):
+        self.db = db
+        self.latency = latency
+
+    def __getitem__(self, name):
+        return LatencyCollection(self.db[name], self.latency)
+
+
+class LatencyClient:
+    def __init__(self, client, latency):
+        self.client = client
+        self.latency = latency
+
+    def __getitem__(self, name):
+        return LatencyDatabase(self.client[name], self.latency)
+
+
+def save_one_by_one(client, page, attachments):
+    """Önceki kayıt yolu: haber başına bir istek, ekleri için bir istek daha."""
+    db = client[scraper.MONGO_DB_NAME]
+    result = db['page_contents'].find_one_and_update(
+        {"url": page.url},
+        {"$set": {"title": page.title, "content": page.content, "url": page.url},
+         "$setOnInsert": {"user_id": None, "model_id": None}},
+        projection={"_id": True}, upsert=True, return_document=pymongo.ReturnDocument.AFTER,
+    )
+    page_id = str(result["_id"])
+    if attachments:
+        db[scraper.ATTACHMENTS_COLLECTION].bulk_write([
+            pymongo.UpdateOne({"page_content_id": page_id, "original_url": url},
+                              {"$set": {"page_content_id": page_id, "original_url": url}}, upsert=True)
+            for url in attachments
+        ], ordered=False)
+
+
+def save_buffered(client, page, attachments):
+    page_id = scraper.save_page_content_to_db(page)
+    scraper.save_attachments_to_db([{"page_content_id": page_id, "original_url": url} for url in attachments])
+
+
+def make_client(uri, latency):
+    if uri:
+        client = pymongo.MongoClient(uri)
+        client.drop_database(scraper.MONGO_DB_NAME)
+        return client
+    return LatencyClient(mongomock.MongoClient(), latency)
+
+
+def main(pages, attachments, latency, threads, uri):
+    if uri:
+        scraper.MONGO_DB_NAME = "benchmark_scraped_data"
+    items = [
+        (scraper.PageContent(title=f"Haber {i}", content="Yaz okulu duyurusu. " * 50, url=f"http://bil.omu.edu.tr/haber/{i}"),
+         [f"http://bil.omu.edu.tr/ek/{i}-{j}.pdf" for j in range(attachments)])
+        for i in range(pages)
+    ]
+    documents = pages * (1 + attachments)
+
+    print(f"{pages} haber x {attachments} ek, {threads} thread, "
+          + (f"MongoDB {uri}" if uri else f"mongomock + {latency * 1000:.1f} ms istek gecikmesi"))
+    print(f"{'yöntem':<28}{'doküman':>9}{'süre sn':>9}{'doküman/sn':>12}")
+    for name, save in [("Tek tek (istek/haber)", save_one_by_one),
+                       (f"BulkWriter (batch {scraper.MONGO_BULK_SIZE})", save_buffered)]:
+        client = make_client(uri, latency)
+        scraper.get_db_connection = lambda: client
+        start = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(lambda item: save(client, *item), items))
+        scraper.close_bulk_writer()
+        elapsed = time.perf_counter() - start
+        written = (client[scraper.MONGO_DB_NAME]['page_contents'].count_documents({})
+                   + client[scraper.MONGO_DB_NAME][scraper.ATTACHMENTS_COLLECTION].count_documents({}))
+        assert written == documents, f"{name}: {written} / {documents} doküman yazıldı"
+        print(f"{name:<28}{documents:>9}{elapsed:>9.2f}{documents / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--attachments", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--uri", default=None, help="Gerçek MongoDB bağlantı adresi (varsayılan: mongomock)")
+    args = parser.parse_args()
+    main(args.pages, args.attachments, args.latency, args.threads, args.uri)
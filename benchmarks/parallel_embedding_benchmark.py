@@ -0,0 +1,57 @@
+"""
+Toplu indekslemede kullanılan ParallelEmbeddings'in hızını (metin/sn) tek süreçli
+modelle karşılaştırır. Varsayılan olarak CPU maliyetini taklit eden sahte model
+kullanılır; --model verilirse (langchain_huggingface gerekir) gerçek HuggingFace
+modeli her süreçte yüklenir. Süreç başlatma ve model yükleme süresi ölçüme dahil
+edilmez; çıktıların tek süreçli modelle aynı sırada olduğu kontrol edilir.
+
+Çalıştırma: python -m benchmarks.parallel_embedding_benchmark --texts 2000 --workers 1 2 4
+"""
+import sys
+import os
+import argparse
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.stubs import cpu_bound_embeddings
+from embeddings.parallel_embedding import ParallelEmbeddings, _load_huggingface
+
+
+def main(n_texts, workers_list, batch_size, model_name):
+    factory = _load_huggingface if model_name else cpu_bound_embeddings
+    model_name = model_name or "cpu-bound-sahte"
+    texts = [f"Madde {i}: öğrenci yaz okulunda en fazla üç ders alabilir." for i in range(n_texts)]
+
+    single = factory(model_name)
+    start = time.perf_counter()
+    expected = single.embed_documents(texts)
+    rows = [("tek süreç", n_texts / (time.perf_counter() - start))]
+
+    for workers in workers_list:
+        model = ParallelEmbeddings(model_name, workers=workers, batch_size=batch_size, model_factory=factory)
+        try:
+            # Süreçler ve modeller ölçümden önce yüklenir
+            model.embed_documents(texts[:batch_size * workers])
+            start = time.perf_counter()
+            vectors = model.embed_documents(texts)
+            elapsed = time.perf_counter() - start
+        finally:
+            model.close()
+        assert vectors == expected, f"{workers} süreç: çıktı sırası tek süreçli modelle aynı değil"
+        rows.append((f"{workers} süreç", n_texts / elapsed))
+
+    print(f"{n_texts} metin, batch {batch_size}, model {model_name}")
+    print(f"{'yöntem':<14}{'metin/sn':>10}{'hızlanma':>10}")
+    for name, throughput in rows:
+        print(f"{name:<14}{throughput:>10.1f}{throughput / rows[0][1]:>9.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--model", default=None, help="HuggingFace model adı (varsayılan: sahte model)")
+    args = parser.parse_args()
+    main(args.texts, args.workers, args.batch_size, args.model)
@@ -0,0 +1,38 @@
+"""
+RetrievalQA zincirinin her istekte yeniden kurulması ile kayıt defterinden
+(chains.qa_chain.get_qa_chain) alınması arasındaki istek başı maliyeti ölçer.
+
+Çalıştırma: python -m benchmarks.qa_chain_benchmark
+"""
+import sys
+import os
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_community.llms.fake import FakeListLLM
+
+from benchmarks.stubs import StaticRetriever
+from chains.qa_chain import _build_qa_chain, get_qa_chain, OKAI_PROMPT_TEMPLATE
+
+
+def main(iterations=2000):
+    retriever = StaticRetriever()
+    chat_model = FakeListLLM(responses=["Cevap"])
+
+    rebuild = timeit.timeit(
+        lambda: _build_qa_chain(retriever, chat_model, OKAI_PROMPT_TEMPLATE),
+        number=iterations,
+    )
+    cached = timeit.timeit(
+        lambda: get_qa_chain(retriever, chat_model, OKAI_PROMPT_TEMPLATE),
+        number=iterations,
+    )
+
+    print(f"Her istekte kurulum : {rebuild / iterations * 1e6:10.1f} µs/istek")
+    print(f"Kayıt defterinden   : {cached / iterations * 1e6:10.1f} µs/istek")
+    print(f"Hızlanma            : {rebuild / cached:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Nicemlenmiş vektör deposunu (int8 / pq) tam float32 aramaya ve kuruluysa Chroma'ya
+karşı karşılaştırır: vektör başına bellek (RAM'de tutulan vektör verisi) ve disk boyutu,
+recall@k ve saniyedeki sorgu sayısı (QPS). Disk boyutu her depo için kalıcı dizinin
+toplam dosya boyutudur; Chroma'nın RAM kullanımı doğrudan ölçülemediği için "-" yazılır.
+
+Vektörler BERT çıktısına benzer boyutta (768) ve kümeli yapıda yapay olarak üretilir;
+doğru cevaplar tam (brute force) kosinüs aramasıyla bulunur.
+
+Çalıştırma: python -m benchmarks.quantized_store_benchmark --vectors 20000
+"""
+import sys
+import os
+import argparse
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from retriever.quantized_store import QuantizedVectorStore, _normalize
+
+
+class LookupEmbeddings(Embeddings):
+    """Metin olarak verilen satır numarasının önceden üretilmiş vektörünü döndürür."""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def embed_documents(self, texts):
+        return self.vectors[[int(text) for text in texts]].tolist()
+
+    def embed_query(self, text):
+        return self.vectors[int(text)].tolist()
+
+
+def make_vectors(n, dim, clusters=200, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, n)] + 0.6 * rng.normal(size=(n, dim)).astype(np.float32)
+    return _normalize(vectors)
+
+
+def directory_size(directory):
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(directory) for name in names
+    )
+
+
+def recall_at_k(found, truth):
+    return np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)])
+
+
+def measure(search, queries):
+    start = time.perf_counter()
+    found = [search(query) for query in queries]
+    return found, len(queries) / (time.perf_counter() - start)
+
+
+def main(n, dim, n_queries, k):
+    vectors = make_vectors(n, dim)
+    queries = _normalize(vectors[:n_queries] + 0.3 * np.random.default_rng(1).normal(size=(n_queries, dim)))
+    truth = [list(np.argsort(-(vectors @ query))[:k]) for query in queries]
+    ids = [str(i) for i in range(n)]
+    embedding = LookupEmbeddings(vectors)
+
+    rows = []
+
+    def exact_search(query):
+        scores = vectors @ query
+        top = np.argpartition(-scores, k - 1)[:k]
+        return list(top[np.argsort(-scores[top])])
+
+    found, qps = measure(exact_search, queries)
+    rows.append(("float32 (tam)", vectors.nbytes / n, vectors.nbytes / n, recall_at_k(found, truth), qps))
+
+    try:
+        from langchain_chroma import Chroma
+    except ImportError:
+        Chroma = None
+    if Chroma is not None:
+        with tempfile.TemporaryDirectory() as directory:
+            chroma = Chroma(persist_directory=directory, embedding_function=embedding)
+            for start in range(0, n, 5000):
+                chroma.add_texts(ids[start:start + 5000], ids=ids[start:start + 5000])
+            found, qps = measure(
+                lambda q: [int(doc.page_content) for doc in chroma.similarity_search_by_vector(q.tolist(), k=k)],
+                queries,
+            )
+            rows.append(("chroma", None, directory_size(directory) / n, recall_at_k(found, truth), qps))
+    else:
+        print("langchain_chroma kurulu değil; Chroma satırı atlandı.")
+
+    for quantization in ("int8", "pq"):
+        with tempfile.TemporaryDirectory() as directory:
+            store = QuantizedVectorStore(embedding, persist_directory=directory, quantization=quantization)
+            with store.bulk_load():
+                for start in range(0, n, 5000):
+                    store.add_texts(ids[start:start + 5000], ids=ids[start:start + 5000])
+            found, qps = measure(
+                lambda q: [int(doc.page_content) for doc in store.similarity_search_by_vector(q, k=k)],
+                queries,
+            )
+            rows.append((quantization, store.memory_usage() / n, directory_size(directory) / n,
+                         recall_at_k(found, truth), qps))
+
+    print(f"{n} vektör, {dim} boyut, {n_queries} sorgu, k={k}")
+    print(f"{'depo':<15}{'RAM bayt/vek.':>15}{'disk bayt/vek.':>16}{'recall@k':>10}{'QPS':>10}")
+    for name, ram_per_vector, disk_per_vector, recall, qps in rows:
+        ram = "-" if ram_per_vector is None else f"{ram_per_vector:.1f}"
+        print(f"{name:<15}{ram:>15}{disk_per_vector:>16.1f}{recall:>10.3f}{qps:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vectors", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+    main(args.vectors, args.dim, args.queries, args.k)
@@ -0,0 +1,70 @@
+"""
+Cevap akışının kullanıcının ilk kelimeleri görme süresine etkisini ölçer.
+Sahte chat modeli ilk token'ı gecikmeli, sonrakileri sabit aralıkla üretir; Telegram
+sahte bir transport ile karşılanır. Akış açık ve kapalıyken ilk görünen metnin ve
+tam cevabın ulaşma süresi ile gönderilen düzenleme sayısı yazdırılır.
+
+Çalıştırma: python -m benchmarks.streaming_benchmark --tokens 300 --token-latency 0.02
+"""
+import sys
+import os
+import argparse
+import asyncio
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+
+import main as main_module
+from benchmarks.stubs import StaticRetriever, StreamingFakeChatModel
+
+
+async def measure(app_module, stream):
+    app_module.STREAM_RESPONSES = stream
+    calls = []
+
+    def telegram_stub(request: httpx.Request):
+        calls.append((time.perf_counter(), request.url.path.rsplit("/", 1)[-1]))
+        return httpx.Response(200, json={"ok": True, "result": {"message_id": 1}})
+
+    app_module.telegram.transport = httpx.MockTransport(telegram_stub)
+    await app_module.telegram.start()
+    try:
+        start = time.perf_counter()
+        # Cevap önbelleğine düşmemek için her ölçümde farklı soru sorulur
+        question = f"Yaz okulu şartları nelerdir? ({'akış' if stream else 'tek mesaj'})"
+        await app_module.process_message({"chat": {"id": 1}, "text": question})
+        end = time.perf_counter()
+    finally:
+        await app_module.telegram.close()
+    first = calls[0][0] - start
+    edits = sum(1 for _, method in calls if method == "editMessageText")
+    return first, end - start, edits
+
+
+async def run(tokens, token_latency, first_token_latency, edit_interval):
+    llm = StreamingFakeChatModel(
+        tokens=tokens, token_latency=token_latency, first_token_latency=first_token_latency
+    )
+    main_module.setup_models = lambda: (StaticRetriever(), llm)
+    import app as app_module
+    app_module.STREAM_EDIT_INTERVAL = edit_interval
+    await app_module.get_app_qa_chain()
+
+    print(f"{tokens} token, ilk token {first_token_latency * 1000:.0f} ms, token başına {token_latency * 1000:.0f} ms, "
+          f"düzenleme aralığı {edit_interval * 1000:.0f} ms")
+    print(f"{'akış':<10}{'ilk metin ms':>14}{'tam cevap ms':>14}{'düzenleme':>11}")
+    for stream in (False, True):
+        first, total, edits = await measure(app_module, stream)
+        print(f"{'açık' if stream else 'kapalı':<10}{first * 1000:>14.0f}{total * 1000:>14.0f}{edits:>11}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=300)
+    parser.add_argument("--token-latency", type=float, default=0.02)
+    parser.add_argument("--first-token-latency", type=float, default=0.5)
+    parser.add_argument("--edit-interval", type=float, default=1.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.tokens, args.token_latency, args.first_token_latency, args.edit_interval))
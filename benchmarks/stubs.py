@@ -0,0 +1,111 @@
+"""
+Benchmark'larda gerçek model ve ağ maliyeti olmadan kullanılacak sahte bileşenler.
+"""
+import asyncio
+import time
+from typing import Any, List, Optional
+
+from langchain_core.documents import Document
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.language_models.llms import LLM
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.retrievers import BaseRetriever
+
+
+class StaticRetriever(BaseRetriever):
+    """Ağ ya da embedding maliyeti olmadan sabit belgeler döndüren retriever."""
+
+    def _get_relevant_documents(self, query, *, run_manager=None) -> List[Document]:
+        return [Document(page_content="Yaz okulu yönetmeliği madde 5.")]
+
+    def add_documents(self, documents, **kwargs):
+        return [str(i) for i, _ in enumerate(documents)]
+
+
+class SlowFakeLLM(LLM):
+    """Sabit bir gecikmeden sonra aynı cevabı döndüren sahte LLM."""
+
+    latency: float = 0.5
+    response: str = "Cevap"
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow-fake"
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> str:
+        time.sleep(self.latency)
+        return self.response
+
+    async def _acall(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> str:
+        await asyncio.sleep(self.latency)
+        return self.response
+
+
+class StreamingFakeChatModel(BaseChatModel):
+    """
+    streaming=True ile çalışan chat modeli gibi, ilk token gecikmesinden sonra token'ları
+    birer birer callback'lere bildiren sahte model.
+    """
+
+    first_token_latency: float = 0.5
+    token_latency: float = 0.02
+    tokens: int = 100
+
+    @property
+    def _llm_type(self) -> str:
+        return "streaming-fake"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.first_token_latency)
+        text = []
+        for i in range(self.tokens):
+            token = f"kelime{i} "
+            if run_manager:
+                run_manager.on_llm_new_token(token)
+            text.append(token)
+            time.sleep(self.token_latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="".join(text)))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.first_token_latency)
+        text = []
+        for i in range(self.tokens):
+            token = f"kelime{i} "
+            if run_manager:
+                await run_manager.on_llm_new_token(token)
+            text.append(token)
+            await asyncio.sleep(self.token_latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="".join(text)))])
+
+
+class CpuBoundEmbeddings:
+    """
+    Modelin CPU maliyetini saf Python döngüsüyle taklit eden sahte embedding modeli
+    (GIL'i bırakmaz; çok süreçli ölçeklenmeyi göstermek için).
+    """
+
+    def __init__(self, dim=32, work=2000):
+        self.dim = dim
+        self.work = work
+
+    def _embed(self, text):
+        seed = sum(map(ord, text))
+        vector = []
+        for i in range(self.dim):
+            value = seed + i
+            for _ in range(self.work // self.dim):
+                value = (value * 1103515245 + 12345) % 2147483648
+            vector.append(value / 2147483648)
+        return vector
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+def cpu_bound_embeddings(model_name):
+    # ParallelEmbeddings'in worker süreçleri için pickle edilebilir fabrika
+    return CpuBoundEmbeddings()
@@ -0,0 +1,131 @@
+"""
+Her cevap için yeni httpx.AsyncClient açmak ile paylaşılan TelegramClient
+kullanmayı yerel bir sahte Telegram sunucusuna karşı karşılaştırır.
+Cevap gecikmesini ve sunucuya açılan TCP bağlantı sayısını raporlar.
+
+--handshake-delay ile her yeni bağlantının ilk isteğine gecikme eklenerek
+gerçek TCP+TLS el sıkışmasının maliyeti taklit edilebilir.
+
+Çalıştırma: python -m benchmarks.telegram_client_benchmark --replies 500
+"""
+import sys
+import os
+import argparse
+import asyncio
+import statistics
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+
+from utils.telegram_client import TelegramClient
+
+RESPONSE_BODY = b'{"ok": true, "result": {}}'
+
+
+class StubTelegramServer:
+    """Keep-alive destekleyen, bağlantıları sayan minimal HTTP/1.1 sunucusu."""
+
+    def __init__(self, handshake_delay=0.0):
+        self.handshake_delay = handshake_delay
+        self.connections = 0
+        self.requests = 0
+        self.server = None
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        first_request = True
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                content_length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        content_length = int(line.split(b":", 1)[1])
+                if content_length:
+                    await reader.readexactly(content_length)
+                if first_request and self.handshake_delay:
+                    await asyncio.sleep(self.handshake_delay)
+                first_request = False
+                self.requests += 1
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: " + str(len(RESPONSE_BODY)).encode() + b"\r\n\r\n" + RESPONSE_BODY
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+async def measure(send, replies, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(chat_id):
+        async with semaphore:
+            start = time.perf_counter()
+            await send(chat_id)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(i) for i in range(replies)))
+    return latencies
+
+
+async def run(replies, concurrency, handshake_delay):
+    results = {}
+
+    # 1) Eski davranış: her cevap için yeni istemci (yeni bağlantı)
+    server = StubTelegramServer(handshake_delay)
+    port = await server.start()
+    api_url = f"http://127.0.0.1:{port}/bottest"
+
+    async def send_fresh(chat_id):
+        async with httpx.AsyncClient() as client:
+            response = await client.post(f"{api_url}/sendMessage", json={"chat_id": chat_id, "text": "Cevap"})
+            response.raise_for_status()
+
+    latencies = await measure(send_fresh, replies, concurrency)
+    results["Her cevapta yeni istemci"] = (latencies, server.connections)
+    await server.stop()
+
+    # 2) Paylaşılan, havuzlanmış istemci
+    server = StubTelegramServer(handshake_delay)
+    port = await server.start()
+    telegram = TelegramClient("test", api_base=f"http://127.0.0.1:{port}", max_connections=concurrency)
+    await telegram.start()
+
+    async def send_shared(chat_id):
+        await telegram.send_message(chat_id, "Cevap")
+
+    latencies = await measure(send_shared, replies, concurrency)
+    results["Paylaşılan TelegramClient"] = (latencies, server.connections)
+    await telegram.close()
+    await server.stop()
+
+    print(f"{replies} cevap, eşzamanlılık {concurrency}, el sıkışma gecikmesi {handshake_delay * 1000:.0f} ms")
+    for name, (latencies, connections) in results.items():
+        print(
+            f"{name:28s} ortalama {statistics.mean(latencies) * 1000:7.2f} ms | "
+            f"p99 {sorted(latencies)[int(len(latencies) * 0.99) - 1] * 1000:7.2f} ms | "
+            f"{connections:5d} bağlantı"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--replies", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--handshake-delay", type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.replies, args.concurrency, args.handshake_delay))
@@ -0,0 +1,86 @@
+"""
+/webhook için yük testi: sahte (gecikmeli) bir LLM ile N eşzamanlı sohbetin
+cevap gecikmesini (güncellemenin gönderilmesinden sendMessage çağrısına kadar)
+ölçer ve p50/p99 değerlerini yazdırır.
+
+Çalıştırma: python -m benchmarks.webhook_load_benchmark --chats 100
+"""
+import sys
+import os
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+
+import main as main_module
+from benchmarks.stubs import StaticRetriever, SlowFakeLLM
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def load_app(llm_latency):
+    """
+    Gerçek modeller yerine sahte retriever/LLM ile app modülünü içe aktarır.
+    """
+    main_module.setup_models = lambda: (StaticRetriever(), SlowFakeLLM(latency=llm_latency))
+    import app as app_module
+    return app_module
+
+
+async def run(chats, llm_latency):
+    app_module = load_app(llm_latency)
+    started = {}
+    latencies = []
+    all_answered = asyncio.Event()
+
+    def telegram_stub(request: httpx.Request):
+        # sendMessage çağrısı, o sohbetin cevabının ulaştığı an kabul edilir
+        if request.url.path.endswith("/sendMessage"):
+            chat_id = json.loads(request.content)["chat_id"]
+            latencies.append(time.perf_counter() - started[chat_id])
+            if len(latencies) == chats:
+                all_answered.set()
+        return httpx.Response(200, json={"ok": True, "result": {"message_id": 1}})
+
+    app_module.telegram.transport = httpx.MockTransport(telegram_stub)
+
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with app_module.app.router.lifespan_context(app_module.app):
+        # Modeller ilk kullanımda yüklenir; ölçüm ısınmış uygulama üzerinde yapılır
+        await app_module.get_app_qa_chain()
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            async def send(chat_id):
+                started[chat_id] = time.perf_counter()
+                update = {
+                    "update_id": chat_id,
+                    "message": {"chat": {"id": chat_id}, "text": "Yaz okulu şartları nelerdir?"},
+                }
+                await client.post("/webhook", json=update)
+
+            wall_start = time.perf_counter()
+            await asyncio.gather(*(send(chat_id) for chat_id in range(1, chats + 1)))
+            await asyncio.wait_for(all_answered.wait(), timeout=300)
+            wall = time.perf_counter() - wall_start
+
+    print(f"Sohbet sayısı : {chats} (LLM gecikmesi {llm_latency * 1000:.0f} ms)")
+    print(f"p50           : {percentile(latencies, 50) * 1000:8.1f} ms")
+    print(f"p99           : {percentile(latencies, 99) * 1000:8.1f} ms")
+    print(f"ortalama      : {statistics.mean(latencies) * 1000:8.1f} ms")
+    print(f"toplam süre   : {wall:8.2f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chats", type=int, default=100)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    args = parser.parse_args()
+    asyncio.run(run(args.chats, args.llm_latency))
@@ -0,0 +1,245 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.executor import run_blocking
+
+
+def normalize_query(query):
+    """
+    Tam eşleşme anahtarı için soruyu normalize eder (büyük/küçük harf, boşluk, noktalama).
+    """
+    query = query.replace("I", "ı").replace("İ", "i").lower()
+    query = re.sub(r"[^\w\s]", " ", query)
+    return " ".join(query.split())
+
+
+class _CacheEntry:
+    __slots__ = ("query", "response", "vector", "created_at", "latency")
+
+    def __init__(self, query, response, vector, latency):
+        self.query = query
+        self.response = response
+        self.vector = vector
+        self.created_at = time.monotonic()
+        self.latency = latency
+
+
+class AnswerCache:
+    """
+    RetrievalQA cevapları için tam eşleşme + anlamsal (embedding benzerliği) önbellek.
+
+    - Normalize edilmiş soru birebir eşleşirse cevap doğrudan döner.
+    - Aksi halde soru embedding'i, kayıtlı sorulardan birine kosinüs benzerliği
+      similarity_threshold üzerindeyse o cevap döner.
+    - Kayıtlar ttl saniye sonra geçersiz olur, max_size aşılınca en az kullanılan silinir (LRU).
+    - invalidate() ile (ör. korpus değiştiğinde) tüm kayıtlar silinir. DocumentIndexer'ın
+      listeners'ına eklenirse depoya yapılan her yazımda bu otomatik olarak yapılır (bkz. update).
+    """
+
+    def __init__(self, embedding_model=None, similarity_threshold=0.92, ttl=24 * 3600, max_size=1000):
+        self.embedding_model = embedding_model
+        self.similarity_threshold = similarity_threshold
+        self.ttl = ttl
+        self.max_size = max_size
+
+        self._entries = OrderedDict()  # normalize edilmiş soru -> _CacheEntry
+        self._matrix = None  # anlamsal arama için birim vektör matrisi (lazy)
+        self._matrix_keys = []
+        self._generation = 0
+        self._lock = threading.Lock()
+
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.latency_saved = 0.0
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def _embed(self, query):
+        if self.embedding_model is None:
+            return None
+        vector = np.asarray(self.embedding_model.embed_query(query), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _expired(self, entry, now):
+        return self.ttl is not None and now - entry.created_at > self.ttl
+
+    def _remove(self, key):
+        del self._entries[key]
+        self._matrix = None
+
+    def _semantic_lookup(self, vector, now):
+        if self._matrix is None:
+            keys = [key for key, entry in self._entries.items() if entry.vector is not None]
+            self._matrix_keys = keys
+            self._matrix = np.stack([self._entries[key].vector for key in keys]) if keys else None
+        if self._matrix is None:
+            return None
+
+        scores = self._matrix @ vector
+        # Süresi dolmuş ya da silinmiş kayıtlar en iyi eşleşme seçilmeden önce elenir
+        for index in np.argsort(-scores):
+            if scores[index] < self.similarity_threshold:
+                return None
+            key = self._matrix_keys[index]
+            entry = self._entries.get(key)
+            if entry is not None and not self._expired(entry, now):
+                return key
+        return None
+
+    def get(self, query):
+        """
+        Önbellekteki cevabı döndürür; yoksa None. Dönen ikinci değer, put() için
+        gereken bağlamdır (embedding ve önbellek nesli).
+        """
+        key = normalize_query(query)
+        now = time.monotonic()
+        with self._lock:
+            generation = self._generation
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry, now):
+                self._remove(key)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                self.latency_saved += entry.latency
+                return entry.response, None
+
+        # Embedding hesaplaması kilit dışında yapılır
+        vector = self._embed(query)
+        if vector is None:
+            with self._lock:
+                self.misses += 1
+            return None, (key, None, generation)
+
+        with self._lock:
+            if generation == self._generation:
+                match = self._semantic_lookup(vector, now)
+                if match is not None:
+                    entry = self._entries[match]
+                    self._entries.move_to_end(match)
+                    self.semantic_hits += 1
+                    self.latency_saved += entry.latency
+                    return entry.response, None
+            self.misses += 1
+        return None, (key, vector, generation)
+
+    def put(self, context, response, latency=0.0):
+        """
+        get() tarafından dönen bağlam ile cevabı önbelleğe ekler. Arada invalidate()
+        çağrıldıysa (korpus değiştiyse) cevap eskimiş sayılır ve eklenmez.
+        """
+        key, vector, generation = context
+        with self._lock:
+            if generation != self._generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _CacheEntry(key, response, vector, latency)
+            self._matrix = None
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        """
+        Tüm kayıtları siler; korpus her değiştiğinde çağrılmalıdır.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+            self._matrix_keys = []
+            self._generation += 1
+
+    def update(self, added, deleted):
+        """
+        DocumentIndexer dinleyicisi: depoya parça eklenip silindiğinde önbelleği geçersiz kılar.
+        """
+        if added or deleted:
+            self.invalidate()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.exact_hits + self.semantic_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": (self.exact_hits + self.semantic_hits) / lookups if lookups else 0.0,
+                "latency_saved_seconds": round(self.latency_saved, 3),
+            }
+
+
+class CachedQAChain:
+    """
+    RetrievalQA zincirinin önüne AnswerCache koyar. indexer verilirse önbellek onun
+    dinleyicisi olur; belgeler hangi yoldan eklenirse eklensin (retriever.add_documents,
+    indexer.index) önbellek temizlenir. Indexer'ı olmayan retriever'larda bu yalnızca
+    bu sınıfın add_documents metoduyla olur. cache None ise istekler doğrudan zincire iletilir.
+    """
+
+    def __init__(self, chain, retriever, cache, indexer=None):
+        self.chain = chain
+        self.retriever = retriever
+        self.cache = cache
+        if cache is not None and indexer is not None and cache not in indexer.listeners:
+            indexer.listeners.append(cache)
+
+    @staticmethod
+    def _copy(response, query):
+        # Çağıranlar cevabı değiştirebilir (ör. evaluate_responses), önbellekteki kopya korunur
+        response = dict(response)
+        response["query"] = query
+        return response
+
+    @staticmethod
+    def _config(config):
+        return {} if config is None else {"config": config}
+
+    def invoke(self, inputs, config=None):
+        if self.cache is None:
+            return self.chain.invoke(inputs, **self._config(config))
+        query = inputs["query"]
+        cached, context = self.cache.get(query)
+        if cached is not None:
+            return self._copy(cached, query)
+
+        start = time.perf_counter()
+        response = self.chain.invoke(inputs, **self._config(config))
+        self.cache.put(context, self._copy(response, query), time.perf_counter() - start)
+        return response
+
+    async def ainvoke(self, inputs, config=None):
+        """
+        config zincire iletilir (ör. token akışı için callbacks); önbellekten dönen
+        cevaplarda LLM çağrılmadığı için callback'ler çalışmaz.
+        """
+        if self.cache is None:
+            return await self.chain.ainvoke(inputs, **self._config(config))
+        query = inputs["query"]
+        # Soru embedding'i CPU yoğun olabilir, event loop dışında hesaplanır
+        cached, context = await run_blocking(self.cache.get, query)
+        if cached is not None:
+            return self._copy(cached, query)
+
+        start = time.perf_counter()
+        response = await self.chain.ainvoke(inputs, **self._config(config))
+        self.cache.put(context, self._copy(response, query), time.perf_counter() - start)
+        return response
+
+    def add_documents(self, documents, **kwargs):
+        """
+        Belgeleri retriever'a ekler ve önbelleği geçersiz kılar.
+        """
+        ids = self.retriever.add_documents(documents, **kwargs)
+        if self.cache is not None:
+            self.cache.invalidate()
+        return ids
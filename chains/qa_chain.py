@@ -0,0 +1,95 @@
+from langchain.chains import RetrievalQA
+from langchain.prompts import PromptTemplate
+import threading
+
+from chains.answer_cache import AnswerCache, CachedQAChain
+from config import (
+    ANSWER_CACHE_ENABLED, ANSWER_CACHE_SIMILARITY, ANSWER_CACHE_TTL, ANSWER_CACHE_MAX_SIZE,
+)
+from retriever.indexing import find_indexer
+
+# Sistem mesajını içeren prompt şablonu (Telegram botu bunu kullanır)
+OKAI_PROMPT_TEMPLATE = """
+        Sen Ondokuz Mayıs Üniversitesi adına çalışan yardımcı bir sohbet robotusun.
+        İsmin OkAI. Sana sorulan sorulara doğru, hızlı ve dostane bir şekilde cevap ver.
+        Eğer doğru cevabı bilmiyorsan cevabı bilmediğini kullanıcıya bildir.
+    {context}
+
+    Soru: {question}
+    Cevap:"""
+
+# (id(retriever), id(chat_model), prompt_template) -> (retriever, chat_model, qa_chain)
+# Nesnelerin kendisi de saklanır; böylece id'ler zincir kayıtlıyken yeniden kullanılamaz.
+_qa_chains = {}
+_cached_qa_chains = {}
+_qa_chains_lock = threading.Lock()
+
+
+def _build_qa_chain(retriever, chat_model, prompt_template):
+    chain_type_kwargs = {}
+    if prompt_template is not None:
+        chain_type_kwargs["prompt"] = PromptTemplate(
+            template=prompt_template, input_variables=["context", "question"]
+        )
+
+    return RetrievalQA.from_chain_type(
+        llm=chat_model,
+        retriever=retriever,
+        return_source_documents=True,
+        chain_type_kwargs=chain_type_kwargs,
+    )
+
+
+def get_qa_chain(retriever, chat_model, prompt_template=None):
+    """
+    (retriever, chat modeli, prompt) üçlüsü için RetrievalQA zincirini bir kez kurar.
+    Sonraki çağrılar aynı zinciri döndürür. prompt_template None ise
+    LangChain'in varsayılan "stuff" prompt'u kullanılır.
+    """
+    key = (id(retriever), id(chat_model), prompt_template)
+    entry = _qa_chains.get(key)
+    if entry is None:
+        with _qa_chains_lock:
+            entry = _qa_chains.get(key)
+            if entry is None:
+                chain = _build_qa_chain(retriever, chat_model, prompt_template)
+                entry = (retriever, chat_model, chain)
+                _qa_chains[key] = entry
+    return entry[2]
+
+
+def get_cached_qa_chain(retriever, chat_model, prompt_template=None):
+    """
+    get_qa_chain ile aynı zinciri, önünde cevap önbelleği (AnswerCache) ile döndürür.
+    Anlamsal eşleşme için retriever'ın vektör deposundaki embedding modeli kullanılır.
+    ANSWER_CACHE_ENABLED kapalıysa önbellek devre dışıdır.
+    """
+    chain = get_qa_chain(retriever, chat_model, prompt_template)
+    key = (id(retriever), id(chat_model), prompt_template)
+    cached_chain = _cached_qa_chains.get(key)
+    if cached_chain is None:
+        with _qa_chains_lock:
+            cached_chain = _cached_qa_chains.get(key)
+            if cached_chain is None:
+                cache = None
+                if ANSWER_CACHE_ENABLED:
+                    vectorstore = getattr(retriever, "vectorstore", None)
+                    cache = AnswerCache(
+                        embedding_model=getattr(vectorstore, "embeddings", None),
+                        similarity_threshold=ANSWER_CACHE_SIMILARITY,
+                        ttl=ANSWER_CACHE_TTL,
+                        max_size=ANSWER_CACHE_MAX_SIZE,
+                    )
+                # Önbellek, retriever'ın indeksine yapılan her yazımda temizlenir
+                cached_chain = CachedQAChain(chain, retriever, cache, indexer=find_indexer(retriever))
+                _cached_qa_chains[key] = cached_chain
+    return cached_chain
+
+
+def clear_qa_chains():
+    """
+    Kayıtlı tüm zincirleri siler (ör. retriever ya da model değiştirildiğinde).
+    """
+    with _qa_chains_lock:
+        _qa_chains.clear()
+        _cached_qa_chains.clear()
@@ -1,5 +1,5 @@
 from langchain_anthropic import ChatAnthropic
-from config import ANTHROPIC_API_KEY
+from config import ANTHROPIC_API_KEY, STREAM_RESPONSES
 
 def get_chat_model():
-    return ChatAnthropic(model="claude-2", anthropic_api_key=ANTHROPIC_API_KEY)
+    return ChatAnthropic(model="claude-2", anthropic_api_key=ANTHROPIC_API_KEY, streaming=STREAM_RESPONSES)
@@ -1,10 +1,14 @@
 from langchain_openai import ChatOpenAI
-from config import DEEPSEEK_API_KEY
+from config import DEEPSEEK_API_KEY, STREAM_RESPONSES
 
 def get_chat_model():
   return ChatOpenAI(
     model='deepseek-chat', 
     openai_api_key=DEEPSEEK_API_KEY, 
     openai_api_base='https://api.deepseek.com',
-    max_tokens=1024
+    max_tokens=1024,
+    # Token'lar callback'lere geldikçe iletilir (Telegram'da kademeli cevap)
+    streaming=STREAM_RESPONSES,
+    # Akışta da son parçada token kullanımı gelsin (değerlendirme raporu, UsageCallback)
+    stream_usage=True,
   )  
\ No newline at end of file
@@ -1,8 +1,9 @@
 from config import HUGGINGFACE_API_KEY
 from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint, HuggingFacePipeline
-from transformers import AutoTokenizer, AutoModelForCausalLM
+from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline
 
 def get_chat_model():
+        # Model her çağrıda yeniden yüklenir; main.models üzerinden tek sefer oluşturulmalıdır.
         model_name = "Nexusflow/Athene-V2-Chat"
         tokenizer = AutoTokenizer.from_pretrained(model_name)
         model = AutoModelForCausalLM.from_pretrained(model_name)
@@ -1,5 +1,6 @@
 from langchain_openai import ChatOpenAI
-from config import OPENAI_API_KEY
+from config import OPENAI_API_KEY, STREAM_RESPONSES
 
 def get_chat_model():
-    return ChatOpenAI(model="gpt-4", openai_api_key=OPENAI_API_KEY)
+    # stream_usage: akışta da token kullanımı döner (değerlendirme raporu, UsageCallback)
+    return ChatOpenAI(model="gpt-4", openai_api_key=OPENAI_API_KEY, streaming=STREAM_RESPONSES, stream_usage=True)
@@ -0,0 +1,434 @@
+import asyncio
+import concurrent.futures
+import importlib
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, List, Optional
+
+import numpy as np
+from langchain_core.callbacks import AsyncCallbackHandler, BaseCallbackHandler
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+
+from config import (
+    CHAT_PROVIDERS, CHAT_TIMEOUT, CHAT_HEDGE_PERCENTILE, CHAT_HEDGE_MIN_SAMPLES,
+    CHAT_BREAKER_FAILURES, CHAT_BREAKER_RESET,
+)
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+# Senkron yolda sağlayıcı çağrılarının çalıştığı thread sayısı; zaman aşımına uğrayan
+# çağrılar arka planda biter, sonuçları kullanılmaz
+SYNC_WORKERS = 16
+
+_sync_executor = None
+_sync_executor_lock = threading.Lock()
+
+
+def _get_sync_executor():
+    global _sync_executor
+    if _sync_executor is None:
+        with _sync_executor_lock:
+            if _sync_executor is None:
+                _sync_executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=SYNC_WORKERS, thread_name_prefix="ChatRouter"
+                )
+    return _sync_executor
+
+
+class CircuitBreaker:
+    """
+    Art arda failure_threshold hata alan sağlayıcıyı reset_timeout saniye devre dışı bırakır.
+    Süre dolunca tek bir deneme isteğine izin verilir (half-open); başarılıysa devre kapanır,
+    başarısızsa yeniden açılır.
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Deneme isteği; sonucu gelene kadar başka istek geçmez
+                self.state = HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+
+    def release(self):
+        # Deneme isteği sonuçlanmadan iptal edildiyse (ör. hedge kaybetti) sıradaki istek tekrar denesin
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.state = OPEN
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """
+    Sağlayıcının son window isteğindeki ilk cevap sürelerini (ilk token ya da tam cevap) tutar.
+    """
+
+    def __init__(self, window=200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._samples)
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p):
+        with self._lock:
+            if not self._samples:
+                return None
+            return float(np.percentile(self._samples, p))
+
+
+class _Race:
+    """Tek bir istekte hangi sağlayıcının token'larının kullanıcıya iletildiğini tutar."""
+
+    def __init__(self, on_token):
+        self.on_token = on_token
+        self.owner = None
+        self.first_token = {}
+        # Senkron yolda token'lar sağlayıcıların thread'lerinden gelir
+        self.lock = threading.Lock()
+
+
+class _TokenForwarder(AsyncCallbackHandler):
+    """
+    Sağlayıcının token'larını yönlendiricinin callback'lerine iletir. Paralel (hedge)
+    isteklerde yalnızca ilk token'ı üreten sağlayıcının token'ları iletilir.
+    """
+
+    run_inline = True
+
+    def __init__(self, race, name):
+        self.race = race
+        self.name = name
+
+    async def on_llm_new_token(self, token, **kwargs):
+        self.race.first_token.setdefault(self.name, time.monotonic())
+        if self.race.owner is None:
+            self.race.owner = self.name
+        if self.race.owner == self.name and self.race.on_token is not None:
+            await self.race.on_token(token)
+
+
+class _SyncTokenForwarder(BaseCallbackHandler):
+    """
+    _TokenForwarder'ın senkron yoldaki karşılığı; sağlayıcıların thread'lerinden çağrılır.
+    """
+
+    def __init__(self, race, name):
+        self.race = race
+        self.name = name
+
+    def on_llm_new_token(self, token, **kwargs):
+        with self.race.lock:
+            self.race.first_token.setdefault(self.name, time.monotonic())
+            if self.race.owner is None:
+                self.race.owner = self.name
+            forward = self.race.owner == self.name and self.race.on_token is not None
+        if forward:
+            self.race.on_token(token)
+
+
+class RoutingChatModel(BaseChatModel):
+    """
+    Birden fazla chat modeli arasında yönlendirme yapan chat modeli.
+
+    - Sağlayıcılar sırayla denenir; hata ya da timeout'ta sıradakine geçilir (fallback).
+    - Birincil istek, sağlayıcının ilk cevap süresinin hedge_percentile yüzdeliğini aştığı
+      halde token üretmediyse sıradaki sağlayıcıya ikinci bir istek gönderilir (hedge);
+      ilk başarılı cevap kullanılır, diğeri iptal edilir.
+    - Her sağlayıcının devre kesicisi vardır; açık devreli sağlayıcılar atlanır
+      (hepsi açıksa birincil sağlayıcı denenir).
+    - Senkron çağrılarda (invoke) sağlayıcıların senkron invoke'u thread'lerde aynı
+      timeout, hedge, fallback ve devre kesici kurallarıyla çağrılır; async istemciler
+      farklı event loop'lar arasında paylaşılmaz.
+    """
+
+    providers: List[Any]
+    names: List[str]
+    timeout: float = 30.0
+    hedge_percentile: Optional[float] = 95.0
+    hedge_min_samples: int = 20
+    failure_threshold: int = 3
+    reset_timeout: float = 30.0
+    # Bağlam paketleyicinin token bütçesi birincil modelin adına göre seçilir
+    model_name: Optional[str] = None
+
+    _breakers: dict = PrivateAttr(default_factory=dict)
+    _latencies: dict = PrivateAttr(default_factory=dict)
+    _counters: dict = PrivateAttr(default_factory=dict)
+
+    def model_post_init(self, __context: Any) -> None:
+        for name in self.names:
+            self._breakers[name] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            self._latencies[name] = LatencyTracker()
+            self._counters[name] = {"calls": 0, "failures": 0, "timeouts": 0, "hedges": 0, "wins": 0}
+        if self.model_name is None and self.providers:
+            primary = self.providers[0]
+            self.model_name = getattr(primary, "model_name", None) or getattr(primary, "model", None)
+
+    @property
+    def _llm_type(self) -> str:
+        return "routing"
+
+    def _hedge_delay(self, name):
+        if not self.hedge_percentile or len(self._latencies[name]) < self.hedge_min_samples:
+            return None
+        return self._latencies[name].percentile(self.hedge_percentile)
+
+    def _record_failure(self, name, error):
+        self._breakers[name].record_failure()
+        self._counters[name]["failures"] += 1
+        if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+            self._counters[name]["timeouts"] += 1
+
+    def _record_success(self, name, start, race, output):
+        self._breakers[name].record_success()
+        self._latencies[name].record(race.first_token.get(name, time.monotonic()) - start)
+        # Düz LLM'ler (Ollama, HuggingFacePipeline) metin döndürür
+        return output if isinstance(output, BaseMessage) else AIMessage(content=output)
+
+    async def _call(self, index, messages, stop, race):
+        name = self.names[index]
+        self._counters[name]["calls"] += 1
+        start = time.monotonic()
+        try:
+            output = await asyncio.wait_for(
+                self.providers[index].ainvoke(
+                    messages, stop=stop, config={"callbacks": [_TokenForwarder(race, name)]}
+                ),
+                timeout=self.timeout,
+            )
+        except asyncio.CancelledError:
+            self._breakers[name].release()
+            raise
+        except Exception as e:
+            self._record_failure(name, e)
+            raise
+        return self._record_success(name, start, race, output)
+
+    async def _route(self, messages, stop, on_token):
+        race = _Race(on_token)
+        candidates = deque(range(len(self.names)))
+        in_flight = {}
+        hedged = False
+        last_error = None
+
+        def start(index):
+            in_flight[asyncio.ensure_future(self._call(index, messages, stop, race))] = index
+
+        def launch():
+            # Devresi açık sağlayıcılar atlanır
+            while candidates:
+                index = candidates.popleft()
+                if self._breakers[self.names[index]].allow():
+                    start(index)
+                    return True
+            return False
+
+        if not launch():
+            # Tüm devreler açık: hiç denememektense birincil sağlayıcı denenir
+            start(0)
+        try:
+            while in_flight:
+                wait = None
+                if not hedged and candidates and len(in_flight) == 1 and race.owner is None:
+                    wait = self._hedge_delay(self.names[next(iter(in_flight.values()))])
+                done, _ = await asyncio.wait(in_flight, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    # Birincil istek yüzdelik süresini aştı ve henüz token üretmedi
+                    hedged = True
+                    primary = self.names[next(iter(in_flight.values()))]
+                    if launch():
+                        self._counters[primary]["hedges"] += 1
+                        logger.info(f"{primary} yavaş, {self.names[list(in_flight.values())[-1]]} sağlayıcısına hedge isteği gönderildi.")
+                    continue
+
+                for task in done:
+                    index = in_flight.pop(task)
+                    if task.exception() is None:
+                        self._counters[self.names[index]]["wins"] += 1
+                        return task.result()
+                    last_error = task.exception()
+                    logger.warning(f"{self.names[index]} sağlayıcısı başarısız: {last_error!r}")
+                if not in_flight:
+                    launch()
+        finally:
+            for task in in_flight:
+                task.cancel()
+        raise last_error
+
+    async def _agenerate(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any
+    ) -> ChatResult:
+        on_token = run_manager.on_llm_new_token if run_manager else None
+        message = await self._route(messages, stop, on_token)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _route_sync(self, messages, stop, on_token):
+        """
+        _route'un senkron karşılığı: her istek sağlayıcının senkron invoke'uyla bir thread'de
+        çalışır; timeout'a uğrayan istek beklenmez, başarısız sayılır.
+        """
+        race = _Race(on_token)
+        candidates = deque(range(len(self.names)))
+        in_flight = {}  # future -> (sağlayıcı sırası, başlangıç zamanı)
+        hedged = False
+        last_error = None
+
+        def start(index):
+            name = self.names[index]
+            self._counters[name]["calls"] += 1
+            future = _get_sync_executor().submit(
+                self.providers[index].invoke,
+                messages, stop=stop, config={"callbacks": [_SyncTokenForwarder(race, name)]},
+            )
+            in_flight[future] = (index, time.monotonic())
+
+        def launch():
+            # Devresi açık sağlayıcılar atlanır
+            while candidates:
+                index = candidates.popleft()
+                if self._breakers[self.names[index]].allow():
+                    start(index)
+                    return True
+            return False
+
+        if not launch():
+            # Tüm devreler açık: hiç denememektense birincil sağlayıcı denenir
+            start(0)
+        while in_flight:
+            now = time.monotonic()
+            wait = max(0.0, min(started for _, started in in_flight.values()) + self.timeout - now)
+            hedge_at = None
+            if not hedged and candidates and len(in_flight) == 1 and race.owner is None:
+                index, started = next(iter(in_flight.values()))
+                delay = self._hedge_delay(self.names[index])
+                if delay is not None:
+                    hedge_at = started + delay
+                    wait = min(wait, max(0.0, hedge_at - now))
+            done, _ = concurrent.futures.wait(in_flight, timeout=wait, return_when=concurrent.futures.FIRST_COMPLETED)
+
+            for future in done:
+                index, started = in_flight.pop(future)
+                name = self.names[index]
+                try:
+                    message = self._record_success(name, started, race, future.result())
+                except Exception as e:
+                    self._record_failure(name, e)
+                    last_error = e
+                    logger.warning(f"{name} sağlayıcısı başarısız: {e!r}")
+                    continue
+                self._counters[name]["wins"] += 1
+                for other, (other_index, _) in in_flight.items():
+                    # Kaybeden istek arka planda biter, sonucu kullanılmaz
+                    other.cancel()
+                    self._breakers[self.names[other_index]].release()
+                return message
+
+            now = time.monotonic()
+            for future, (index, started) in list(in_flight.items()):
+                if now - started >= self.timeout:
+                    del in_flight[future]
+                    future.cancel()
+                    name = self.names[index]
+                    last_error = TimeoutError(f"{name} {self.timeout} sn içinde cevap vermedi")
+                    self._record_failure(name, last_error)
+                    logger.warning(f"{name} sağlayıcısı başarısız: {last_error!r}")
+
+            if hedge_at is not None and in_flight and now >= hedge_at and race.owner is None:
+                # Birincil istek yüzdelik süresini aştı ve henüz token üretmedi
+                hedged = True
+                primary = self.names[next(iter(in_flight.values()))[0]]
+                if launch():
+                    self._counters[primary]["hedges"] += 1
+                    logger.info(f"{primary} yavaş, {self.names[list(in_flight.values())[-1][0]]} sağlayıcısına hedge isteği gönderildi.")
+            if not in_flight:
+                launch()
+        raise last_error
+
+    def _generate(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any
+    ) -> ChatResult:
+        # Senkron çağrılar (ör. main.py değerlendirmesi, executor thread'lerindeki soru genişletme)
+        # event loop açmadan sağlayıcıların senkron istemcileriyle yönlendirilir
+        on_token = run_manager.on_llm_new_token if run_manager else None
+        message = self._route_sync(messages, stop, on_token)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def stats(self):
+        """
+        Sağlayıcı başına devre durumu, istek sayaçları ve ilk cevap süresi yüzdelikleri.
+        """
+        report = {}
+        for name in self.names:
+            latencies = self._latencies[name]
+            report[name] = {
+                "state": self._breakers[name].state,
+                **self._counters[name],
+                "p50": latencies.percentile(50),
+                "p95": latencies.percentile(95),
+            }
+        return report
+
+
+def _import_provider(name):
+    return importlib.import_module(f"chat_models.{name}_chat").get_chat_model()
+
+
+def get_chat_model(names=None, load=None):
+    """
+    CHAT_PROVIDERS sırasındaki sağlayıcılardan (chat_models.<ad>_chat) RoutingChatModel kurar.
+    load(ad) sağlayıcıyı döndürür; uygulamada ModelRegistry üzerinden verilir ki her
+    sağlayıcı süreçte bir kez oluşturulsun (bkz. main.py). Verilmezse modül doğrudan import edilir.
+    Oluşturulamayan sağlayıcılar (eksik paket ya da anahtar) uyarıyla atlanır.
+    """
+    load = load or _import_provider
+    providers, loaded = [], []
+    for name in names or CHAT_PROVIDERS:
+        try:
+            providers.append(load(name))
+            loaded.append(name)
+        except Exception as e:
+            logger.warning(f"{name} sohbet modeli yüklenemedi, yönlendirmeye eklenmedi: {e!r}")
+    if not providers:
+        raise RuntimeError(f"Hiçbir sohbet modeli yüklenemedi: {names or CHAT_PROVIDERS}")
+    return RoutingChatModel(
+        providers=providers,
+        names=loaded,
+        timeout=CHAT_TIMEOUT,
+        hedge_percentile=CHAT_HEDGE_PERCENTILE or None,
+        hedge_min_samples=CHAT_HEDGE_MIN_SAMPLES,
+        failure_threshold=CHAT_BREAKER_FAILURES,
+        reset_timeout=CHAT_BREAKER_RESET,
+    )
@@ -1,3 +1,4 @@
+import json
 import os
 from dotenv import load_dotenv
 
@@ -12,4 +13,155 @@ DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
 TELEGRAM_BOT_TOKEN= os.getenv("TELEGRAM_BOT_TOKEN")
 UPLOAD_DIR_TG = "./uploads/Telegram"
 MONGO_DB_URI = os.getenv("MONGO_DB_URI")
-PAGINATION = os.getenv("PAGINATION", 5)
\ No newline at end of file
+PAGINATION = os.getenv("PAGINATION", 5)
+
+# Senkron (CPU yoğun) yükleyici ve embedding işleri için iş parçacığı sayısı
+BLOCKING_WORKERS = int(os.getenv("BLOCKING_WORKERS", 4))
+# Aynı anda kuyrukta bekleyebilecek en fazla senkron iş
+BLOCKING_QUEUE_LIMIT = int(os.getenv("BLOCKING_QUEUE_LIMIT", 32))
+
+# Telegram güncellemelerini işleyen arka plan worker sayısı
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 16))
+# Kuyrukta bekleyebilecek en fazla güncelleme (aşılırsa webhook 503 döner)
+JOB_QUEUE_LIMIT = int(os.getenv("JOB_QUEUE_LIMIT", 1000))
+# Tek bir sohbet için kuyrukta bekleyebilecek en fazla güncelleme
+JOB_QUEUE_PER_CHAT_LIMIT = int(os.getenv("JOB_QUEUE_PER_CHAT_LIMIT", 20))
+# Kapanışta kuyruğun boşalması için beklenecek süre (sn)
+JOB_QUEUE_DRAIN_TIMEOUT = float(os.getenv("JOB_QUEUE_DRAIN_TIMEOUT", 10))
+
+# Telegram Bot API (yerel test sunucusu için değiştirilebilir)
+TELEGRAM_API_BASE = os.getenv("TELEGRAM_API_BASE", "https://api.telegram.org")
+# Paylaşılan Telegram istemcisinin bağlantı havuzu boyutu
+TELEGRAM_MAX_CONNECTIONS = int(os.getenv("TELEGRAM_MAX_CONNECTIONS", 20))
+# Telegram isteklerinde okuma zaman aşımı (sn)
+TELEGRAM_TIMEOUT = float(os.getenv("TELEGRAM_TIMEOUT", 30))
+# Geçici hatalarda (429/5xx, bağlantı hatası) yeniden deneme sayısı
+TELEGRAM_MAX_RETRIES = int(os.getenv("TELEGRAM_MAX_RETRIES", 3))
+
+# Telegram'dan kabul edilecek en büyük doküman boyutu (bayt)
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", 20 * 1024 * 1024))
+
+# Cevap önbelleği (tam eşleşme + anlamsal eşleşme)
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+# Anlamsal eşleşme için en düşük kosinüs benzerliği
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", 0.92))
+# Önbellek kaydının geçerlilik süresi (sn)
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", 24 * 3600))
+# Önbellekte tutulacak en fazla cevap (LRU)
+ANSWER_CACHE_MAX_SIZE = int(os.getenv("ANSWER_CACHE_MAX_SIZE", 1000))
+
+# Embedding önbelleği: (model, metin hash'i) -> vektör, diskte SQLite
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "./embedding_cache/embeddings.sqlite3")
+# Önbellekte olmayan metinler modele bu boyutta gruplar halinde gönderilir
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 64))
+# Soru embedding'leri diske yazılmaz; yalnızca bellekte bu kadar soru, bu süre (sn) boyunca tutulur
+EMBEDDING_QUERY_CACHE_SIZE = int(os.getenv("EMBEDDING_QUERY_CACHE_SIZE", 1000))
+EMBEDDING_QUERY_CACHE_TTL = float(os.getenv("EMBEDDING_QUERY_CACHE_TTL", 3600))
+
+# Modeller uygulama başladıktan sonra arka planda önceden yüklensin mi
+# (kapalıysa ilk mesajda yüklenir)
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "true").lower() == "true"
+
+# Hibrit arama: Chroma benzerlik araması + BM25, reciprocal rank fusion ile birleştirilir
+HYBRID_RETRIEVAL = os.getenv("HYBRID_RETRIEVAL", "true").lower() == "true"
+# Birleştirmeden önce her iki aramadan alınacak aday sayısı
+HYBRID_FETCH_K = int(os.getenv("HYBRID_FETCH_K", 20))
+# RRF sabiti (skor = 1 / (RRF_K + sıra))
+RRF_K = int(os.getenv("RRF_K", 60))
+
+# Cross-encoder ile yeniden sıralama (ilk aşamadan fazla aday alınır, ilk k LLM'e gider).
+# Varsayılan kapalı: açıkken ilk soruda model indirilir ve her soruda RERANK_FETCH_K aday puanlanır
+RERANK_ENABLED = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1")
+# İlk aşamadan alınan aday sayısı (en fazla bu kadarı yeniden sıralanır)
+RERANK_FETCH_K = int(os.getenv("RERANK_FETCH_K", 50))
+RERANK_BATCH_SIZE = int(os.getenv("RERANK_BATCH_SIZE", 32))
+# Önbellekte tutulacak (soru, parça) puanı sayısı
+RERANK_CACHE_SIZE = int(os.getenv("RERANK_CACHE_SIZE", 10000))
+# Yeniden sıralama için hedef süre (sn); yük altında derinlik buna göre azalır
+RERANK_LATENCY_BUDGET = float(os.getenv("RERANK_LATENCY_BUDGET", 0.3))
+
+# Vektör deposu: "chroma", nicemlenmiş yerel depo ("int8" / "pq") ya da bellek eşlemeli depo ("mmap")
+VECTOR_STORE = os.getenv("VECTOR_STORE", "chroma")
+# PQ'da vektörün bölündüğü alt uzay sayısı (vektör başına bayt)
+PQ_SUBSPACES = int(os.getenv("PQ_SUBSPACES", 96))
+# Kaba aramadan tam vektörlerle yeniden puanlanacak aday çarpanı (k * RESCORE_FACTOR)
+RESCORE_FACTOR = int(os.getenv("RESCORE_FACTOR", 10))
+# mmap deposunda ana matrisin veri tipi; "float16" dosyayı yarıya indirir, arama daha yavaştır
+MMAP_DTYPE = os.getenv("MMAP_DTYPE", "float32")
+# Ekleme segmenti bu kadar satırı geçince arka planda ana segmentle birleştirilir
+MMAP_COMPACT_THRESHOLD = int(os.getenv("MMAP_COMPACT_THRESHOLD", 5000))
+
+# Scraper'ın MongoDB'ye yazdığı sayfaları (scraped_data.page_contents) PDF ile birlikte indeksle.
+# Sayfalar department/faculty/date metadata'sı taşır; retriever.invoke(q, filter={...}) ile süzülebilir.
+INDEX_SCRAPED_PAGES = os.getenv("INDEX_SCRAPED_PAGES", "false").lower() == "true"
+
+# Soruda bir bölüm adı geçiyorsa aramayı o bölümün parçalarıyla sınırla (hibrit aramada).
+# Bölümü olmayan parçalar (ör. yönetmelik PDF'i) filtreye takılacağı için yalnızca korpusun
+# tamamı bölüm metadata'sı taşıyorsa (INDEX_SCRAPED_PAGES ile taranmış sayfalar) açılmalı.
+AUTO_DEPARTMENT_FILTER = os.getenv("AUTO_DEPARTMENT_FILTER", "false").lower() == "true"
+
+# Soru genişletme: "off", "multi_query" (yeniden yazımlar) ya da "hyde" (varsayımsal cevap)
+QUERY_EXPANSION = os.getenv("QUERY_EXPANSION", "off").lower()
+# multi_query'de üretilecek ek sorgu sayısı
+QUERY_EXPANSION_COUNT = int(os.getenv("QUERY_EXPANSION_COUNT", 3))
+# Genişletmenin aramaya ekleyebileceği en fazla bekleme (sn); süre dolarsa orijinal sonuçlar kullanılır
+QUERY_EXPANSION_TIMEOUT = float(os.getenv("QUERY_EXPANSION_TIMEOUT", 1.0))
+QUERY_EXPANSION_CACHE_SIZE = int(os.getenv("QUERY_EXPANSION_CACHE_SIZE", 1000))
+QUERY_EXPANSION_CACHE_TTL = float(os.getenv("QUERY_EXPANSION_CACHE_TTL", 24 * 3600))
+
+# Bağlam paketleme: sabit TOP_K parça yerine chat modelinin token bütçesi kadar parça gönderilir
+CONTEXT_PACKING = os.getenv("CONTEXT_PACKING", "true").lower() == "true"
+# Paketleyiciye verilen aday parça sayısı
+CONTEXT_FETCH_K = int(os.getenv("CONTEXT_FETCH_K", 12))
+# Verilirse (ör. 0.05), soruya kosinüs benzerliği en iyi adayınkinden bu kadar düşük adaylar
+# gönderilmez. Varsayılan kapalı: bi-encoder skoru BM25 ve cross-encoder sıralamasını bozar
+CONTEXT_RELEVANCE_MARGIN = float(os.getenv("CONTEXT_RELEVANCE_MARGIN")) if os.getenv("CONTEXT_RELEVANCE_MARGIN") else None
+# Model başına bağlam token bütçesi (JSON), ör. {"deepseek-chat": 3000, "gpt-4": 2000}
+CONTEXT_TOKEN_BUDGETS = json.loads(os.getenv("CONTEXT_TOKEN_BUDGETS", "{}"))
+
+# Cevabı token'lar geldikçe Telegram mesajını düzenleyerek gönder
+STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "true").lower() == "true"
+# Aynı mesajın iki düzenlemesi arasındaki en kısa süre (sn); arada gelen token'lar birleştirilir
+STREAM_EDIT_INTERVAL = float(os.getenv("STREAM_EDIT_INTERVAL", 1.0))
+
+# Sırayla denenecek sohbet modelleri (chat_models/<ad>_chat.py); birden fazlaysa yönlendirici kullanılır
+CHAT_PROVIDERS = [name.strip() for name in os.getenv("CHAT_PROVIDERS", "deepseek").split(",") if name.strip()]
+# Sağlayıcı başına en uzun bekleme (sn); aşılırsa sıradaki sağlayıcıya geçilir
+CHAT_TIMEOUT = float(os.getenv("CHAT_TIMEOUT", 30))
+# Birincil sağlayıcı ilk cevap süresinin bu yüzdeliğini aşarsa ikinci sağlayıcıya da istek gönderilir (0: kapalı)
+CHAT_HEDGE_PERCENTILE = float(os.getenv("CHAT_HEDGE_PERCENTILE", 95))
+# Hedge için gereken en az süre ölçümü
+CHAT_HEDGE_MIN_SAMPLES = int(os.getenv("CHAT_HEDGE_MIN_SAMPLES", 20))
+# Art arda bu kadar hata alan sağlayıcı CHAT_BREAKER_RESET saniye atlanır
+CHAT_BREAKER_FAILURES = int(os.getenv("CHAT_BREAKER_FAILURES", 3))
+CHAT_BREAKER_RESET = float(os.getenv("CHAT_BREAKER_RESET", 30))
+
+# Toplu değerlendirme (main.py): aynı anda çalışan en fazla soru sayısı (sağlayıcı başına)
+EVAL_CONCURRENCY = int(os.getenv("EVAL_CONCURRENCY", 4))
+# Sağlayıcı başına dakikadaki istek sınırı (JSON), ör. {"deepseek": 60, "openai": 500}
+EVAL_RATE_LIMITS = json.loads(os.getenv("EVAL_RATE_LIMITS", "{}"))
+EVAL_DEFAULT_RPM = int(os.getenv("EVAL_DEFAULT_RPM", 60))
+# Biten her soru buraya yazılır; yarıda kalan değerlendirme kaldığı yerden devam eder
+EVAL_CHECKPOINT = os.getenv("EVAL_CHECKPOINT", "results/eval_checkpoint.jsonl")
+
+# Scraper: aynı host'a (ör. bil-muhendislik.omu.edu.tr) aynı anda gönderilecek en fazla istek
+SCRAPER_PER_HOST_CONCURRENCY = int(os.getenv("SCRAPER_PER_HOST_CONCURRENCY", 4))
+# Aynı host'a iki istek arasındaki en kısa süre (sn)
+SCRAPER_POLITENESS_DELAY = float(os.getenv("SCRAPER_POLITENESS_DELAY", 0.2))
+# Tüm host'lar için toplam bağlantı havuzu
+SCRAPER_MAX_CONNECTIONS = int(os.getenv("SCRAPER_MAX_CONNECTIONS", 64))
+SCRAPER_TIMEOUT = float(os.getenv("SCRAPER_TIMEOUT", 20))
+# 429/5xx ve bağlantı hatalarında yeniden deneme sayısı ve üstel bekleme katsayısı (sn)
+SCRAPER_MAX_RETRIES = int(os.getenv("SCRAPER_MAX_RETRIES", 3))
+SCRAPER_RETRY_BACKOFF = float(os.getenv("SCRAPER_RETRY_BACKOFF", 0.5))
+# Artımlı tarama: liste sayfaları en yeniden gezilir, bilinen haberlere ulaşınca durulur
+SCRAPER_INCREMENTAL = os.getenv("SCRAPER_INCREMENTAL", "true").lower() == "true"
+# Artımlı tarama ve backfill'de bir bölüm için gezilecek en fazla liste sayfası
+SCRAPER_MAX_PAGES = int(os.getenv("SCRAPER_MAX_PAGES", 500))
+# MongoDB write-behind tamponu: koleksiyon başına bu kadar işlem birikince ya da bu süre (sn) dolunca toplu yazılır
+MONGO_BULK_SIZE = int(os.getenv("MONGO_BULK_SIZE", 500))
+MONGO_FLUSH_INTERVAL = float(os.getenv("MONGO_FLUSH_INTERVAL", 2.0))
+# Tüm thread'lerin paylaştığı MongoClient'ın bağlantı havuzu
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 20))
@@ -0,0 +1,185 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from config import (
+    EMBEDDING_CACHE_ENABLED, EMBEDDING_CACHE_PATH, EMBEDDING_BATCH_SIZE,
+    EMBEDDING_QUERY_CACHE_SIZE, EMBEDDING_QUERY_CACHE_TTL,
+)
+
+# SQLite'ın tek sorguda izin verdiği parametre sayısının altında kalmak için
+LOOKUP_BATCH_SIZE = 500
+
+
+def normalize_text(text):
+    """
+    Aynı içeriğin farklı yazımlarının (Unicode biçimi, boşluklar) aynı anahtarı üretmesini sağlar.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def text_hash(text):
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """
+    (model adı, metin hash'i) -> vektör eşlemesini tutan SQLite deposu.
+    WAL modu sayesinde birden fazla süreç aynı dosyayı okuyup yazabilir.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL,"
+            " text_hash TEXT NOT NULL,"
+            " dim INTEGER NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " PRIMARY KEY (model, text_hash))"
+        )
+        # Önceki sürümlerin diske yazdığı kullanıcı soruları silinir
+        self._conn.execute("DELETE FROM embeddings WHERE text_hash LIKE 'query:%'")
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get_many(self, model, hashes):
+        """
+        Verilen hash'ler için depodaki vektörleri {hash: vektör} olarak döndürür.
+        """
+        found = {}
+        unique_hashes = list(dict.fromkeys(hashes))
+        with self._lock:
+            for start in range(0, len(unique_hashes), LOOKUP_BATCH_SIZE):
+                batch = unique_hashes[start:start + LOOKUP_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *batch],
+                ).fetchall()
+                for hash_value, blob in rows:
+                    found[hash_value] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def put_many(self, model, items):
+        """
+        items: (hash, vektör) çiftleri.
+        """
+        rows = [
+            (model, hash_value, len(vector), np.asarray(vector, dtype=np.float32).tobytes())
+            for hash_value, vector in items
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, dim, vector) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_embedding_store(path=EMBEDDING_CACHE_PATH):
+    """
+    Aynı dosya için süreç içinde tek bir EmbeddingStore döndürür.
+    """
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = EmbeddingStore(path)
+            _stores[path] = store
+        return store
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Herhangi bir LangChain embedding modelini diskteki önbellekle sarar.
+    Vektörler toplu olarak aranır; yalnızca önbellekte olmayan metinler
+    batch_size'lık gruplar halinde modele gönderilir.
+
+    Yalnızca doküman embedding'leri diske yazılır. Kullanıcı soruları diskte tutulmaz;
+    soru vektörleri bellekte query_cache_size kayıtlık, query_ttl saniyelik LRU önbellekte saklanır.
+    """
+
+    def __init__(self, embedding_model, model_name, store=None, batch_size=EMBEDDING_BATCH_SIZE,
+                 query_cache_size=EMBEDDING_QUERY_CACHE_SIZE, query_ttl=EMBEDDING_QUERY_CACHE_TTL):
+        self.embedding_model = embedding_model
+        self.model_name = model_name
+        self.store = store or get_embedding_store()
+        self.batch_size = batch_size
+        self.query_cache_size = query_cache_size
+        self.query_ttl = query_ttl
+        self._queries = OrderedDict()  # normalize edilmiş soru hash'i -> (zaman, vektör)
+        self._queries_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        hashes = [text_hash(text) for text in texts]
+        found = self.store.get_many(self.model_name, hashes)
+
+        # Önbellekte olmayan metinler (aynı içerik bir kez) modele gönderilir
+        missing = {}
+        for hash_value, text in zip(hashes, texts):
+            if hash_value not in found and hash_value not in missing:
+                missing[hash_value] = text
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+
+        missing_items = list(missing.items())
+        for start in range(0, len(missing_items), self.batch_size):
+            batch = missing_items[start:start + self.batch_size]
+            vectors = self.embedding_model.embed_documents([text for _, text in batch])
+            new_items = [(hash_value, vector) for (hash_value, _), vector in zip(batch, vectors)]
+            self.store.put_many(self.model_name, new_items)
+            found.update(new_items)
+
+        return [list(found[hash_value]) for hash_value in hashes]
+
+    def embed_query(self, text: str) -> List[float]:
+        # Sorgu embedding'i bazı modellerde (ör. instructor) doküman embedding'inden farklıdır;
+        # doküman önbelleğinden ayrı, yalnızca bellekte tutulur
+        hash_value = text_hash(text)
+        with self._queries_lock:
+            entry = self._queries.get(hash_value)
+            if entry is not None and (self.query_ttl is None or time.monotonic() - entry[0] <= self.query_ttl):
+                self._queries.move_to_end(hash_value)
+                self.hits += 1
+                return list(entry[1])
+            self.misses += 1
+        vector = self.embedding_model.embed_query(text)
+        if self.query_cache_size:
+            with self._queries_lock:
+                self._queries[hash_value] = (time.monotonic(), vector)
+                self._queries.move_to_end(hash_value)
+                while len(self._queries) > self.query_cache_size:
+                    self._queries.popitem(last=False)
+        return vector
+
+
+def with_embedding_cache(embedding_model, model_name, batch_size=EMBEDDING_BATCH_SIZE):
+    """
+    EMBEDDING_CACHE_ENABLED açıksa modeli CachedEmbeddings ile sarar.
+    """
+    if not EMBEDDING_CACHE_ENABLED:
+        return embedding_model
+    return CachedEmbeddings(embedding_model, model_name, batch_size=batch_size)
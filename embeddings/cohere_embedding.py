@@ -1,5 +1,9 @@
 from langchain_cohere import CohereEmbeddings
 from config import COHERE_API_KEY
+from embeddings.cached_embedding import with_embedding_cache
+
+MODEL_NAME = "embed-english-light-v2.0"
 
 def get_embedding_model():
-    return CohereEmbeddings(cohere_api_key=COHERE_API_KEY, model="embed-english-light-v2.0")
+    embedding_model = CohereEmbeddings(cohere_api_key=COHERE_API_KEY, model=MODEL_NAME)
+    return with_embedding_cache(embedding_model, f"cohere/{MODEL_NAME}")
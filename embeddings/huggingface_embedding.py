@@ -1,5 +1,8 @@
 from langchain_huggingface import HuggingFaceEmbeddings
 from config import HUGGINGFACE_API_KEY
+from embeddings.cached_embedding import with_embedding_cache
+
+MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
 
 def get_embedding_model():
-    return HuggingFaceEmbeddings(model_name="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
+    return with_embedding_cache(HuggingFaceEmbeddings(model_name=MODEL_NAME), MODEL_NAME)
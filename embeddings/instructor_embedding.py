@@ -1,4 +1,7 @@
 from langchain_huggingface import HuggingFaceEmbeddings
+from embeddings.cached_embedding import with_embedding_cache
+
+MODEL_NAME = "hkunlp/instructor-large"
 
 def get_embedding_model():
-    return HuggingFaceEmbeddings(model_name="hkunlp/instructor-large")
+    return with_embedding_cache(HuggingFaceEmbeddings(model_name=MODEL_NAME), MODEL_NAME)
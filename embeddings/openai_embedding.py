@@ -1,5 +1,7 @@
 from langchain_openai import OpenAIEmbeddings
 from config import OPENAI_API_KEY
+from embeddings.cached_embedding import with_embedding_cache
 
 def get_embedding_model():
-    return OpenAIEmbeddings(openai_api_key=OPENAI_API_KEY)
+    embedding_model = OpenAIEmbeddings(openai_api_key=OPENAI_API_KEY)
+    return with_embedding_cache(embedding_model, f"openai/{embedding_model.model}")
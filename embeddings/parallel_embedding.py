@@ -0,0 +1,100 @@
+import concurrent.futures
+import logging
+import multiprocessing
+import os
+import time
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+# Her worker sürecinde bir kez yüklenen model
+_worker_model = None
+
+
+def _load_huggingface(model_name):
+    from langchain_huggingface import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(model_name=model_name)
+
+
+def _init_worker(model_name, threads_per_worker, model_factory):
+    global _worker_model
+    try:
+        import torch
+        torch.set_num_threads(threads_per_worker)
+    except ImportError:
+        pass
+    _worker_model = model_factory(model_name)
+
+
+def _embed_batch(texts):
+    return _worker_model.embed_documents(texts)
+
+
+def _embed_query(text):
+    return _worker_model.embed_query(text)
+
+
+class ParallelEmbeddings(Embeddings):
+    """
+    Yerel HuggingFace embedding modelini birden fazla süreçte çalıştırır.
+    Her süreç modeli bir kez yükler; metinler batch_size'lık gruplar halinde
+    süreçlere dağıtılır ve sonuçlar sırası korunarak birleştirilir.
+    Toplu indeks oluşturma içindir; sunucu tarafında tek süreçli model yeterlidir.
+    model_factory(model_name) her süreçte modeli oluşturur (modül seviyesinde, pickle
+    edilebilir bir fonksiyon olmalı); verilmezse HuggingFaceEmbeddings yüklenir.
+    """
+
+    def __init__(self, model_name, workers=None, batch_size=64, model_factory=None):
+        self.model_name = model_name
+        self.model_factory = model_factory or _load_huggingface
+        self.workers = workers or max(1, (os.cpu_count() or 2) // 2)
+        self.batch_size = batch_size
+        self._pool = None
+
+        self.embedded_texts = 0
+        self.embedding_seconds = 0.0
+
+    def _get_pool(self):
+        if self._pool is None:
+            threads_per_worker = max(1, (os.cpu_count() or 1) // self.workers)
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers,
+                # fork, yüklü torch iş parçacıklarıyla sorun çıkarabilir
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_name, threads_per_worker, self.model_factory),
+            )
+            logger.info(f"{self.workers} embedding süreci başlatıldı ({self.model_name}, süreç başına {threads_per_worker} thread).")
+        return self._pool
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        start = time.perf_counter()
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        vectors = []
+        for batch_vectors in self._get_pool().map(_embed_batch, batches):
+            vectors.extend(batch_vectors)
+
+        elapsed = time.perf_counter() - start
+        self.embedded_texts += len(texts)
+        self.embedding_seconds += elapsed
+        logger.info(f"{len(texts)} metin {elapsed:.2f} sn'de embed edildi ({len(texts) / elapsed:.1f} metin/sn).")
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._get_pool().submit(_embed_query, text).result()
+
+    @property
+    def throughput(self):
+        """
+        Şimdiye kadarki ortalama hız (metin/sn).
+        """
+        return self.embedded_texts / self.embedding_seconds if self.embedding_seconds else 0.0
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -1,80 +1,164 @@
-from langchain.chains import RetrievalQA
-from embeddings import (
-    openai_embedding, huggingface_embedding, sentence_transformer_embedding,
-    cohere_embedding, instructor_embedding, bert_embedding
-)
-from chat_models import (
-    openai_chat, huggingface_chat, anthropic_chat, deepseek_chat
+import logging
+
+from config import (
+    CHAT_PROVIDERS, EVAL_CHECKPOINT, EVAL_CONCURRENCY, EVAL_DEFAULT_RPM, EVAL_RATE_LIMITS,
 )
-from retriever.retriever import setup_retriever
-from utils.loader import load_pdf, load_questions
-from utils.evaluator import evaluate_responses
+from utils.model_registry import ModelRegistry
+
+logger = logging.getLogger(__name__)
 
 # Embedding ve Chat Modelleri
+# "modul:fonksiyon" olarak verilir; modül ve model ilk kullanımda yüklenir.
 embedding_models = {
-    "bert": bert_embedding.get_embedding_model,
-    # "openai": openai_embedding.get_embedding_model,
-    # "huggingface": huggingface_embedding.get_embedding_model,
-    # "sentence_transformer": sentence_transformer_embedding.get_embedding_model,
-    # "cohere": cohere_embedding.get_embedding_model,
-    # "instructor": instructor_embedding.get_embedding_model,
+    "bert": "embeddings.bert_embedding:get_embedding_model",
+    # "openai": "embeddings.openai_embedding:get_embedding_model",
+    # "huggingface": "embeddings.huggingface_embedding:get_embedding_model",
+    # "sentence_transformer": "embeddings.sentence_transformer_embedding:get_embedding_model",
+    # "cohere": "embeddings.cohere_embedding:get_embedding_model",
+    # "instructor": "embeddings.instructor_embedding:get_embedding_model",
 }
 
 chat_models = {
-    # "anthropic": anthropic_chat.get_chat_model,
-    "deepseek": deepseek_chat.get_chat_model,
-    # "openai": openai_chat.get_chat_model,
-    # "huggingface": huggingface_chat.get_chat_model,
+    # "anthropic": "chat_models.anthropic_chat:get_chat_model",
+    "deepseek": "chat_models.deepseek_chat:get_chat_model",
+    # "openai": "chat_models.openai_chat:get_chat_model",
+    # "huggingface": "chat_models.huggingface_chat:get_chat_model",
 }
 
+# Süreç içinde paylaşılan model kayıt defteri; her model bir kez oluşturulur
+models = ModelRegistry()
+for name, factory in embedding_models.items():
+    models.register(f"embedding/{name}", factory)
+for name, factory in chat_models.items():
+    models.register(f"chat/{name}", factory)
+# CHAT_PROVIDERS'taki sağlayıcılar değerlendirme listesinde olmasalar da kayıtlı olur
+for name in CHAT_PROVIDERS:
+    if f"chat/{name}" not in models.names():
+        models.register(f"chat/{name}", f"chat_models.{name}_chat:get_chat_model")
+def build_router():
+    """
+    CHAT_PROVIDERS sırasıyla fallback/hedge yapan yönlendirici; sağlayıcılar kayıt
+    defterinden alınır (değerlendirmeyle aynı nesneler, /models/stats'ta görünür).
+    """
+    from chat_models.router import get_chat_model
+
+    return get_chat_model(CHAT_PROVIDERS, load=lambda name: models.get(f"chat/{name}"))
+
+models.register("chat/router", build_router)
+
+PDF_PATH = "data/yonetmelik.pdf"
+
+def scraped_pages_collection():
+    """
+    Scraper'ın sayfaları yazdığı MongoDB koleksiyonu (scraped_data.page_contents).
+    """
+    from pymongo import MongoClient
+    from config import MONGO_DB_URI
+
+    return MongoClient(MONGO_DB_URI, serverSelectionTimeoutMS=5000)["scraped_data"]["page_contents"]
+
+def load_corpus():
+    """
+    İndekslenecek dokümanlar: yönetmelik PDF'i ve INDEX_SCRAPED_PAGES açıksa scraper'ın
+    MongoDB'ye yazdığı sayfalar. Veritabanına ulaşılamazsa yalnızca PDF döner.
+    """
+    from config import INDEX_SCRAPED_PAGES
+    from utils.loader import load_pdf, load_scraped_pages
+
+    documents = load_pdf(PDF_PATH)
+    if INDEX_SCRAPED_PAGES:
+        from pymongo.errors import PyMongoError
+
+        try:
+            pages = load_scraped_pages(scraped_pages_collection())
+        except PyMongoError as e:
+            logger.warning(f"Taranmış sayfalar indekslenemedi, yalnızca PDF kullanılıyor: {e}")
+        else:
+            logger.info(f"{len(pages)} taranmış sayfa indekse ekleniyor.")
+            documents = documents + pages
+    return documents
+
+def build_retriever(embedding_name):
+    """
+    Verilen embedding modeliyle korpusun (bkz. load_corpus) indeksini (retriever) kurar.
+    """
+    from retriever.retriever import setup_retriever
+
+    return setup_retriever(
+        load_corpus(),
+        models.get(f"embedding/{embedding_name}"),
+        db_name=f"chroma_{embedding_name}"
+    )
+
 def setup_models():
     """
     Retriever ve chat modelini başlatır.
     """
-    # PDF ve Soru Yükleme
-    pdf_path = "data/yonetmelik.pdf"
-    pdf_documents = load_pdf(pdf_path)
+    from retriever.retriever import setup_query_expansion, setup_context_packing
 
     # Retriever'ı kur
-    retriever = setup_retriever(
-        pdf_documents,
-        embedding_models["bert"](),
-        db_name="chroma_bert"
-    )
+    retriever = build_retriever("bert")
 
-    # Chat modelini yükle
-    chat_model = chat_models["deepseek"]()
+    # Chat modelini yükle; birden fazla sağlayıcı tanımlıysa aralarında yönlendirme yapılır
+    chat_model = models.get("chat/router") if len(CHAT_PROVIDERS) > 1 else models.get(f"chat/{CHAT_PROVIDERS[0]}")
+
+    # QUERY_EXPANSION açıksa kısa sorular chat modeliyle genişletilerek aranır
+    retriever = setup_query_expansion(retriever, chat_model)
+    # Sabit k parça yerine chat modelinin token bütçesine sığan parçalar gönderilir
+    retriever = setup_context_packing(retriever, chat_model)
 
     return retriever, chat_model
 
-def main():
-    # Retriever ve chat modelini başlat
-    retriever, chat_model = setup_models()
+def build_eval_chain(retriever, chat_model):
+    """
+    Değerlendirme zinciri; cevap önbelleği kullanılmaz ki her kombinasyon gerçekten çalışsın.
+    """
+    from chains.qa_chain import get_qa_chain
+    from retriever.retriever import setup_context_packing
+
+    return get_qa_chain(setup_context_packing(retriever, chat_model), chat_model)
+
+def main(fresh=False):
+    import asyncio
+    import json
+    import os
+    from utils.loader import load_questions
+    from utils.evaluator import evaluate_responses
+    from utils.eval_runner import EvaluationRunner
 
     # Soruları yükle
     questions = load_questions("data/questions.json")
 
-    # Sonuçları Toplamak İçin
-    results = []
-
-    for question in questions:
-        # RetrievalQA
-        qa_chain = RetrievalQA.from_chain_type(
-            llm=chat_model,
-            retriever=retriever,
-            return_source_documents=True
-        )
-
-        # Soruyu çalıştır
-        response = qa_chain.invoke({"query": question["query"]})
-        results.append({
-            "embedding_model": "bert",
-            "chat_model": "deepseek",
-            "question": question["query"],
-            "response": response,
-        })
+    # fresh verilmezse yarıda kalan çalışma checkpoint'ten devam eder
+    if fresh and os.path.exists(EVAL_CHECKPOINT):
+        os.remove(EVAL_CHECKPOINT)
+
+    runner = EvaluationRunner(
+        build_retriever,
+        lambda chat_name: models.get(f"chat/{chat_name}"),
+        build_eval_chain,
+        checkpoint_path=EVAL_CHECKPOINT,
+        rate_limits=EVAL_RATE_LIMITS,
+        default_rpm=EVAL_DEFAULT_RPM,
+        max_concurrency=EVAL_CONCURRENCY,
+    )
+    results, summary = asyncio.run(
+        runner.run(questions, list(embedding_models), list(chat_models))
+    )
 
     # Sonuçları Kaydet
     evaluate_responses(results, "results/output.json")
+    with open("results/summary.json", "w", encoding="utf-8") as file:
+        json.dump(summary, file, indent=4, ensure_ascii=False)
+
+    print(f"{'embedding':<22}{'chat':<12}{'soru':>6}{'hata':>6}{'p50 sn':>9}{'p95 sn':>9}{'girdi tok':>11}{'çıktı tok':>11}")
+    for row in summary:
+        print(f"{row['embedding_model']:<22}{row['chat_model']:<12}{row['questions']:>6}{row['errors']:>6}"
+              f"{row['latency_p50']:>9.2f}{row['latency_p95']:>9.2f}"
+              f"{str(row['input_tokens'] or '-'):>11}{str(row['output_tokens'] or '-'):>11}")
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fresh", action="store_true", help="Checkpoint'i silip değerlendirmeyi baştan çalıştırır")
+    main(fresh=parser.parse_args().fresh)
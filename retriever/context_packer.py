@@ -0,0 +1,190 @@
+import functools
+import math
+from typing import Any, List, Optional
+
+import numpy as np
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.runnables.config import run_in_executor
+
+try:
+    import tiktoken
+except ImportError:  # langchain_openai ile gelir; yoksa karakter sayısından tahmin edilir
+    tiktoken = None
+
+# Bağlam için model başına varsayılan token bütçesi (soru, prompt ve cevap için pay bırakılır)
+DEFAULT_TOKEN_BUDGETS = {
+    "deepseek-chat": 3000,
+    "gpt-4": 2000,
+    "claude-2": 4000,
+}
+DEFAULT_TOKEN_BUDGET = 1500
+# tiktoken yoksa Türkçe metinde token başına ortalama karakter
+CHARS_PER_TOKEN = 3
+# Aralarında en fazla bu kadar karakter (ayraç) olan parçalar bitişik sayılır
+MERGE_GAP = 2
+
+
+@functools.lru_cache(maxsize=None)
+def _get_encoding():
+    return tiktoken.get_encoding("cl100k_base")
+
+
+@functools.lru_cache(maxsize=20000)
+def count_tokens(text):
+    """
+    Metnin token sayısı. Tokenizer bir kez yüklenir, parça başına sayılar önbellekte tutulur.
+    """
+    if tiktoken is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(_get_encoding().encode(text, disallowed_special=()))
+
+
+def model_name(chat_model):
+    """
+    Chat modelinin adı (ChatOpenAI.model_name, ChatAnthropic.model, Ollama.model).
+    """
+    return getattr(chat_model, "model_name", None) or getattr(chat_model, "model", None)
+
+
+def token_budget(chat_model, budgets=None):
+    """
+    Chat modeli için bağlam token bütçesi; tanımlı değilse DEFAULT_TOKEN_BUDGET.
+    """
+    budgets = DEFAULT_TOKEN_BUDGETS if budgets is None else budgets
+    return budgets.get(model_name(chat_model), DEFAULT_TOKEN_BUDGET)
+
+
+def _position(document):
+    metadata = document.metadata
+    start = metadata.get("start_index")
+    if start is None or start < 0:
+        return None
+    return (metadata.get("source"), metadata.get("page")), start
+
+
+def merge_adjacent(documents):
+    """
+    Aynı sayfadan gelen ve metinde üst üste binen ya da bitişik parçaları (start_index ile)
+    tek dokümanda birleştirir; çakışan kısım bir kez yazılır. Sıra, grubun en iyi
+    sıradaki parçasına göre korunur.
+    """
+    groups = {}
+    order = []
+    for rank, document in enumerate(documents):
+        position = _position(document)
+        key = position[0] if position else ("rank", rank)
+        if key not in groups:
+            groups[key] = []
+            order.append(key)
+        groups[key].append(document)
+
+    merged = []
+    for key in order:
+        group = groups[key]
+        if key[0] == "rank":
+            merged.extend(group)
+            continue
+        group = sorted(group, key=lambda d: d.metadata["start_index"])
+        current = group[0]
+        start = current.metadata["start_index"]
+        text = current.page_content
+        for document in group[1:]:
+            offset = document.metadata["start_index"] - start
+            if offset > len(text) + MERGE_GAP:
+                merged.append(Document(page_content=text, metadata={**current.metadata, "start_index": start}))
+                current, start, text = document, document.metadata["start_index"], document.page_content
+            elif offset > len(text):
+                text = text + " " + document.page_content
+            else:
+                # Çakışan parça: yalnızca yeni kısmı ekle
+                text = text + document.page_content[len(text) - offset:]
+        merged.append(Document(page_content=text, metadata={**current.metadata, "start_index": start}))
+    return merged
+
+
+def relevance_cutoff(query, documents, embeddings, margin=None):
+    """
+    Adaylardan, soruya kosinüs benzerliği en iyi adayınkinden margin'den fazla düşük
+    olanları çıkarır; sıra korunur. Basit bir soruda bütçe yalnızca gerçekten ilgili
+    parçalarla dolar, geniş bir soruda benzer skorlu adayların hepsi kalır.
+    margin None ise (varsayılan) kesme yapılmaz: skor bi-encoder benzerliği olduğundan,
+    BM25'in bulduğu terim eşleşmelerini ve cross-encoder'ın öne aldığı parçaları atabilir;
+    yalnızca salt vektör aramasında açılmalıdır.
+    Adaylar her soruda embed_documents'tan geçer: embeddings CachedEmbeddings ise
+    (EMBEDDING_CACHE_ENABLED) vektörler indekslemede yazılan önbellekten okunur, değilse
+    her soruda tüm adaylar (en fazla CONTEXT_FETCH_K) yeniden hesaplanır.
+    """
+    if embeddings is None or margin is None or len(documents) < 2:
+        return documents
+    query_vector = np.asarray(embeddings.embed_query(query), dtype=np.float32)
+    vectors = np.asarray(embeddings.embed_documents([d.page_content for d in documents]), dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query_vector)
+    scores = vectors @ query_vector / np.maximum(norms, 1e-12)
+    threshold = scores.max() - margin
+    return [document for document, score in zip(documents, scores) if score >= threshold]
+
+
+def pack_context(documents, budget):
+    """
+    Sıralı aday parçalardan token bütçesine sığanları seçer:
+    - Başka bir seçili parçanın içinde kalan parçalar atlanır.
+    - Parçalar sırayla eklenir; sığmayan atlanır, daha kısa olanlar denenmeye devam eder.
+    - Seçilenler merge_adjacent ile birleştirilir.
+    En iyi parça bütçeden büyük olsa da en az bir parça döner.
+    """
+    selected = []
+    used = 0
+    for document in documents:
+        text = document.page_content
+        if any(text in chosen.page_content for chosen in selected):
+            continue
+        tokens = count_tokens(text)
+        if selected and used + tokens > budget:
+            continue
+        selected.append(document)
+        used += tokens
+        if used >= budget:
+            break
+    return merge_adjacent(selected)
+
+
+class ContextPackingRetriever(BaseRetriever):
+    """
+    base_retriever'ın döndürdüğü sıralı adaylardan (ör. 12), önce soruyla yeterince ilgili
+    olanları (relevance_cutoff, relevance_margin ve embeddings verilmişse), sonra chat modelinin token
+    bütçesine sığanları seçip komşu parçaları birleştirerek döndürür. "stuff" zinciri
+    her soruda sabit 3 parça yerine bu listeyi gönderir.
+    """
+
+    base_retriever: BaseRetriever
+    budget: int = DEFAULT_TOKEN_BUDGET
+    embeddings: Any = None
+    relevance_margin: Optional[float] = None
+
+    @property
+    def vectorstore(self):
+        # Cevap önbelleği embedding modelini retriever.vectorstore üzerinden bulur
+        return getattr(self.base_retriever, "vectorstore", None)
+
+    def add_documents(self, documents: List[Document], **kwargs: Any) -> List[str]:
+        return self.base_retriever.add_documents(documents, **kwargs)
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun, **kwargs: Any
+    ) -> List[Document]:
+        candidates = self.base_retriever.invoke(query, config={"callbacks": run_manager.get_child()}, **kwargs)
+        return self._pack(query, candidates)
+
+    def _pack(self, query, candidates):
+        candidates = relevance_cutoff(query, candidates, self.embeddings, self.relevance_margin)
+        return pack_context(candidates, self.budget)
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: Any, **kwargs: Any) -> List[Document]:
+        candidates = await self.base_retriever.ainvoke(
+            query, config={"callbacks": run_manager.get_child()}, **kwargs
+        )
+        # İlk çağrıda tokenizer yüklenir, embedding hesaplanabilir; event loop'u bloklamasın
+        return await run_in_executor(None, self._pack, query, candidates)
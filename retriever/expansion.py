@@ -0,0 +1,234 @@
+import concurrent.futures
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.runnables.config import run_in_executor
+
+from chains.answer_cache import normalize_query
+from retriever.hybrid import reciprocal_rank_fusion
+
+logger = logging.getLogger(__name__)
+
+EXPANSION_MODES = ("multi_query", "hyde")
+# Genişletme LLM çağrıları için ayrı havuz; zaman aşımına uğrayan çağrılar burada bitmeye devam eder
+EXPANSION_WORKERS = 4
+# Genişletilmiş sorguların aramaları için havuz (LLM çağrılarını bekletmesin diye ayrı)
+EXPANDED_SEARCH_WORKERS = 8
+
+MULTI_QUERY_PROMPT = """Aşağıdaki soruyu, bir üniversite belge arşivinde arama yapmak için {n} farklı
+biçimde yeniden yaz. Kısaltmaları aç, eş anlamlı kelimeler kullan. Her satıra bir soru yaz,
+açıklama ekleme.
+
+Soru: {question}"""
+
+HYDE_PROMPT = """Aşağıdaki soruya, Ondokuz Mayıs Üniversitesi yönetmeliklerinden alınmış gibi
+görünen kısa bir cevap paragrafı yaz. Emin olmasan da tahmin et, açıklama ekleme.
+
+Soru: {question}"""
+
+_executors = {}
+_executor_lock = threading.Lock()
+
+
+def _get_pool(name, max_workers):
+    executor = _executors.get(name)
+    if executor is None:
+        with _executor_lock:
+            executor = _executors.get(name)
+            if executor is None:
+                executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+                _executors[name] = executor
+    return executor
+
+
+def _get_executor():
+    return _get_pool("QueryExpansion", EXPANSION_WORKERS)
+
+
+def _get_search_executor():
+    return _get_pool("ExpandedSearch", EXPANDED_SEARCH_WORKERS)
+
+
+def parse_queries(text, n):
+    """
+    LLM çıktısındaki numaralı/madde işaretli satırları soru listesine çevirir.
+    """
+    queries = []
+    for line in text.splitlines():
+        line = re.sub(r"^\s*(?:\d+[.)]|[-*•])\s*", "", line).strip().strip('"')
+        if line and line not in queries:
+            queries.append(line)
+    return queries[:n]
+
+
+class QueryExpander:
+    """
+    Soruyu chat modeliyle genişletir:
+    - multi_query: n farklı yeniden yazım
+    - hyde: soruya varsayımsal bir cevap paragrafı (embedding'i belgelere daha yakındır)
+
+    Sonuçlar normalize edilmiş soru anahtarıyla LRU + TTL önbellekte tutulur.
+    expand() en fazla timeout saniye bekler; süre dolarsa boş liste döner, çağrı arka
+    planda biter ve sonucu sonraki sorular için önbelleğe yazılır. Aynı soru için
+    süren çağrı tekrar başlatılmaz.
+    """
+
+    def __init__(self, llm, mode="multi_query", n_queries=3, timeout=1.0, cache_size=1000, ttl=24 * 3600):
+        if mode not in EXPANSION_MODES:
+            raise ValueError(f"Desteklenmeyen genişletme türü: {mode}")
+        self.llm = llm
+        self.mode = mode
+        self.n_queries = n_queries
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self.ttl = ttl
+
+        self._cache = OrderedDict()  # normalize edilmiş soru -> (zaman, sorgular)
+        self._pending = {}  # normalize edilmiş soru -> Future
+        # Önbellekten dönen Future'ın callback'i kilit tutulurken aynı thread'de çalışabilir
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def _generate(self, query):
+        if self.mode == "hyde":
+            prompt = HYDE_PROMPT.format(question=query)
+        else:
+            prompt = MULTI_QUERY_PROMPT.format(n=self.n_queries, question=query)
+        output = self.llm.invoke(prompt)
+        # Chat modelleri mesaj, düz LLM'ler metin döndürür
+        text = getattr(output, "content", output)
+        if self.mode == "hyde":
+            return [text.strip()] if text.strip() else []
+        return [q for q in parse_queries(text, self.n_queries) if normalize_query(q) != normalize_query(query)]
+
+    def _finish(self, key, future):
+        with self._lock:
+            self._pending.pop(key, None)
+            if future.exception() is not None:
+                self.errors += 1
+                logger.warning(f"Soru genişletme başarısız: {future.exception()}")
+                return
+            self._cache[key] = (time.monotonic(), future.result())
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def submit(self, query):
+        """
+        Genişletmeyi başlatır; önbellekteyse tamamlanmış bir Future döndürür.
+        """
+        key = normalize_query(query)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and (self.ttl is None or time.monotonic() - entry[0] <= self.ttl):
+                self._cache.move_to_end(key)
+                self.hits += 1
+                future = concurrent.futures.Future()
+                future.set_result(entry[1])
+                return future
+            self.misses += 1
+            future = self._pending.get(key)
+            if future is None:
+                future = _get_executor().submit(self._generate, query)
+                self._pending[key] = future
+                future.add_done_callback(lambda done: self._finish(key, done))
+        return future
+
+    def wait(self, future, timeout):
+        """
+        Future'ı en fazla timeout saniye bekler; süre dolarsa ya da hata olursa [] döner.
+        """
+        try:
+            return future.result(timeout=max(timeout, 0))
+        except concurrent.futures.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            return []
+        except Exception:
+            return []
+
+    def expand(self, query):
+        return self.wait(self.submit(query), self.timeout)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "hits": self.hits,
+                "misses": self.misses,
+                "timeouts": self.timeouts,
+                "errors": self.errors,
+                "cached": len(self._cache),
+            }
+
+
+class ExpandingRetriever(BaseRetriever):
+    """
+    Soruyu QueryExpander ile genişletip orijinal ve üretilen sorgularla base_retriever'ı
+    paralel çalıştırır; sonuçları parça kimliğine göre tekilleştirip RRF ile birleştirir.
+
+    Genişletme, orijinal sorgunun aramasıyla aynı anda başlar. Genişletme ve üretilen
+    sorguların aramaları (base_retriever yeniden sıralama yapıyorsa o da) birlikte,
+    başlangıçtan itibaren expander.timeout içinde bitmelidir: süre dolduğunda biten
+    aramalar orijinal sonuçlarla birleştirilir, diğerleri beklenmez. Genişletme hiç
+    yetişmezse yalnızca orijinal sonuçlar döner.
+    """
+
+    base_retriever: BaseRetriever
+    expander: Any
+    k: int = 3
+    rrf_k: int = 60
+
+    @property
+    def vectorstore(self):
+        # Cevap önbelleği embedding modelini retriever.vectorstore üzerinden bulur
+        return getattr(self.base_retriever, "vectorstore", None)
+
+    def add_documents(self, documents: List[Document], **kwargs: Any) -> List[str]:
+        return self.base_retriever.add_documents(documents, **kwargs)
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun, **kwargs: Any
+    ) -> List[Document]:
+        start = time.monotonic()
+        future = self.expander.submit(query)
+        config = {"callbacks": run_manager.get_child()}
+        original = self.base_retriever.invoke(query, config=config, **kwargs)
+
+        deadline = start + self.expander.timeout
+        queries = self.expander.wait(future, deadline - time.monotonic())
+        if not queries:
+            return original[:self.k]
+
+        executor = _get_search_executor()
+        searches = [executor.submit(self.base_retriever.invoke, q, config=config, **kwargs) for q in queries]
+        done, late = concurrent.futures.wait(searches, timeout=max(deadline - time.monotonic(), 0))
+        for search in late:
+            # Başlamamış aramalar iptal edilir, başlamışlar arka planda biter
+            search.cancel()
+        if late:
+            logger.info(f"Süre dolduğu için genişletilmiş {len(late)}/{len(searches)} arama beklenmedi.")
+        expanded = []
+        for search in searches:
+            if search in done:
+                if search.exception() is None:
+                    expanded.append(search.result())
+                else:
+                    logger.warning(f"Genişletilmiş arama başarısız: {search.exception()!r}")
+        return reciprocal_rank_fusion([original] + expanded, k=self.rrf_k, limit=self.k)
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: Any, **kwargs: Any) -> List[Document]:
+        return await run_in_executor(
+            None, self._get_relevant_documents, query, run_manager=run_manager.get_sync(), **kwargs
+        )
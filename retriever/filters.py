@@ -0,0 +1,177 @@
+import bisect
+
+import numpy as np
+
+# İkincil indekste değer -> satır listesi tutulan alanlar
+INDEXED_FIELDS = ("department", "faculty", "is_pdf_source", "source")
+RANGE_OPERATORS = ("$gt", "$gte", "$lt", "$lte")
+OPERATORS = ("$eq", "$ne", "$in", "$nin") + RANGE_OPERATORS
+
+_TURKISH_FOLD = str.maketrans("çğıöşüÇĞIİÖŞÜâîû", "cgiosucgiiosuaiu")
+
+
+def fold_turkish(text):
+    """
+    Türkçe karakterleri ASCII karşılıklarına indirger ("Mühendisliği" -> "muhendisligi").
+    """
+    return " ".join(text.translate(_TURKISH_FOLD).lower().split())
+
+
+def normalize_filter(filter):
+    """
+    Chroma benzeri filtreyi (alan, operatör, değer) koşullarına çevirir.
+    {"department": "x", "date": {"$gte": "2024-01-01"}} ya da {"$and": [...]} biçimleri desteklenir;
+    birden fazla koşul VE ile bağlanır.
+    """
+    conditions = []
+    for field, value in (filter or {}).items():
+        if field == "$and":
+            for sub_filter in value:
+                conditions.extend(normalize_filter(sub_filter))
+        elif isinstance(value, dict):
+            for operator, operand in value.items():
+                if operator not in OPERATORS:
+                    raise ValueError(f"Desteklenmeyen filtre operatörü: {operator}")
+                conditions.append((field, operator, operand))
+        else:
+            conditions.append((field, "$eq", value))
+    return conditions
+
+
+def date_to_int(value):
+    """
+    "YYYY-MM-DD" tarihini Chroma'nın karşılaştırabildiği YYYYMMDD tamsayısına çevirir.
+    """
+    return int(str(value)[:10].replace("-", ""))
+
+
+def to_chroma_where(filter):
+    """
+    Filtreyi Chroma'nın where sözdizimine çevirir. Chroma aralık operatörlerini yalnızca
+    sayılarda desteklediğinden tarih koşulları date_int alanına taşınır.
+    """
+    clauses = []
+    for field, operator, value in normalize_filter(filter):
+        if field == "date" and operator in RANGE_OPERATORS:
+            field, value = "date_int", date_to_int(value)
+        clauses.append({field: {operator: value}})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def vectorstore_search_kwargs(vectorstore, filter):
+    """
+    similarity_search'e verilecek filtre argümanı: kendi metadata indeksi olan yerel
+    depolara filtre olduğu gibi, Chroma'ya where sözdizimine çevrilerek verilir.
+    """
+    if not filter:
+        return {}
+    if getattr(vectorstore, "supports_metadata_index", False):
+        return {"filter": filter}
+    return {"filter": to_chroma_where(filter)}
+
+
+def matches(metadata, field, operator, value):
+    actual = metadata.get(field)
+    if operator == "$eq":
+        return actual == value
+    if operator == "$ne":
+        return actual != value
+    if operator == "$in":
+        return actual in value
+    if operator == "$nin":
+        return actual not in value
+    if actual is None:
+        return False
+    if operator == "$gt":
+        return actual > value
+    if operator == "$gte":
+        return actual >= value
+    if operator == "$lt":
+        return actual < value
+    return actual <= value
+
+
+class MetadataIndex:
+    """
+    Vektör taramasından önce filtre uygulamak için metadata ikincil indeksi.
+
+    INDEXED_FIELDS alanlarında değer -> satır numaraları, tarih için sıralı
+    (tarih, satır) dizisi tutulur. Diğer alan/operatörler aday satırlar üzerinde
+    tek tek kontrol edilir. select() filtreye uyan satırları sıralı döndürür.
+    """
+
+    def __init__(self, metadatas):
+        self.size = len(metadatas)
+        self._metadatas = metadatas
+        postings = {field: {} for field in INDEXED_FIELDS}
+        dated = []
+        for row, metadata in enumerate(metadatas):
+            for field in INDEXED_FIELDS:
+                value = metadata.get(field)
+                if value is not None:
+                    postings[field].setdefault(value, []).append(row)
+            if metadata.get("date"):
+                dated.append((str(metadata["date"]), row))
+        self._postings = {
+            field: {value: np.array(rows, dtype=np.int64) for value, rows in values.items()}
+            for field, values in postings.items()
+        }
+        dated.sort()
+        self._dates = [date for date, _ in dated]
+        self._date_rows = np.array([row for _, row in dated], dtype=np.int64)
+
+    def values(self, field):
+        """
+        İndekslenmiş bir alanın farklı değerleri.
+        """
+        return list(self._postings.get(field, {}))
+
+    def _select_one(self, field, operator, value, rows):
+        if field in self._postings and operator in ("$eq", "$in"):
+            values = value if operator == "$in" else [value]
+            found = [self._postings[field][v] for v in values if v in self._postings[field]]
+            return np.unique(np.concatenate(found)) if found else np.empty(0, dtype=np.int64)
+        if field == "date" and operator in RANGE_OPERATORS:
+            value = str(value)
+            if operator in ("$gt", "$gte"):
+                start = (bisect.bisect_right if operator == "$gt" else bisect.bisect_left)(self._dates, value)
+                return np.sort(self._date_rows[start:])
+            end = (bisect.bisect_left if operator == "$lt" else bisect.bisect_right)(self._dates, value)
+            return np.sort(self._date_rows[:end])
+        candidates = range(self.size) if rows is None else rows
+        return np.array(
+            [row for row in candidates if matches(self._metadatas[row], field, operator, value)], dtype=np.int64
+        )
+
+    def select(self, conditions):
+        """
+        Koşulların hepsine uyan satır numaraları (conditions: normalize_filter çıktısı).
+        """
+        rows = None
+        # İndeksli koşullar önce uygulanır, kalanlar daraltılmış aday kümesinde kontrol edilir
+        ordered = sorted(conditions, key=lambda c: not (c[0] in self._postings or c[0] == "date"))
+        for field, operator, value in ordered:
+            selected = self._select_one(field, operator, value, rows)
+            rows = selected if rows is None else np.intersect1d(rows, selected, assume_unique=True)
+            if not len(rows):
+                break
+        return np.arange(self.size, dtype=np.int64) if rows is None else rows
+
+
+def infer_department_filter(query, departments):
+    """
+    Soruda bir bölüm adı geçiyorsa ("Bilgisayar Mühendisliği") o bölüm için filtre döndürür.
+    departments: indeksteki bölüm kısa adları ("bilgisayar-muhendisligi").
+    """
+    folded = fold_turkish(query)
+    mentioned = [
+        department for department in departments
+        if isinstance(department, str) and fold_turkish(department.replace("-", " ")) in folded
+    ]
+    if not mentioned:
+        return None
+    if len(mentioned) == 1:
+        return {"department": mentioned[0]}
+    return {"department": {"$in": mentioned}}
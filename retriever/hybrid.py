@@ -0,0 +1,251 @@
+import functools
+import re
+import threading
+from typing import Any, List
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.runnables.config import run_in_executor
+
+from retriever.filters import (
+    MetadataIndex, infer_department_filter, normalize_filter, vectorstore_search_kwargs,
+)
+from retriever.indexing import IndexedRetriever, chunk_id
+
+# Aramada anlam taşımayan sık kelimeler
+TURKISH_STOPWORDS = {
+    "acaba", "ama", "ancak", "bazı", "bir", "biri", "bu", "da", "daha", "de", "değil",
+    "diğer", "gibi", "hem", "hep", "her", "için", "ile", "ise", "kadar", "ki", "mi",
+    "mı", "mu", "mü", "nasıl", "ne", "neden", "nedir", "nelerdir", "o", "olan", "olarak",
+    "olur", "veya", "ve", "ya", "yani", "şu",
+}
+
+# Çekim ekleri (çoğul, iyelik, hal); uzun olanlar önce denenir
+TURKISH_SUFFIXES = sorted({
+    "lar", "ler", "ları", "leri", "ların", "lerin", "larda", "lerde", "lardan", "lerden",
+    "ın", "in", "un", "ün", "nın", "nin", "nun", "nün",
+    "ı", "i", "u", "ü", "yı", "yi", "yu", "yü", "sı", "si", "su", "sü",
+    "a", "e", "ya", "ye", "na", "ne",
+    "da", "de", "ta", "te", "nda", "nde",
+    "dan", "den", "tan", "ten", "ndan", "nden",
+    "la", "le", "yla", "yle",
+}, key=len, reverse=True)
+
+MIN_STEM_LENGTH = 4
+
+
+def turkish_lower(text):
+    """
+    Türkçe'ye uygun küçük harf dönüşümü (I -> ı, İ -> i).
+    """
+    return text.replace("I", "ı").replace("İ", "i").lower()
+
+
+@functools.lru_cache(maxsize=100_000)
+def stem(token):
+    """
+    Basit Türkçe gövdeleme: en fazla üç çekim ekini sondan atar, gövde MIN_STEM_LENGTH'ten kısalmaz.
+    "bütünlemeye", "bütünlemede" ve "bütünleme" aynı gövdeye iner.
+    """
+    for _ in range(3):
+        for suffix in TURKISH_SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM_LENGTH:
+                token = token[:-len(suffix)]
+                break
+        else:
+            break
+    # Ünsüz yumuşaması: "yönetmeliğin" -> "yönetmelik"
+    if token.endswith("ğ"):
+        token = token[:-1] + "k"
+    return token
+
+
+def tokenize(text):
+    """
+    Metni BM25 terimlerine ayırır. Sayılar (madde numaraları) olduğu gibi korunur.
+    """
+    tokens = []
+    for token in re.findall(r"\w+", turkish_lower(text)):
+        if token in TURKISH_STOPWORDS:
+            continue
+        tokens.append(token if token.isdigit() else stem(token))
+    return tokens
+
+
+class BM25Index:
+    """
+    Parçalar üzerinde süreç içi ters indeks (BM25).
+
+    Terim ağırlıkları (idf * normalize tf) indeks kurulurken hesaplanır; arama
+    yalnızca sorgu terimlerinin posting listelerini toplar. İndeks değiştiğinde
+    bir sonraki aramada yeniden kurulur.
+    """
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._documents = {}
+        self._term_counts = {}
+        self._lock = threading.Lock()
+        # (dokümanlar, term -> (doküman indeksleri, ağırlıklar)); değişince None olur
+        self._snapshot = None
+        # (dokümanlar, MetadataIndex); filtreli ilk aramada kurulur
+        self._metadata_index = None
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore, **kwargs):
+        """
+        Chroma'daki tüm parçalardan indeks kurar.
+        """
+        index = cls(**kwargs)
+        data = vectorstore.get(include=["documents", "metadatas"])
+        documents = {
+            cid: Document(page_content=text, metadata=metadata or {}, id=cid)
+            for cid, text, metadata in zip(data["ids"], data["documents"], data["metadatas"])
+        }
+        index.update(documents, [])
+        return index
+
+    def __len__(self):
+        return len(self._documents)
+
+    def update(self, added, deleted):
+        """
+        added: {parça kimliği: Document}, deleted: silinen parça kimlikleri.
+        DocumentIndexer dinleyicisi olarak da kullanılır.
+        """
+        if not added and not deleted:
+            return
+        with self._lock:
+            for cid in deleted:
+                self._documents.pop(cid, None)
+                self._term_counts.pop(cid, None)
+            for cid, document in added.items():
+                terms = {}
+                for term in tokenize(document.page_content):
+                    terms[term] = terms.get(term, 0) + 1
+                self._documents[cid] = document
+                self._term_counts[cid] = terms
+            self._snapshot = None
+
+    def _build(self):
+        ids = list(self._documents)
+        lengths = np.array([sum(self._term_counts[cid].values()) for cid in ids], dtype=np.float32)
+        avg_length = float(lengths.mean()) if len(ids) else 0.0
+        norms = self.k1 * (1 - self.b + self.b * lengths / (avg_length or 1.0))
+
+        postings = {}
+        for i, cid in enumerate(ids):
+            for term, tf in self._term_counts[cid].items():
+                postings.setdefault(term, ([], []))
+                postings[term][0].append(i)
+                postings[term][1].append(tf)
+
+        weighted = {}
+        for term, (doc_indices, tfs) in postings.items():
+            doc_indices = np.array(doc_indices, dtype=np.int32)
+            tfs = np.array(tfs, dtype=np.float32)
+            idf = np.log(1 + (len(ids) - len(doc_indices) + 0.5) / (len(doc_indices) + 0.5))
+            weighted[term] = (doc_indices, idf * tfs * (self.k1 + 1) / (tfs + norms[doc_indices]))
+        return [self._documents[cid] for cid in ids], weighted
+
+    def _get_snapshot(self):
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._build()
+                snapshot = self._snapshot
+        return snapshot
+
+    def _metadata_index_for(self, documents):
+        cached = self._metadata_index
+        if cached is None or cached[0] is not documents:
+            cached = (documents, MetadataIndex([document.metadata for document in documents]))
+            self._metadata_index = cached
+        return cached[1]
+
+    def values(self, field):
+        """
+        Parçaların metadata'sındaki bir alanın farklı değerleri (ör. bölümler).
+        """
+        documents, _ = self._get_snapshot()
+        return self._metadata_index_for(documents).values(field)
+
+    def search(self, query, k=20, filter=None):
+        """
+        En yüksek BM25 skorlu k parçayı [(Document, skor)] olarak döndürür.
+        filter verilirse yalnızca metadata'sı filtreye uyan parçalar döner.
+        """
+        documents, postings = self._get_snapshot()
+        terms = [term for term in set(tokenize(query)) if term in postings]
+        if not terms:
+            return []
+
+        scores = np.zeros(len(documents), dtype=np.float32)
+        for term in terms:
+            doc_indices, weights = postings[term]
+            scores[doc_indices] += weights
+
+        if filter:
+            allowed = np.zeros(len(documents), dtype=bool)
+            allowed[self._metadata_index_for(documents).select(normalize_filter(filter))] = True
+            scores[~allowed] = 0
+
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(documents[i], float(scores[i])) for i in candidates]
+
+
+def reciprocal_rank_fusion(result_lists, k=60, limit=None):
+    """
+    Birden fazla sıralı doküman listesini RRF ile birleştirir: skor = sum(1 / (k + sıra)).
+    Aynı içerik (parça kimliği) listelerde tek doküman sayılır.
+    """
+    scores = {}
+    documents = {}
+    for results in result_lists:
+        for rank, document in enumerate(results, 1):
+            cid = chunk_id(document)
+            scores[cid] = scores.get(cid, 0.0) + 1.0 / (k + rank)
+            documents.setdefault(cid, document)
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    return [documents[cid] for cid in ranked[:limit]]
+
+
+class HybridRetriever(IndexedRetriever):
+    """
+    Chroma benzerlik aramasını BM25 anahtar kelime aramasıyla birleştiren retriever.
+    Her iki aramadan fetch_k aday alınır, RRF ile birleştirilir ve ilk k döner.
+    Madde numaraları ve "bütünleme", "mazeret" gibi terimler yoğun vektörlerde
+    kaybolsa da BM25 ile bulunur. add_documents ile eklenen parçalar BM25'e de eklenir.
+
+    invoke(query, filter={...}) ile her iki arama da metadata'ya göre süzülür. auto_filter
+    açıksa ve filtre verilmemişse, soruda geçen bölüm adı filtre olarak kullanılır.
+    """
+
+    bm25: Any = None
+    k: int = 3
+    fetch_k: int = 20
+    rrf_k: int = 60
+    auto_filter: bool = False
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun, **kwargs: Any
+    ) -> List[Document]:
+        filter = kwargs.get("filter")
+        if filter is None and self.auto_filter:
+            filter = infer_department_filter(query, self.bm25.values("department"))
+        vector_results = self.vectorstore.similarity_search(
+            query, k=self.fetch_k, **vectorstore_search_kwargs(self.vectorstore, filter)
+        )
+        keyword_results = [document for document, _ in self.bm25.search(query, k=self.fetch_k, filter=filter)]
+        return reciprocal_rank_fusion([vector_results, keyword_results], k=self.rrf_k, limit=self.k)
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: Any, **kwargs: Any) -> List[Document]:
+        return await run_in_executor(
+            None, self._get_relevant_documents, query, run_manager=run_manager.get_sync(), **kwargs
+        )
@@ -0,0 +1,99 @@
+"""
+Büyük korpuslar için toplu indeks oluşturma.
+
+Kaynaklar tek tek yüklenip bölünür, yerel HuggingFace modeli ile birden fazla
+süreçte batch'ler halinde embed edilir ve Chroma'ya sınırlı parçalar halinde
+yazılır. Bellekte aynı anda yalnızca bir kaynak tutulur. Aynı manifest ve
+embedding önbelleği kullanıldığından, sonradan setup_retriever bu kaynakları
+değişmemiş kabul eder.
+
+Çalıştırma:
+    python -m retriever.index_builder data/ --embedding bert --db chroma_bert --workers 4
+"""
+import sys
+import os
+import argparse
+import glob
+import importlib
+import logging
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from embeddings.cached_embedding import with_embedding_cache
+from embeddings.parallel_embedding import ParallelEmbeddings
+from retriever.retriever import open_index
+from utils.loader import load_pdf
+
+# Çok süreçli embedding'i destekleyen yerel modeller (main.embedding_models anahtarları)
+LOCAL_EMBEDDING_MODELS = ["bert", "huggingface", "sentence_transformer", "instructor"]
+
+
+def expand_paths(paths):
+    """
+    Dizinleri içlerindeki PDF dosyalarına genişletir.
+    """
+    expanded = []
+    for path in paths:
+        if os.path.isdir(path):
+            expanded.extend(sorted(glob.glob(os.path.join(path, "**", "*.pdf"), recursive=True)))
+        else:
+            expanded.append(path)
+    return expanded
+
+
+def build_index(paths, embedding="bert", db_name="chroma_bert", workers=None, batch_size=64, write_batch_size=None):
+    """
+    Verilen PDF'leri indeksler ve toplam istatistikleri döndürür.
+    write_batch_size verilmezse her yazımda tüm süreçlere ikişer batch düşecek şekilde seçilir.
+    """
+    if embedding not in LOCAL_EMBEDDING_MODELS:
+        raise ValueError(f"Çok süreçli embedding yalnızca yerel modellerde desteklenir: {LOCAL_EMBEDDING_MODELS}")
+    model_name = importlib.import_module(f"embeddings.{embedding}_embedding").MODEL_NAME
+
+    parallel_model = ParallelEmbeddings(model_name, workers=workers, batch_size=batch_size)
+    if write_batch_size is None:
+        write_batch_size = parallel_model.workers * batch_size * 2
+    # Önbellekte olmayan metinler de yazım boyutunda gruplanır ki tüm süreçler aynı anda çalışsın
+    embedding_model = with_embedding_cache(parallel_model, model_name, batch_size=write_batch_size)
+    _, indexer = open_index(embedding_model, db_name, write_batch_size=write_batch_size)
+
+    paths = expand_paths(paths)
+    totals = {"sources": 0, "added": 0, "deleted": 0, "skipped_sources": 0}
+    start = time.perf_counter()
+    try:
+        for i, path in enumerate(paths, 1):
+            documents = load_pdf(path)
+            result = indexer.index(documents)
+            totals["sources"] += 1
+            for key in ("added", "deleted", "skipped_sources"):
+                totals[key] += result[key]
+
+            elapsed = time.perf_counter() - start
+            logging.info(
+                f"[{i}/{len(paths)}] {path}: +{result['added']} / -{result['deleted']} parça | "
+                f"toplam {totals['added']} parça, {totals['added'] / elapsed:.1f} parça/sn, "
+                f"embedding {parallel_model.throughput:.1f} metin/sn"
+            )
+    finally:
+        parallel_model.close()
+
+    totals["seconds"] = round(time.perf_counter() - start, 2)
+    totals["embedded_texts"] = parallel_model.embedded_texts
+    totals["embedding_throughput"] = round(parallel_model.throughput, 1)
+    logging.info(f"İndeks oluşturma tamamlandı: {totals}")
+    return totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Toplu, çok süreçli indeks oluşturma")
+    parser.add_argument("paths", nargs="+", help="PDF dosyaları ya da dizinler")
+    parser.add_argument("--embedding", default="bert", choices=LOCAL_EMBEDDING_MODELS)
+    parser.add_argument("--db", default="chroma_bert", help="setup_retriever'daki db_name")
+    parser.add_argument("--workers", type=int, default=None, help="Embedding süreç sayısı")
+    parser.add_argument("--batch-size", type=int, default=64, help="Süreç başına embedding batch boyutu")
+    parser.add_argument("--write-batch-size", type=int, default=None, help="Chroma'ya tek seferde yazılan parça sayısı")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    build_index(args.paths, args.embedding, args.db, args.workers, args.batch_size, args.write_batch_size)
@@ -0,0 +1,250 @@
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import Counter
+from typing import Any, List
+
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.runnables.config import run_in_executor
+from langchain_core.vectorstores import VectorStoreRetriever
+
+from embeddings.cached_embedding import normalize_text, text_hash
+from retriever.filters import vectorstore_search_kwargs
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "index_manifest.json"
+# Chroma'ya tek seferde eklenecek/silinecek en fazla parça
+WRITE_BATCH_SIZE = 1000
+
+
+def source_hash(documents):
+    """
+    Bir kaynağın (dosyanın) tüm sayfalarının içeriğinden hash üretir.
+    """
+    digest = hashlib.sha256()
+    for doc in documents:
+        digest.update(normalize_text(doc.page_content).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def chunk_id(chunk):
+    """
+    Parça kimliği içerikten türetilir; aynı metin hangi kaynaktan gelirse gelsin tek kez saklanır.
+    Bölüm metadata'sı taşıyan parçalarda (taranmış sayfalar) bölüm de kimliğe katılır: iki bölümün
+    sitesinde geçen aynı duyuru her bölüm için ayrı saklanır, department filtresi ikisini de bulur.
+    Bölüm içinde paylaşılan parçanın metadata'sı (source, page, ...) onu ilk ekleyen kaynağınkidir;
+    parçaya başvuran tüm kaynaklar manifest'te tutulur (bkz. DocumentIndexer.sources_of).
+    """
+    department = chunk.metadata.get("department")
+    if department:
+        return text_hash(f"{department}\x00{chunk.page_content}")
+    return text_hash(chunk.page_content)
+
+
+def find_indexer(retriever):
+    """
+    Retriever'ın (ya da sardığı base_retriever'ların) kullandığı DocumentIndexer'ı döndürür; yoksa None.
+    """
+    while isinstance(retriever, BaseRetriever):
+        indexer = getattr(retriever, "indexer", None)
+        if isinstance(indexer, DocumentIndexer):
+            return indexer
+        retriever = getattr(retriever, "base_retriever", None)
+    return None
+
+
+class IndexManifest:
+    """
+    Kaynak -> (içerik hash'i, parça kimlikleri) eşlemesini JSON dosyasında tutar.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.sources = {}
+        self.exists = os.path.exists(path)
+        if self.exists:
+            with open(path, "r", encoding="utf-8") as file:
+                self.sources = json.load(file).get("sources", {})
+        # Bir parçaya kaç kaynağın referans verdiği; sıfıra inen parçalar silinir
+        self.refcounts = Counter(
+            cid for entry in self.sources.values() for cid in entry["chunk_ids"]
+        )
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump({"sources": self.sources}, file, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.exists = True
+
+
+class DocumentIndexer:
+    """
+    Vektör deposunu manifest'e göre artımlı günceller:
+    - İçeriği değişmemiş kaynaklar atlanır (bölme ve embedding yapılmaz).
+    - Yeni ya da değişmiş kaynakların yalnızca depoda olmayan parçaları eklenir.
+    - Değişen kaynakların artık kullanılmayan parçaları depodan silinir.
+    Başarılı her yazımdan sonra listeners'daki nesnelerin update(eklenenler, silinenler)
+    metodu çağrılır (ör. BM25 indeksinin depoyla eş tutulması için).
+    """
+
+    def __init__(self, vectorstore, manifest_path, text_splitter, write_batch_size=WRITE_BATCH_SIZE):
+        self.vectorstore = vectorstore
+        self.manifest = IndexManifest(manifest_path)
+        self.text_splitter = text_splitter
+        self.write_batch_size = write_batch_size
+        self.listeners = []
+        self._lock = threading.Lock()
+
+    def _reset_legacy_collection(self):
+        # Manifest'siz oluşturulmuş eski bir veritabanındaki parçaların kimlikleri rastgeledir;
+        # içerik kimlikleriyle yeniden eklenmeleri için temizlenir (vektörler embedding önbelleğinden gelir).
+        existing_ids = self.vectorstore.get(include=[])["ids"]
+        if existing_ids:
+            logger.warning(f"Manifest bulunamadı, mevcut {len(existing_ids)} parça yeniden indekslenecek.")
+            for start in range(0, len(existing_ids), self.write_batch_size):
+                self.vectorstore.delete(ids=existing_ids[start:start + self.write_batch_size])
+
+    def chunk_ids(self, sources):
+        """
+        Verilen kaynakların depodaki parça kimlikleri (kaynak sırasıyla, tekrarsız).
+        """
+        ids = []
+        seen = set()
+        with self._lock:
+            for source in sources:
+                entry = self.manifest.sources.get(source)
+                for cid in (entry["chunk_ids"] if entry else []):
+                    if cid not in seen:
+                        seen.add(cid)
+                        ids.append(cid)
+        return ids
+
+    def sources_of(self, cid):
+        """
+        Parçaya başvuran tüm kaynaklar; depodaki metadata yalnızca ilkini gösterir.
+        """
+        with self._lock:
+            return [source for source, entry in self.manifest.sources.items() if cid in entry["chunk_ids"]]
+
+    def index(self, documents: List[Document], delete_missing_sources=False):
+        """
+        Dokümanları indeksler ve {"added", "deleted", "skipped_sources"} sayılarını döndürür.
+        delete_missing_sources True ise verilen dokümanlar arasında olmayan kaynaklar silinir.
+        """
+        by_source = {}
+        for doc in documents:
+            by_source.setdefault(doc.metadata.get("source", "unknown"), []).append(doc)
+
+        with self._lock:
+            manifest = self.manifest
+            if not manifest.exists:
+                self._reset_legacy_collection()
+
+            to_add = {}
+            to_delete = set()
+            skipped = 0
+            changed_sources = {}
+
+            for source, source_docs in by_source.items():
+                content_hash = source_hash(source_docs)
+                old_entry = manifest.sources.get(source)
+                if old_entry and old_entry["hash"] == content_hash:
+                    skipped += 1
+                    continue
+
+                chunks = self.text_splitter.split_documents(source_docs)
+                new_ids = []
+                seen = set()
+                for chunk in chunks:
+                    cid = chunk_id(chunk)
+                    if cid in seen:
+                        continue
+                    seen.add(cid)
+                    new_ids.append(cid)
+                    if manifest.refcounts[cid] <= 0 and cid not in to_add:
+                        to_add[cid] = chunk
+
+                old_ids = old_entry["chunk_ids"] if old_entry else []
+                manifest.refcounts.update(new_ids)
+                manifest.refcounts.subtract(old_ids)
+                changed_sources[source] = {"hash": content_hash, "chunk_ids": new_ids}
+
+            if delete_missing_sources:
+                for source in list(manifest.sources):
+                    if source not in by_source:
+                        manifest.refcounts.subtract(manifest.sources[source]["chunk_ids"])
+                        changed_sources[source] = None
+
+            for source, entry in changed_sources.items():
+                old_entry = manifest.sources.get(source)
+                for cid in (old_entry["chunk_ids"] if old_entry else []):
+                    if manifest.refcounts[cid] <= 0:
+                        to_delete.add(cid)
+                if entry is None:
+                    manifest.sources.pop(source, None)
+                else:
+                    manifest.sources[source] = entry
+            to_delete -= set(to_add)
+            for cid in to_delete:
+                del manifest.refcounts[cid]
+
+            add_ids = list(to_add)
+            delete_ids = list(to_delete)
+            # Destekleyen depolar (QuantizedVectorStore) batch'leri diske blok sonunda bir kez yazar
+            bulk_load = getattr(self.vectorstore, "bulk_load", None)
+            try:
+                with bulk_load() if bulk_load else contextlib.nullcontext():
+                    for start in range(0, len(add_ids), self.write_batch_size):
+                        batch_ids = add_ids[start:start + self.write_batch_size]
+                        self.vectorstore.add_documents([to_add[cid] for cid in batch_ids], ids=batch_ids)
+                    for start in range(0, len(delete_ids), self.write_batch_size):
+                        self.vectorstore.delete(ids=delete_ids[start:start + self.write_batch_size])
+            except Exception:
+                # Bellekteki manifest diske yazılmış son tutarlı hale döndürülür
+                self.manifest = IndexManifest(manifest.path)
+                raise
+
+            if changed_sources:
+                manifest.save()
+            for listener in self.listeners:
+                listener.update(to_add, delete_ids)
+
+        result = {"added": len(add_ids), "deleted": len(delete_ids), "skipped_sources": skipped}
+        logger.info(f"İndeksleme tamamlandı: {result}")
+        return result
+
+
+class IndexedRetriever(VectorStoreRetriever):
+    """
+    add_documents çağrılarını DocumentIndexer üzerinden yapan retriever; aynı
+    dosya tekrar eklendiğinde parçalar çoğaltılmaz. add_documents, eklenen kaynakların
+    depodaki parça kimliklerini döndürür (girdi dokümanlarının değil; başka bir kaynakta
+    zaten olan parçalar da dahildir). invoke(query, filter={...}) filtresi depoya uygun
+    sözdizimine çevrilir (bkz. retriever.filters).
+    """
+
+    indexer: Any = None
+
+    def _get_relevant_documents(self, query: str, *, run_manager: Any, **kwargs: Any) -> List[Document]:
+        kwargs.update(vectorstore_search_kwargs(self.vectorstore, kwargs.pop("filter", None)))
+        return super()._get_relevant_documents(query, run_manager=run_manager, **kwargs)
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: Any, **kwargs: Any) -> List[Document]:
+        kwargs.update(vectorstore_search_kwargs(self.vectorstore, kwargs.pop("filter", None)))
+        return await super()._aget_relevant_documents(query, run_manager=run_manager, **kwargs)
+
+    def add_documents(self, documents: List[Document], **kwargs: Any) -> List[str]:
+        self.indexer.index(documents)
+        sources = dict.fromkeys(doc.metadata.get("source", "unknown") for doc in documents)
+        return self.indexer.chunk_ids(sources)
+
+    async def aadd_documents(self, documents: List[Document], **kwargs: Any) -> List[str]:
+        return await run_in_executor(None, self.add_documents, documents, **kwargs)
@@ -0,0 +1,466 @@
+import json
+import logging
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from retriever.filters import MetadataIndex, matches, normalize_filter
+from retriever.quantized_store import SCAN_BLOCK_SIZE, _normalize, _top_indices
+
+try:
+    import fcntl
+except ImportError:  # Windows: süreçler arası yazma kilidi yok, tek yazıcı varsayılır
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+CURRENT_FILE = "current.json"
+LOCK_FILE = "write.lock"
+
+
+class _Snapshot:
+    """
+    Aramaların kilitsiz okuduğu, değişiklikte yeniden oluşturulan görünüm.
+    """
+
+    __slots__ = (
+        "base", "base_ids", "base_texts", "base_metadatas", "base_live",
+        "append", "append_ids", "append_texts", "append_metadatas", "append_live",
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields[name])
+
+    def row(self, i):
+        n = len(self.base_ids)
+        if i < n:
+            return self.base_ids[i], self.base_texts[i], self.base_metadatas[i]
+        i -= n
+        return self.append_ids[i], self.append_texts[i], self.append_metadatas[i]
+
+    def live_rows(self):
+        rows = list(np.flatnonzero(self.base_live))
+        n = len(self.base_ids)
+        rows.extend(n + j for j, live in enumerate(self.append_live) if live)
+        return rows
+
+
+class MmapVectorStore(VectorStore):
+    """
+    Çok okunan, az yazılan iş yükü için bellek eşlemeli (mmap) vektör deposu.
+
+    - Ana segment: tek parça float16/float32 matris (base-<nesil>.npy) ve kimlik/metin/metadata
+      dosyası (base-<nesil>.json). mmap ile açılır; aynı dosyayı açan tüm worker süreçleri
+      işletim sisteminin sayfa önbelleğindeki tek kopyayı paylaşır, açılış bir dosya açmaktır.
+    - Yazımlar (add/delete) ekleme segmentine gider: append-<nesil>.vec (float32 satırlar) ve
+      append-<nesil>.jsonl (işlem kaydı). Diğer süreçler yeni kayıtları aramadan önce okur.
+    - Ekleme segmenti compact_threshold satırı geçince arka planda yeni bir nesil olarak
+      ana segmentle birleştirilir; current.json yeni nesli gösterince okuyucular ona geçer.
+    - filter verilirse ana segmentin metadata indeksiyle uygun satırlar seçilir ve
+      yalnızca onlar okunup taranır.
+    - Arama kosinüs benzerliğiyle NumPy matris çarpımıyla yapılır. float16 dosyayı yarıya
+      indirir ama NumPy'da float32'ye çevrilerek (bloklar halinde) çarpıldığı için yavaştır.
+    """
+
+    # Filtreler Chroma where sözdizimine çevrilmeden, olduğu gibi verilir
+    supports_metadata_index = True
+
+    def __init__(
+        self,
+        embedding_function: Embeddings,
+        persist_directory: str,
+        dtype: str = "float32",
+        compact_threshold: int = 5000,
+        auto_compact: bool = True,
+    ):
+        self._embedding = embedding_function
+        self.persist_directory = persist_directory
+        self.dtype = np.dtype(dtype)
+        self.compact_threshold = compact_threshold
+        self.auto_compact = auto_compact
+        self._lock = threading.RLock()
+        self._compaction = None
+        # (ana segment kimlik listesi, MetadataIndex); nesil değişince yeniden kurulur
+        self._base_index = None
+
+        self._current_stat = None
+        self._generation = None
+        self.dim = None
+        self._snapshot = None
+
+        os.makedirs(persist_directory, exist_ok=True)
+        if not os.path.exists(self._path(CURRENT_FILE)):
+            with self._write_lock():
+                if not os.path.exists(self._path(CURRENT_FILE)):
+                    self._write_current(0, None)
+        self._refresh()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def __len__(self):
+        snapshot = self._get_snapshot()
+        return int(snapshot.base_live.sum()) + sum(snapshot.append_live)
+
+    def _path(self, name):
+        return os.path.join(self.persist_directory, name)
+
+    @contextmanager
+    def _write_lock(self):
+        """
+        Süreç içi ve (destekleniyorsa) süreçler arası yazma kilidi.
+        """
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self._path(LOCK_FILE), "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write_current(self, generation, dim):
+        tmp_path = self._path(f"{CURRENT_FILE}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump({"generation": generation, "dim": dim, "dtype": self.dtype.name}, file)
+        os.replace(tmp_path, self._path(CURRENT_FILE))
+
+    # Okuma tarafı
+
+    def _open_generation(self, current):
+        generation = current["generation"]
+        self.dim = current["dim"]
+        base_path = self._path(f"base-{generation}.npy")
+        if os.path.exists(base_path):
+            self._base = np.load(base_path, mmap_mode="r")
+            with open(self._path(f"base-{generation}.json"), "r", encoding="utf-8") as file:
+                sidecar = json.load(file)
+            self._base_ids, self._base_texts, self._base_metadatas = sidecar["ids"], sidecar["texts"], sidecar["metadatas"]
+        else:
+            self._base = None
+            self._base_ids, self._base_texts, self._base_metadatas = [], [], []
+        self._base_live = np.ones(len(self._base_ids), dtype=bool)
+        self._rows = {cid: (0, i) for i, cid in enumerate(self._base_ids)}
+
+        self._append_vectors = []
+        self._append_ids, self._append_texts, self._append_metadatas, self._append_live = [], [], [], []
+        self._log_offset = 0
+        self._generation = generation
+
+    def _mark_dead(self, row):
+        segment, i = row
+        if segment == 0:
+            self._base_live[i] = False
+        else:
+            self._append_live[i] = False
+
+    def _read_append_log(self):
+        """
+        Ekleme segmentinin henüz okunmamış kayıtlarını uygular. Değişiklik varsa True döner.
+        """
+        log_path = self._path(f"append-{self._generation}.jsonl")
+        if not os.path.exists(log_path) or os.path.getsize(log_path) == self._log_offset:
+            return False
+        with open(log_path, "rb") as file:
+            file.seek(self._log_offset)
+            data = file.read()
+        # Yarım yazılmış son satır bir sonraki okumaya bırakılır
+        data = data[:data.rfind(b"\n") + 1]
+        if not data:
+            return False
+        records = [json.loads(line) for line in data.splitlines()]
+        added = sum(1 for record in records if record["op"] == "add")
+
+        vectors = np.empty((0, self.dim or 0), dtype=np.float32)
+        if added:
+            row_bytes = self.dim * 4
+            with open(self._path(f"append-{self._generation}.vec"), "rb") as file:
+                file.seek(len(self._append_ids) * row_bytes)
+                vectors = np.frombuffer(file.read(added * row_bytes), dtype=np.float32).reshape(added, self.dim)
+
+        next_vector = 0
+        for record in records:
+            cid = record["id"]
+            if cid in self._rows:
+                self._mark_dead(self._rows.pop(cid))
+            if record["op"] == "add":
+                self._rows[cid] = (1, len(self._append_ids))
+                self._append_ids.append(cid)
+                self._append_texts.append(record["text"])
+                self._append_metadatas.append(record["metadata"])
+                self._append_live.append(True)
+                self._append_vectors.append(vectors[next_vector])
+                next_vector += 1
+        self._log_offset += len(data)
+        return True
+
+    def _refresh(self, blocking=True):
+        """
+        current.json ya da ekleme segmenti değiştiyse görünümü günceller.
+        """
+        if not self._lock.acquire(blocking=blocking):
+            # Sıkıştırma sürüyor: mevcut görünümle devam edilir
+            return
+        try:
+            stat = os.stat(self._path(CURRENT_FILE))
+            stat_key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            changed = False
+            if stat_key != self._current_stat:
+                with open(self._path(CURRENT_FILE), "r", encoding="utf-8") as file:
+                    current = json.load(file)
+                self._current_stat = stat_key
+                if current["generation"] != self._generation:
+                    self._open_generation(current)
+                    changed = True
+                self.dim = current["dim"]
+            changed = self._read_append_log() or changed
+            if changed or self._snapshot is None:
+                self._snapshot = _Snapshot(
+                    base=self._base,
+                    base_ids=self._base_ids,
+                    base_texts=self._base_texts,
+                    base_metadatas=self._base_metadatas,
+                    base_live=self._base_live.copy(),
+                    append=np.array(self._append_vectors, dtype=np.float32).reshape(len(self._append_vectors), self.dim or 0),
+                    append_ids=list(self._append_ids),
+                    append_texts=list(self._append_texts),
+                    append_metadatas=list(self._append_metadatas),
+                    append_live=list(self._append_live),
+                )
+        finally:
+            self._lock.release()
+
+    def _get_snapshot(self):
+        self._refresh(blocking=False)
+        return self._snapshot
+
+    # Yazma tarafı
+
+    def _append_records(self, records, vectors=None):
+        with self._write_lock():
+            self._refresh()
+            if vectors is not None and self.dim is None:
+                self.dim = vectors.shape[1]
+                self._write_current(self._generation, self.dim)
+                self._refresh()
+            # Önce vektörler yazılır; okuyucular yalnızca kaydı tamamlanmış satırları okur
+            if vectors is not None:
+                with open(self._path(f"append-{self._generation}.vec"), "ab") as file:
+                    file.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+            with open(self._path(f"append-{self._generation}.jsonl"), "ab") as file:
+                file.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode("utf-8"))
+            self._refresh()
+            pending = len(self._append_ids)
+
+        if self.auto_compact and pending >= self.compact_threshold:
+            self.compact_in_background()
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        vectors = _normalize(self._embedding.embed_documents(texts))
+        records = [
+            {"op": "add", "id": cid, "text": text, "metadata": metadata or {}}
+            for cid, text, metadata in zip(ids, texts, metadatas)
+        ]
+        self._append_records(records, vectors)
+        return list(ids)
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if not ids:
+            return None
+        self._append_records([{"op": "delete", "id": cid} for cid in ids])
+        return True
+
+    def compact(self):
+        """
+        Ana segmenti ve ekleme segmentini yeni bir nesilde tek matris olarak birleştirir.
+        Matris bloklar halinde yazılır; tüm indeks aynı anda belleğe alınmaz.
+        """
+        with self._write_lock():
+            self._refresh()
+            snapshot = self._snapshot
+            rows = snapshot.live_rows()
+            generation = self._generation + 1
+            n_base = len(snapshot.base_ids)
+
+            if rows:
+                tmp_path = self._path(f"base-{generation}.tmp.npy")
+                matrix = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=self.dtype, shape=(len(rows), self.dim))
+                for start in range(0, len(rows), SCAN_BLOCK_SIZE):
+                    block_rows = rows[start:start + SCAN_BLOCK_SIZE]
+                    matrix[start:start + len(block_rows)] = [
+                        snapshot.base[i] if i < n_base else snapshot.append[i - n_base] for i in block_rows
+                    ]
+                matrix.flush()
+                del matrix
+                os.replace(tmp_path, self._path(f"base-{generation}.npy"))
+
+                ids, texts, metadatas = zip(*(snapshot.row(i) for i in rows))
+                tmp_path = self._path(f"base-{generation}.json.tmp")
+                with open(tmp_path, "w", encoding="utf-8") as file:
+                    json.dump({"ids": ids, "texts": texts, "metadatas": metadatas}, file, ensure_ascii=False)
+                os.replace(tmp_path, self._path(f"base-{generation}.json"))
+
+            old_generation = self._generation
+            self._write_current(generation, self.dim)
+            self._refresh()
+
+            # Eski dosyaları açık tutan süreçler (mmap) silmeden etkilenmez
+            for name in (f"base-{old_generation}.npy", f"base-{old_generation}.json",
+                         f"append-{old_generation}.vec", f"append-{old_generation}.jsonl"):
+                try:
+                    os.remove(self._path(name))
+                except OSError:
+                    pass
+            logger.info(f"Vektör deposu sıkıştırıldı: nesil {generation}, {len(rows)} vektör.")
+
+    def compact_in_background(self):
+        """
+        Sıkıştırmayı (zaten çalışmıyorsa) arka plan thread'inde başlatır.
+        """
+        with self._lock:
+            if self._compaction is not None and self._compaction.is_alive():
+                return self._compaction
+            self._compaction = threading.Thread(target=self.compact, name="VectorStoreCompaction", daemon=True)
+            self._compaction.start()
+            return self._compaction
+
+    def get(self, ids=None, include=("documents", "metadatas")):
+        """
+        Chroma'nın get() çıktısıyla aynı biçimde (ids, documents, metadatas) kayıtları döndürür.
+        """
+        snapshot = self._get_snapshot()
+        rows = [snapshot.row(i) for i in snapshot.live_rows()]
+        if ids is not None:
+            wanted = set(ids)
+            rows = [row for row in rows if row[0] in wanted]
+        result = {"ids": [row[0] for row in rows]}
+        if "documents" in include:
+            result["documents"] = [row[1] for row in rows]
+        if "metadatas" in include:
+            result["metadatas"] = [row[2] for row in rows]
+        return result
+
+    # Arama
+
+    def _scores(self, snapshot, query):
+        n_base = len(snapshot.base_ids)
+        scores = np.empty(n_base + len(snapshot.append_ids), dtype=np.float32)
+        if n_base:
+            if snapshot.base.dtype == np.float32:
+                scores[:n_base] = snapshot.base @ query
+            else:
+                # float16 matris çarpımı BLAS kullanmaz; bloklar float32'ye çevrilir
+                for start in range(0, n_base, SCAN_BLOCK_SIZE):
+                    block = snapshot.base[start:start + SCAN_BLOCK_SIZE].astype(np.float32)
+                    scores[start:start + len(block)] = block @ query
+            scores[:n_base][~snapshot.base_live] = -np.inf
+        if snapshot.append_ids:
+            scores[n_base:] = snapshot.append @ query
+            scores[n_base:][~np.array(snapshot.append_live)] = -np.inf
+        return scores
+
+    def _base_metadata_index(self, snapshot):
+        cached = self._base_index
+        if cached is None or cached[0] is not snapshot.base_ids:
+            cached = (snapshot.base_ids, MetadataIndex(snapshot.base_metadatas))
+            self._base_index = cached
+        return cached[1]
+
+    def _filtered_rows(self, snapshot, conditions):
+        """
+        Filtreye uyan canlı satırlar (ana segment indeksten, ekleme segmenti tek tek).
+        """
+        n_base = len(snapshot.base_ids)
+        base_rows = np.empty(0, dtype=np.int64)
+        if n_base:
+            base_rows = self._base_metadata_index(snapshot).select(conditions)
+            base_rows = base_rows[snapshot.base_live[base_rows]]
+        append_rows = [
+            n_base + j
+            for j, (live, metadata) in enumerate(zip(snapshot.append_live, snapshot.append_metadatas))
+            if live and all(matches(metadata, *condition) for condition in conditions)
+        ]
+        return np.concatenate([base_rows, np.array(append_rows, dtype=np.int64)])
+
+    def _row_scores(self, snapshot, rows, query):
+        n_base = len(snapshot.base_ids)
+        base_rows = rows[rows < n_base]
+        append_rows = rows[rows >= n_base] - n_base
+        scores = np.empty(len(rows), dtype=np.float32)
+        for start in range(0, len(base_rows), SCAN_BLOCK_SIZE):
+            # Yalnızca seçilen satırlar diskten/sayfa önbelleğinden okunur
+            block = np.asarray(snapshot.base[base_rows[start:start + SCAN_BLOCK_SIZE]], dtype=np.float32)
+            scores[start:start + len(block)] = block @ query
+        if len(append_rows):
+            scores[len(base_rows):] = snapshot.append[append_rows] @ query
+        return scores
+
+    def _search(self, embedding, k, filter=None):
+        snapshot = self._get_snapshot()
+        if not snapshot.base_ids and not snapshot.append_ids:
+            return []
+        query = _normalize([embedding])[0]
+        if filter:
+            rows = self._filtered_rows(snapshot, normalize_filter(filter))
+            scores = self._row_scores(snapshot, rows, query)
+        else:
+            rows = None
+            scores = self._scores(snapshot, query)
+        results = []
+        for i in _top_indices(scores, k):
+            if scores[i] == -np.inf:
+                break
+            cid, text, metadata = snapshot.row(i if rows is None else rows[i])
+            results.append((Document(page_content=text, metadata=metadata, id=cid), 1.0 - float(scores[i])))
+        return results
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        return self._search(self._embedding.embed_query(query), k, filter)
+
+    def similarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> List[Document]:
+        return [document for document, _ in self._search(embedding, k, filter)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [document for document, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def _select_relevance_score_fn(self):
+        return self._cosine_relevance_score_fn
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ):
+        store = cls(embedding_function=embedding, **kwargs)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
@@ -0,0 +1,427 @@
+import contextlib
+import json
+import logging
+import os
+import threading
+import uuid
+from typing import Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from retriever.filters import MetadataIndex, normalize_filter
+
+logger = logging.getLogger(__name__)
+
+QUANTIZATIONS = ("int8", "pq")
+# Kaba aramada tek seferde float32'ye çevrilen satır sayısı (geçici bellek sınırı)
+SCAN_BLOCK_SIZE = 1024
+# PQ kod kitabı eğitimi için gereken en az vektör (alt uzay başına 256 merkez)
+PQ_MIN_TRAIN_SIZE = 1024
+PQ_CENTROIDS = 256
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _top_indices(scores, k):
+    if len(scores) > k:
+        indices = np.argpartition(-scores, k - 1)[:k]
+    else:
+        indices = np.arange(len(scores))
+    return indices[np.argsort(-scores[indices], kind="stable")]
+
+
+def _pq_subspaces(dim, requested):
+    """
+    Boyutu tam bölen, istenenden büyük olmayan en büyük alt uzay sayısı.
+    """
+    for m in range(min(requested, dim), 0, -1):
+        if dim % m == 0:
+            return m
+    return 1
+
+
+def train_pq(vectors, subspaces, iterations=15, sample_size=20000, seed=0):
+    """
+    Her alt uzay için k-means ile 256 merkezli kod kitabı eğitir: (m, 256, d/m).
+    """
+    rng = np.random.default_rng(seed)
+    if len(vectors) > sample_size:
+        vectors = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    vectors = np.asarray(vectors, dtype=np.float32)
+    sub_dim = vectors.shape[1] // subspaces
+    codebook = np.empty((subspaces, PQ_CENTROIDS, sub_dim), dtype=np.float32)
+
+    for j in range(subspaces):
+        x = vectors[:, j * sub_dim:(j + 1) * sub_dim]
+        centroids = x[rng.choice(len(x), PQ_CENTROIDS, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = _nearest_centroids(x, centroids)
+            counts = np.bincount(assignments, minlength=PQ_CENTROIDS)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, x)
+            filled = counts > 0
+            centroids[filled] = sums[filled] / counts[filled, None]
+        codebook[j] = centroids
+    return codebook
+
+
+def _nearest_centroids(x, centroids):
+    distances = (centroids ** 2).sum(axis=1)[None, :] - 2 * x @ centroids.T
+    return distances.argmin(axis=1)
+
+
+def encode_pq(vectors, codebook):
+    subspaces, _, sub_dim = codebook.shape
+    codes = np.empty((len(vectors), subspaces), dtype=np.uint8)
+    for j in range(subspaces):
+        codes[:, j] = _nearest_centroids(vectors[:, j * sub_dim:(j + 1) * sub_dim], codebook[j])
+    return codes
+
+
+def encode_int8(vectors):
+    """
+    Vektör başına simetrik ölçekle int8'e çevirir: v ≈ kod * ölçek.
+    """
+    scales = np.maximum(np.abs(vectors).max(axis=1), 1e-12) / 127.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+class _State:
+    """
+    Aramaların kilitsiz okuduğu, yazımda bütünüyle değiştirilen indeks durumu.
+    """
+
+    __slots__ = ("ids", "texts", "metadatas", "codes", "scales", "vectors", "_metadata_index")
+
+    def __init__(self, ids, texts, metadatas, codes, scales, vectors):
+        self.ids = ids
+        self.texts = texts
+        self.metadatas = metadatas
+        self.codes = codes
+        self.scales = scales
+        self.vectors = vectors
+        self._metadata_index = None
+
+    @property
+    def metadata_index(self):
+        # İlk filtreli aramada kurulur
+        if self._metadata_index is None:
+            self._metadata_index = MetadataIndex(self.metadatas)
+        return self._metadata_index
+
+
+class QuantizedVectorStore(VectorStore):
+    """
+    Chroma yerine kullanılabilen, nicemlenmiş (quantized) yerel vektör deposu.
+
+    - int8: her vektör 1 bayt/boyut + 4 bayt ölçekle tutulur (float32'nin ~1/4'ü).
+    - pq: product quantization; vektör başına yalnızca m bayt. Kod kitabı yeterli
+      vektör (PQ_MIN_TRAIN_SIZE) birikince eğitilir, o zamana kadar tam arama yapılır.
+    - Kaba aramanın en iyi k * rescore_factor adayı, diskteki tam (float32) vektörlerle
+      yeniden puanlanır. persist_directory verilirse tam vektörler bellek eşlemeli
+      (mmap) okunur; RAM'de yalnızca kodlar tutulur.
+    - Benzerlik kosinüstür; skorlar Chroma gibi mesafe (1 - kosinüs) olarak döner.
+    - filter verilirse (bkz. retriever.filters) uygun satırlar metadata indeksinden
+      seçilir ve yalnızca onlar taranır.
+    - Her yazım tüm dosyaları yeniden yazar; toplu yüklemeler bulk_load() bloğu içinde
+      yapılırsa dosyalar blok sonunda bir kez yazılır (DocumentIndexer bunu kullanır).
+    """
+
+    # Filtreler Chroma where sözdizimine çevrilmeden, olduğu gibi verilir
+    supports_metadata_index = True
+
+    def __init__(
+        self,
+        embedding_function: Embeddings,
+        persist_directory: Optional[str] = None,
+        quantization: str = "int8",
+        pq_subspaces: int = 96,
+        rescore_factor: int = 10,
+    ):
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Geçersiz quantization: {quantization} (seçenekler: {QUANTIZATIONS})")
+        self._embedding = embedding_function
+        self.persist_directory = persist_directory
+        self.quantization = quantization
+        self.pq_subspaces = pq_subspaces
+        self.rescore_factor = rescore_factor
+        self.codebook = None
+        self._lock = threading.Lock()
+        self._state = _State([], [], [], None, None, None)
+        # bulk_load() iç içe çağrılabilir; en dıştaki blok bitince kaydedilir
+        self._bulk_depth = 0
+        self._dirty = False
+        if persist_directory and os.path.exists(os.path.join(persist_directory, "store.json")):
+            self._load()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def __len__(self):
+        return len(self._state.ids)
+
+    # Kalıcılık
+
+    def _path(self, name):
+        return os.path.join(self.persist_directory, name)
+
+    def _save(self, state):
+        os.makedirs(self.persist_directory, exist_ok=True)
+        arrays = {"vectors": state.vectors, "codes": state.codes, "scales": state.scales, "codebook": self.codebook}
+        for name, array in arrays.items():
+            if array is None:
+                continue
+            tmp_path = self._path(f"{name}.tmp.npy")
+            np.save(tmp_path, array)
+            os.replace(tmp_path, self._path(f"{name}.npy"))
+        tmp_path = self._path("store.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump({
+                "quantization": self.quantization,
+                "ids": state.ids,
+                "texts": state.texts,
+                "metadatas": state.metadatas,
+            }, file, ensure_ascii=False)
+        os.replace(tmp_path, self._path("store.json"))
+        # Tam vektörler yalnızca yeniden puanlamada okunur; RAM yerine diskten eşlenir
+        if state.vectors is not None:
+            state.vectors = np.load(self._path("vectors.npy"), mmap_mode="r")
+
+    def _persist_locked(self, state):
+        if not self.persist_directory:
+            return
+        if self._bulk_depth:
+            self._dirty = True
+        else:
+            self._save(state)
+
+    @contextlib.contextmanager
+    def bulk_load(self):
+        """
+        Blok içindeki add_texts / delete çağrıları yalnızca bellekte uygulanır, dosyalar blok
+        bitince (hata olsa da) bir kez yazılır; aksi halde her batch tüm depoyu yeniden yazar.
+        """
+        with self._lock:
+            self._bulk_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._bulk_depth -= 1
+                if not self._bulk_depth and self._dirty:
+                    self._dirty = False
+                    self._save(self._state)
+
+    def _load(self):
+        with open(self._path("store.json"), "r", encoding="utf-8") as file:
+            data = json.load(file)
+        if data["quantization"] != self.quantization:
+            raise ValueError(
+                f"{self.persist_directory} {data['quantization']} ile oluşturulmuş, {self.quantization} istendi."
+            )
+
+        def load(name, mmap_mode=None):
+            path = self._path(f"{name}.npy")
+            return np.load(path, mmap_mode=mmap_mode) if os.path.exists(path) else None
+
+        self.codebook = load("codebook")
+        self._state = _State(
+            data["ids"], data["texts"], data["metadatas"],
+            load("codes"), load("scales"), load("vectors", mmap_mode="r"),
+        )
+
+    # Yazma
+
+    def _encode(self, vectors):
+        if self.quantization == "int8":
+            return encode_int8(vectors)
+        if self.codebook is None:
+            return None, None
+        return encode_pq(vectors, self.codebook), None
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        vectors = _normalize(self._embedding.embed_documents(texts))
+
+        with self._lock:
+            # Aynı kimlik tekrar eklenirse eskisinin yerine geçer
+            self._delete_locked(ids)
+            state = self._state
+            all_vectors = vectors if state.vectors is None else np.concatenate([state.vectors, vectors])
+
+            if self.quantization == "pq" and self.codebook is None and len(all_vectors) >= PQ_MIN_TRAIN_SIZE:
+                subspaces = _pq_subspaces(all_vectors.shape[1], self.pq_subspaces)
+                self.codebook = train_pq(all_vectors, subspaces)
+                codes, scales = encode_pq(all_vectors, self.codebook), None
+                logger.info(f"PQ kod kitabı {len(all_vectors)} vektörle eğitildi ({subspaces} alt uzay).")
+            else:
+                new_codes, new_scales = self._encode(vectors)
+                codes = new_codes if state.codes is None or new_codes is None else np.concatenate([state.codes, new_codes])
+                scales = new_scales if state.scales is None or new_scales is None else np.concatenate([state.scales, new_scales])
+
+            new_state = _State(
+                state.ids + list(ids), state.texts + texts, state.metadatas + list(metadatas),
+                codes, scales, all_vectors,
+            )
+            self._persist_locked(new_state)
+            self._state = new_state
+        return list(ids)
+
+    def _delete_locked(self, ids):
+        state = self._state
+        remove = set(ids) & set(state.ids)
+        if not remove:
+            return False
+        keep = np.array([cid not in remove for cid in state.ids], dtype=bool)
+
+        def select(array):
+            return None if array is None else np.asarray(array)[keep]
+
+        self._state = _State(
+            [cid for cid, kept in zip(state.ids, keep) if kept],
+            [text for text, kept in zip(state.texts, keep) if kept],
+            [metadata for metadata, kept in zip(state.metadatas, keep) if kept],
+            select(state.codes), select(state.scales), select(state.vectors),
+        )
+        return True
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if not ids:
+            return None
+        with self._lock:
+            deleted = self._delete_locked(ids)
+            if deleted:
+                self._persist_locked(self._state)
+        return deleted
+
+    def get(self, ids=None, include=("documents", "metadatas")):
+        """
+        Chroma'nın get() çıktısıyla aynı biçimde (ids, documents, metadatas) kayıtları döndürür.
+        """
+        state = self._state
+        rows = range(len(state.ids))
+        if ids is not None:
+            wanted = set(ids)
+            rows = [i for i, cid in enumerate(state.ids) if cid in wanted]
+        result = {"ids": [state.ids[i] for i in rows]}
+        if "documents" in include:
+            result["documents"] = [state.texts[i] for i in rows]
+        if "metadatas" in include:
+            result["metadatas"] = [state.metadatas[i] for i in rows]
+        return result
+
+    # Arama
+
+    def _coarse_scores(self, state, query, rows=None):
+        """
+        Tüm satırlar (rows None ise) ya da yalnızca verilen satırlar için kaba skorlar.
+        """
+        def take(array):
+            return array if rows is None else array[rows]
+
+        if state.codes is None:
+            # PQ henüz eğitilmedi: tam vektörlerle arama
+            return np.asarray(take(state.vectors), dtype=np.float32) @ query
+
+        codes = take(state.codes)
+        n = len(codes)
+        scores = np.empty(n, dtype=np.float32)
+        if self.quantization == "int8":
+            scales = take(state.scales)
+            for start in range(0, n, SCAN_BLOCK_SIZE):
+                block = codes[start:start + SCAN_BLOCK_SIZE].astype(np.float32)
+                scores[start:start + SCAN_BLOCK_SIZE] = (block @ query) * scales[start:start + SCAN_BLOCK_SIZE]
+        else:
+            subspaces, _, sub_dim = self.codebook.shape
+            # Asimetrik mesafe: sorgunun her alt uzayının 256 merkezle iç çarpım tablosu
+            table = np.einsum("mcd,md->mc", self.codebook, query.reshape(subspaces, sub_dim))
+            columns = np.arange(subspaces)
+            for start in range(0, n, SCAN_BLOCK_SIZE):
+                block = codes[start:start + SCAN_BLOCK_SIZE]
+                scores[start:start + SCAN_BLOCK_SIZE] = table[columns, block].sum(axis=1)
+        return scores
+
+    def _search(self, embedding, k, filter=None):
+        state = self._state
+        if not state.ids:
+            return []
+        rows = None
+        if filter:
+            rows = state.metadata_index.select(normalize_filter(filter))
+            if not len(rows):
+                return []
+        query = _normalize([embedding])[0]
+        coarse = self._coarse_scores(state, query, rows)
+
+        # En iyi adaylar tam vektörlerle yeniden puanlanır
+        candidates = _top_indices(coarse, max(k, k * self.rescore_factor))
+        if rows is not None:
+            candidates = rows[candidates]
+        candidates.sort()
+        exact = np.asarray(state.vectors[candidates], dtype=np.float32) @ query
+        order = np.argsort(-exact, kind="stable")[:k]
+        return [
+            (Document(page_content=state.texts[i], metadata=state.metadatas[i], id=state.ids[i]), 1.0 - float(score))
+            for i, score in zip(candidates[order], exact[order])
+        ]
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        return self._search(self._embedding.embed_query(query), k, filter)
+
+    def similarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> List[Document]:
+        return [document for document, _ in self._search(embedding, k, filter)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [document for document, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def _select_relevance_score_fn(self):
+        return self._cosine_relevance_score_fn
+
+    def memory_usage(self):
+        """
+        RAM'de tutulan vektör verisinin (kodlar, ölçekler, kod kitabı) bayt cinsinden boyutu.
+        """
+        state = self._state
+        total = 0
+        for array in (state.codes, state.scales, self.codebook):
+            if array is not None:
+                total += array.nbytes
+        if state.codes is None and state.vectors is not None:
+            total += state.vectors.nbytes
+        return total
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ):
+        store = cls(embedding_function=embedding, **kwargs)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
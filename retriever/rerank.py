@@ -0,0 +1,136 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.runnables.config import run_in_executor
+
+from retriever.hybrid import turkish_lower
+from retriever.indexing import chunk_id
+
+logger = logging.getLogger(__name__)
+
+
+class CrossEncoderReranker:
+    """
+    (soru, parça) çiftlerini yerel bir cross-encoder ile puanlar.
+
+    - Model ilk kullanımda bir kez yüklenir.
+    - Önbellekte olmayan çiftler batch_size'lık gruplar halinde CPU'da puanlanır.
+    - Puanlar (soru, parça kimliği) anahtarıyla LRU önbellekte tutulur.
+    - Önbellekte olmayan çift başına süre (üstel ortalama) pair_seconds'ta izlenir.
+    """
+
+    def __init__(self, model_name, batch_size=32, cache_size=10000, model=None):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self._model = model
+        self._model_lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.pair_seconds = None
+
+    def _get_model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from sentence_transformers import CrossEncoder
+                    self._model = CrossEncoder(self.model_name, device="cpu")
+                    logger.info(f"Cross-encoder yüklendi: {self.model_name}")
+        return self._model
+
+    def score(self, query, documents):
+        """
+        Her doküman için soruyla ilgililik puanını (aynı sırada) döndürür.
+        """
+        query_key = " ".join(turkish_lower(query).split())
+        keys = [(query_key, chunk_id(document)) for document in documents]
+
+        scores = {}
+        with self._cache_lock:
+            for key in keys:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    scores[key] = self._cache[key]
+
+        missing = {}
+        for key, document in zip(keys, documents):
+            if key not in scores and key not in missing:
+                missing[key] = document.page_content
+
+        if missing:
+            start = time.perf_counter()
+            predicted = self._get_model().predict(
+                [(query, text) for text in missing.values()], batch_size=self.batch_size
+            )
+            elapsed = time.perf_counter() - start
+            per_pair = elapsed / len(missing)
+            self.pair_seconds = per_pair if self.pair_seconds is None else 0.8 * self.pair_seconds + 0.2 * per_pair
+
+            with self._cache_lock:
+                for key, value in zip(missing, predicted):
+                    scores[key] = float(value)
+                    self._cache[key] = float(value)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return [scores[key] for key in keys]
+
+
+class RerankingRetriever(BaseRetriever):
+    """
+    İlk aşama retriever'dan fazla aday alıp (ör. 50) cross-encoder ile yeniden
+    sıralar ve yalnızca ilk k parçayı döndürür.
+
+    Yeniden sıralanan aday sayısı, önbellekte olmayan çift başına ölçülen süreye göre
+    latency_budget'a sığacak şekilde ayarlanır: yük altında model yavaşladıkça derinlik
+    azalır (en az k), kalan adaylar ilk aşama sırasıyla sona eklenir.
+    """
+
+    base_retriever: BaseRetriever
+    reranker: Any
+    k: int = 3
+    max_depth: int = 50
+    latency_budget: float = 0.3
+
+    @property
+    def vectorstore(self):
+        # Cevap önbelleği embedding modelini retriever.vectorstore üzerinden bulur
+        return getattr(self.base_retriever, "vectorstore", None)
+
+    def add_documents(self, documents: List[Document], **kwargs: Any) -> List[str]:
+        return self.base_retriever.add_documents(documents, **kwargs)
+
+    def rerank_depth(self):
+        """
+        Bütçeye sığan yeniden sıralama derinliği.
+        """
+        if not self.reranker.pair_seconds:
+            return self.max_depth
+        return max(self.k, min(self.max_depth, int(self.latency_budget / self.reranker.pair_seconds)))
+
+    def rerank(self, query, candidates):
+        depth = self.rerank_depth()
+        head, tail = candidates[:depth], candidates[depth:]
+        scores = self.reranker.score(query, head)
+        ranked = [document for _, document in sorted(zip(scores, head), key=lambda pair: pair[0], reverse=True)]
+        return (ranked + tail)[:self.k]
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun, **kwargs: Any
+    ) -> List[Document]:
+        # filter gibi argümanlar ilk aşamaya iletilir
+        candidates = self.base_retriever.invoke(query, config={"callbacks": run_manager.get_child()}, **kwargs)
+        return self.rerank(query, candidates)
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: Any, **kwargs: Any) -> List[Document]:
+        candidates = await self.base_retriever.ainvoke(
+            query, config={"callbacks": run_manager.get_child()}, **kwargs
+        )
+        # Cross-encoder CPU yoğun; event loop'u bloklamasın
+        return await run_in_executor(None, self.rerank, query, candidates)
@@ -1,28 +1,173 @@
-from langchain_chroma import Chroma
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 import os
+import threading
 
-def setup_retriever(documents, embedding_model, db_name="chroma_db"):
+from config import (
+    HYBRID_RETRIEVAL, HYBRID_FETCH_K, RRF_K, RERANK_ENABLED, RERANK_MODEL, RERANK_FETCH_K,
+    RERANK_BATCH_SIZE, RERANK_CACHE_SIZE, RERANK_LATENCY_BUDGET, VECTOR_STORE, PQ_SUBSPACES,
+    RESCORE_FACTOR, MMAP_DTYPE, MMAP_COMPACT_THRESHOLD, AUTO_DEPARTMENT_FILTER, QUERY_EXPANSION,
+    QUERY_EXPANSION_COUNT, QUERY_EXPANSION_TIMEOUT, QUERY_EXPANSION_CACHE_SIZE, QUERY_EXPANSION_CACHE_TTL,
+    CONTEXT_PACKING, CONTEXT_FETCH_K, CONTEXT_TOKEN_BUDGETS, CONTEXT_RELEVANCE_MARGIN,
+)
+from retriever.context_packer import DEFAULT_TOKEN_BUDGETS, ContextPackingRetriever, token_budget
+from retriever.expansion import ExpandingRetriever, QueryExpander
+from retriever.hybrid import BM25Index, HybridRetriever
+from retriever.rerank import CrossEncoderReranker, RerankingRetriever
+from retriever.mmap_store import MmapVectorStore
+from retriever.quantized_store import QuantizedVectorStore
+from retriever.indexing import DocumentIndexer, IndexedRetriever, MANIFEST_FILE, WRITE_BATCH_SIZE
+
+CHUNK_SIZE = 300
+CHUNK_OVERLAP = 40
+# LLM'e gönderilen parça sayısı
+TOP_K = 3
+# Bağlam paketleme açıksa paketleyiciye bu kadar sıralı aday gider, LLM'e soruyla ilgili ve bütçeye sığanlar gönderilir
+RESULT_K = CONTEXT_FETCH_K if CONTEXT_PACKING else TOP_K
+
+_reranker = None
+_reranker_lock = threading.Lock()
+
+def get_reranker():
+    """
+    Süreç içinde paylaşılan cross-encoder (model ve puan önbelleği tek olsun diye).
+    """
+    global _reranker
+    with _reranker_lock:
+        if _reranker is None:
+            _reranker = CrossEncoderReranker(
+                RERANK_MODEL, batch_size=RERANK_BATCH_SIZE, cache_size=RERANK_CACHE_SIZE
+            )
+        return _reranker
+
+def open_index(embedding_model, db_name="chroma_db", write_batch_size=WRITE_BATCH_SIZE, vector_store=VECTOR_STORE):
     """
-    Optimize edilmiş Chroma retriever setup.
-    - Veritabanı zaten varsa, yeniden oluşturmaz.
-    - Yeni belgeler eklenirse, sadece bu belgeleri ekler.
+    Vektör deposunu açar (yoksa oluşturur) ve ona bağlı DocumentIndexer'ı döndürür.
+    vector_store: "chroma", nicemlenmiş yerel depo için "int8" / "pq" ya da
+    worker'lar arasında paylaşılan bellek eşlemeli depo için "mmap".
     """
-    # Veritabanı dizinini belirle
-    chroma_db_path = f"{db_name}_db"
+    if vector_store == "chroma":
+        from langchain_chroma import Chroma
 
-    # Eğer veritabanı dizini yoksa veya boşsa, yeni bir veritabanı oluştur
-    if not os.path.exists(chroma_db_path) or not os.listdir(chroma_db_path):
-        # Text splitter ile metinleri böl
-        text_splitter = RecursiveCharacterTextSplitter(chunk_size=300, chunk_overlap=40)
-        texts = text_splitter.split_documents(documents)
+        # Veritabanı dizinini belirle
+        db_path = f"{db_name}_db"
 
-        # Chroma vektör veri tabanı oluştur
-        vectorstore = Chroma.from_documents(
-            texts, embedding_model, persist_directory=chroma_db_path
+        # Mevcut veritabanını aç (yoksa oluşturulur)
+        vectorstore = Chroma(persist_directory=db_path, embedding_function=embedding_model)
+    elif vector_store == "mmap":
+        db_path = f"{db_name}_mmap_db"
+        vectorstore = MmapVectorStore(
+            embedding_model,
+            persist_directory=db_path,
+            dtype=MMAP_DTYPE,
+            compact_threshold=MMAP_COMPACT_THRESHOLD,
         )
     else:
-        # Mevcut veritabanını yükle
-        vectorstore = Chroma(persist_directory=chroma_db_path, embedding_function=embedding_model)
+        # Her depo türünün kendi dizini ve manifest'i olur
+        db_path = f"{db_name}_{vector_store}_db"
+        vectorstore = QuantizedVectorStore(
+            embedding_model,
+            persist_directory=db_path,
+            quantization=vector_store,
+            pq_subspaces=PQ_SUBSPACES,
+            rescore_factor=RESCORE_FACTOR,
+        )
+
+    # Text splitter ile metinler bölünür, yalnızca değişenler indekslenir
+    # start_index, bağlam paketlemede komşu parçaları birleştirmek için tutulur
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP, add_start_index=True
+    )
+    indexer = DocumentIndexer(
+        vectorstore, os.path.join(db_path, MANIFEST_FILE), text_splitter,
+        write_batch_size=write_batch_size,
+    )
+    return vectorstore, indexer
+
+def setup_retriever(documents, embedding_model, db_name="chroma_db", vector_store=VECTOR_STORE):
+    """
+    Optimize edilmiş retriever setup (varsayılan depo Chroma, bkz. open_index).
+    - Dokümanlar manifest'e göre artımlı indekslenir; değişmemiş kaynaklar atlanır.
+    - Yeni ya da değişmiş kaynakların yalnızca yeni parçaları embed edilir,
+      artık geçerli olmayan parçalar silinir.
+    - Dönen retriever'a add_documents ile eklenen dosyalar çoğaltılmaz.
+    - HYBRID_RETRIEVAL açıksa vektör araması aynı parçalar üzerindeki BM25 ile birleştirilir.
+    - invoke(query, filter={"department": ..., "date": {"$gte": ...}}) ile arama metadata'ya
+      göre süzülür; AUTO_DEPARTMENT_FILTER açıksa sorudaki bölüm adı filtre olarak kullanılır.
+    - RERANK_ENABLED açıksa RERANK_FETCH_K aday cross-encoder ile yeniden sıralanır,
+      ilk RESULT_K parça döner (paketleme kapalıysa TOP_K, bkz. setup_context_packing).
+    - Çok süreçli toplu indeksleme (retriever.index_builder) buradan çağrılmaz; büyük
+      korpuslar için önceden, ayrı bir çevrimdışı adım olarak aynı db_name ile çalıştırılır.
+      Aynı manifest ve embedding önbelleği kullanıldığından burada o kaynaklar atlanır.
+    """
+    vectorstore, indexer = open_index(embedding_model, db_name, vector_store=vector_store)
+    indexer.index(documents)
+
+    # Yeniden sıralama açıksa ilk aşama daha fazla aday döndürür
+    first_stage_k = RERANK_FETCH_K if RERANK_ENABLED else RESULT_K
 
-    return vectorstore.as_retriever(search_type="similarity", search_kwargs={"k": 3})
\ No newline at end of file
+    if HYBRID_RETRIEVAL:
+        bm25 = BM25Index.from_vectorstore(vectorstore)
+        # Sonradan eklenen/silinen parçalar BM25 indeksine de yansır
+        indexer.listeners.append(bm25)
+        retriever = HybridRetriever(
+            vectorstore=vectorstore,
+            indexer=indexer,
+            bm25=bm25,
+            k=first_stage_k,
+            fetch_k=max(HYBRID_FETCH_K, first_stage_k),
+            rrf_k=RRF_K,
+            auto_filter=AUTO_DEPARTMENT_FILTER,
+        )
+    else:
+        retriever = IndexedRetriever(
+            vectorstore=vectorstore,
+            indexer=indexer,
+            search_type="similarity",
+            search_kwargs={"k": first_stage_k},
+        )
+
+    if RERANK_ENABLED:
+        return RerankingRetriever(
+            base_retriever=retriever,
+            reranker=get_reranker(),
+            k=RESULT_K,
+            max_depth=RERANK_FETCH_K,
+            latency_budget=RERANK_LATENCY_BUDGET,
+        )
+    return retriever
+
+def setup_query_expansion(retriever, chat_model, mode=QUERY_EXPANSION):
+    """
+    mode "multi_query" ya da "hyde" ise retriever'ı, soruyu chat modeliyle genişleten
+    ExpandingRetriever ile sarar; "off" ise retriever'ı olduğu gibi döndürür.
+    """
+    if mode == "off":
+        return retriever
+    expander = QueryExpander(
+        chat_model,
+        mode=mode,
+        n_queries=QUERY_EXPANSION_COUNT,
+        timeout=QUERY_EXPANSION_TIMEOUT,
+        cache_size=QUERY_EXPANSION_CACHE_SIZE,
+        ttl=QUERY_EXPANSION_CACHE_TTL,
+    )
+    return ExpandingRetriever(base_retriever=retriever, expander=expander, k=RESULT_K)
+
+def setup_context_packing(retriever, chat_model, enabled=CONTEXT_PACKING):
+    """
+    enabled ise retriever'ı, adayları chat modelinin token bütçesine göre paketleyen
+    ContextPackingRetriever ile sarar (bütçeler: CONTEXT_TOKEN_BUDGETS, yoksa varsayılanlar).
+    CONTEXT_RELEVANCE_MARGIN verilirse soruyla ilgisi en iyi adaydan bu kadar düşük adaylar,
+    bütçede yer olsa da gönderilmez (varsayılan kapalı; hibrit ya da yeniden sıralamalı
+    aramada önceki aşamaların sırası korunur).
+    """
+    if not enabled:
+        return retriever
+    budget = token_budget(chat_model, {**DEFAULT_TOKEN_BUDGETS, **CONTEXT_TOKEN_BUDGETS})
+    vectorstore = getattr(retriever, "vectorstore", None)
+    return ContextPackingRetriever(
+        base_retriever=retriever,
+        budget=budget,
+        embeddings=getattr(vectorstore, "embeddings", None),
+        relevance_margin=CONTEXT_RELEVANCE_MARGIN,
+    )
@@ -2,21 +2,31 @@
 import sys
 import os
 import time
+import asyncio
+import atexit
 from typing import List, Optional, Tuple, Union # Added Union
 
 import pymongo
+from bson import ObjectId
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from bs4 import BeautifulSoup
 import requests
 from lxml import html # Keep lxml import if used elsewhere, although not directly in provided code
-from config import PAGINATION, MONGO_DB_URI
+from config import (
+    PAGINATION, MONGO_DB_URI, SCRAPER_PER_HOST_CONCURRENCY, SCRAPER_POLITENESS_DELAY,
+    SCRAPER_MAX_CONNECTIONS, SCRAPER_TIMEOUT, SCRAPER_MAX_RETRIES, SCRAPER_RETRY_BACKOFF,
+    SCRAPER_INCREMENTAL, SCRAPER_MAX_PAGES, MONGO_BULK_SIZE, MONGO_FLUSH_INTERVAL, MONGO_MAX_POOL_SIZE,
+)
+from utils.crawler import Crawler
+from utils.crawl_state import CrawlStateStore, content_hash
+from utils.http_session import PooledSession
+from utils.mongo_writer import BulkWriter
 from datetime import datetime
 import dateparser
 import urllib.parse
 import logging
 import chardet
-import concurrent.futures
 import threading
 from pymongo.mongo_client import MongoClient
 from pymongo.server_api import ServerApi # Good practice for modern pymongo
@@ -30,43 +40,92 @@ PROJECT_DIR = os.path.dirname(os.path.abspath(__file__)) # Use __file__ for scri
 # --- ---
 MONGO_DB_NAME = 'scraped_data'
 ATTACHMENTS_COLLECTION = 'page_attachments'
+CRAWL_STATE_COLLECTION = 'crawl_state'
 logging.basicConfig(filename=LOG_FILE, level=LOG_LEVEL, format='%(asctime)s - %(levelname)s - %(message)s', encoding='utf-8')
 
-thread_local = threading.local()
+_db_client = None
+_db_lock = threading.Lock()
+_bulk_writer = None
+# page_contents url -> _id; ekler sayfa dokümanı yazılmadan önce bu id'ye bağlanır
+_page_ids = None
+_page_ids_lock = threading.Lock()
 
 def get_db_connection():
     """
-    Thread-local veritabanı bağlantısı döndürür.
+    Paylaşılan MongoDB istemcisini döndürür. MongoClient thread-safe'tir ve kendi bağlantı
+    havuzunu tutar; tüm worker thread'ler aynı istemciyi kullanır.
     """
-    if not hasattr(thread_local, "db_client") or thread_local.db_client is None: # Check if None too
-        try:
-            # Use modern connection string handling and ServerApi
-            thread_local.db_client = MongoClient(MONGO_DB_URI,
-                                                 server_api=ServerApi('1'), # Recommended
-                                                 serverSelectionTimeoutMS=5000)
-            # The ismaster command is cheap and does not require auth.
-            thread_local.db_client.admin.command('ping') # Use ping for modern checks
-            logging.info(f"Thread {threading.current_thread().name} için MongoDB bağlantısı oluşturuldu.")
-        except pymongo.errors.ConnectionFailure as e:
-            logging.error(f"Thread {threading.current_thread().name} için MongoDB bağlantı hatası: {e}")
-            thread_local.db_client = None # Ensure it's None on failure
-            return None
-        except Exception as e:
-            logging.error(f"MongoDB bağlantısı kurulurken beklenmedik hata (Thread: {threading.current_thread().name}): {e}")
-            thread_local.db_client = None # Ensure it's None on failure
+    global _db_client
+    if _db_client is None:
+        with _db_lock:
+            if _db_client is None:
+                try:
+                    client = MongoClient(MONGO_DB_URI,
+                                         server_api=ServerApi('1'), # Recommended
+                                         serverSelectionTimeoutMS=5000,
+                                         maxPoolSize=MONGO_MAX_POOL_SIZE)
+                    client.admin.command('ping') # Use ping for modern checks
+                    _db_client = client
+                    logging.info("MongoDB bağlantısı oluşturuldu.")
+                except pymongo.errors.ConnectionFailure as e:
+                    logging.error(f"MongoDB bağlantı hatası: {e}")
+                    return None
+                except Exception as e:
+                    logging.error(f"MongoDB bağlantısı kurulurken beklenmedik hata: {e}")
+                    return None
+    return _db_client
+
+
+def get_bulk_writer() -> Optional[BulkWriter]:
+    """
+    Sayfa, ek ve tarama durumu yazımlarının biriktirildiği write-behind tamponu.
+    İlk çağrıda oluşturulur; close_bulk_writer() ile (ya da program çıkışında) boşaltılır.
+    """
+    global _bulk_writer
+    if _bulk_writer is None:
+        client = get_db_connection()
+        if not client:
             return None
+        with _db_lock:
+            if _bulk_writer is None:
+                # Tarama durumu sayfalardan sonra yazılır; yarıda kalan flush'ta kaydı olmayan sayfa "değişmemiş" sayılmaz
+                _bulk_writer = BulkWriter(client[MONGO_DB_NAME], max_batch=MONGO_BULK_SIZE,
+                                          flush_interval=MONGO_FLUSH_INTERVAL,
+                                          order=('page_contents', ATTACHMENTS_COLLECTION, CRAWL_STATE_COLLECTION)).start()
+    return _bulk_writer
+
+
+def close_bulk_writer():
+    """
+    Tampondaki tüm yazımları MongoDB'ye gönderir ve tamponu kapatır.
+    """
+    global _bulk_writer, _page_ids
+    with _db_lock:
+        writer, _bulk_writer = _bulk_writer, None
+    with _page_ids_lock:
+        _page_ids = None
+    if writer is not None:
+        writer.close()
+    return writer
 
-    # Check connection validity before returning (optional, adds overhead)
-    # try:
-    #     thread_local.db_client.admin.command('ping')
-    # except pymongo.errors.ConnectionFailure:
-    #     logging.warning(f"Thread {threading.current_thread().name} için mevcut MongoDB bağlantısı geçersiz. Yeniden bağlanılıyor...")
-    #     # Clear the old client and retry connection
-    #     thread_local.db_client.close()
-    #     thread_local.db_client = None
-    #     return get_db_connection() # Recursive call to reconnect
 
-    return thread_local.db_client
+atexit.register(close_bulk_writer)
+
+
+def page_id_for(url):
+    """
+    URL'nin page_contents _id'si. Kayıt yoksa istemci tarafında yeni bir ObjectId üretilir;
+    böylece ekler sayfa dokümanı yazılmayı beklemeden bağlanabilir.
+    """
+    global _page_ids
+    with _page_ids_lock:
+        if _page_ids is None:
+            collection = get_db_connection()[MONGO_DB_NAME]['page_contents']
+            _page_ids = {doc["url"]: doc["_id"] for doc in collection.find({}, {"url": True}) if "url" in doc}
+        page_id = _page_ids.get(url)
+        if page_id is None:
+            page_id = _page_ids[url] = ObjectId()
+        return page_id
 
 
 url_list = {
@@ -82,6 +141,17 @@ url_list = {
     'metalurji-ve-malzeme-muhendisligi': 'https://mlz-muhendislik.omu.edu.tr', # Metalurji ve Malzeme Mühendisliği
 }
 
+# Üretimdeki tarama (main -> crawl) tüm ağ işlemlerini utils.crawler.Crawler ile yapar. Bu havuz yalnızca
+# senkron yardımcılar (get_data_from_page, scrape_department, get_page_urls, download_file) içindir;
+# yeniden deneme kuralı (RetryPolicy) ve metrikler (HttpMetrics) Crawler ile ortaktır.
+http_pool = PooledSession(
+    pool_connections=max(16, len(url_list)),
+    pool_maxsize=SCRAPER_PER_HOST_CONCURRENCY,
+    max_retries=SCRAPER_MAX_RETRIES,
+    backoff_factor=SCRAPER_RETRY_BACKOFF,
+    timeout=SCRAPER_TIMEOUT,
+)
+
 class PageContent:
     def __init__(self, title="", content="", author="", date="", department="",faculty="", url=""):
         self.title = title
@@ -129,13 +199,12 @@ def get_page_urls(department, urls):
     Verilen URL'lerden sayfa URL'lerini alır.
     """
     logging.info(f"{department} için sayfa URL'leri alınıyor...")
-    session = requests.Session()
     department_page_urls = set()
     base_url = url_list[department]
 
     for url in urls:
         try:
-            response = session.get(url, timeout=15)
+            response = http_pool.get(url, timeout=15)
             response.raise_for_status()
 
              # --- Encoding handling for list pages ---
@@ -152,15 +221,7 @@ def get_page_urls(department, urls):
             # --- ---
 
             soup = BeautifulSoup(text, 'html.parser') # Use decoded text
-
-            for link in soup.find_all('article', class_='news-item'):
-                a_tag = link.find('a', href=True)
-                if a_tag:
-                    page_url = a_tag['href'].strip()
-                    full_url = urllib.parse.urljoin(base_url, page_url)
-                    department_page_urls.add(full_url)
-                else:
-                    logging.warning(f"'{url}' adresindeki bir 'article' içinde 'a' etiketi veya href bulunamadı.")
+            department_page_urls.update(parse_article_links(soup, base_url, url))
 
         except requests.exceptions.RequestException as e:
             logging.error(f"Hata oluştu ({url}): {e}")
@@ -172,6 +233,20 @@ def get_page_urls(department, urls):
     logging.info(f"{department} için {len(department_page_urls_list)} adet benzersiz sayfa URL'si alındı.")
     return department_page_urls_list # Return list here
 
+def parse_article_links(soup, base_url, url) -> List[str]:
+    """
+    Haber listesi sayfasındaki haber (article.news-item) bağlantılarını mutlak URL olarak döndürür.
+    """
+    links = []
+    for link in soup.find_all('article', class_='news-item'):
+        a_tag = link.find('a', href=True)
+        if a_tag:
+            page_url = a_tag['href'].strip()
+            links.append(urllib.parse.urljoin(base_url, page_url))
+        else:
+            logging.warning(f"'{url}' adresindeki bir 'article' içinde 'a' etiketi veya href bulunamadı.")
+    return links
+
 # --- MODIFIED fetch_page_content ---
 def fetch_page(url) -> Optional[requests.Response]:
     """
@@ -179,7 +254,7 @@ def fetch_page(url) -> Optional[requests.Response]:
     Content-Type kontrolünü veya parsing'i burada YAPMAZ.
     """
     try:
-        response = requests.get(url, timeout=20) # Increased timeout slightly
+        response = http_pool.get(url, timeout=20) # Increased timeout slightly
         response.raise_for_status() # Check for HTTP errors like 404, 500
         return response
     except requests.exceptions.Timeout:
@@ -200,10 +275,11 @@ def decode_content(response: requests.Response) -> Optional[str]:
     """
     Attempts to decode response content using apparent_encoding or fallback to chardet/utf-8.
     Returns decoded text or None if decoding fails completely.
+    requests ve httpx cevaplarıyla çalışır (httpx'te apparent_encoding yoktur, chardet kullanılır).
     """
     url = response.url
     bytes_data = response.content
-    encoding = response.apparent_encoding
+    encoding = getattr(response, 'apparent_encoding', None)
 
     if not encoding:
         try:
@@ -403,18 +479,16 @@ def parse_author_and_date(soup, url) -> Tuple[str, Optional[str]]:
 
 def save_page_content_to_db(page_data: PageContent) -> Optional[str]:
     """
-    Veritabanına sayfa içeriğini kaydeder (thread-safe).
-    Kaydedilen dokümanın id'sini döndürür.
+    Sayfa içeriğini write-behind tamponuna ekler (thread-safe); toplu olarak yazılır.
+    Aynı URL'nin kaydı varsa güncellenir (upsert). Dokümanın id'si istemci tarafında
+    belirlendiği için yazım beklenmeden döndürülür.
     """
-    client = get_db_connection()
-    if not client:
+    writer = get_bulk_writer()
+    if not writer:
         logging.error(f"MongoDB bağlantısı yok, '{page_data.title}' kaydetme işlemi atlanıyor.")
         return None
 
     try:
-        db = client[MONGO_DB_NAME]
-        content_collection = db['page_contents']
-
         # Ensure date is compatible with MongoDB (string or datetime, handle None)
         doc_date = None
         if page_data.date:
@@ -426,8 +500,6 @@ def save_page_content_to_db(page_data: PageContent) -> Optional[str]:
 
 
         document = {
-            "user_id": None,
-            "model_id": None,
             "title": page_data.title,
             "content": page_data.content,
             "author": page_data.author,
@@ -440,9 +512,13 @@ def save_page_content_to_db(page_data: PageContent) -> Optional[str]:
             
         }
 
-        result = content_collection.insert_one(document)
-        page_id = result.inserted_id
-        logging.info(f"'{page_data.title}' ID: {page_id} olarak kaydedildi (Thread: {threading.current_thread().name}).")
+        page_id = page_id_for(page_data.url)
+        writer.add('page_contents', pymongo.UpdateOne(
+            {"url": page_data.url},
+            {"$set": document, "$setOnInsert": {"_id": page_id, "user_id": None, "model_id": None}},
+            upsert=True,
+        ), key=page_data.url)
+        logging.info(f"'{page_data.title}' ID: {page_id} olarak kayıt kuyruğuna alındı (Thread: {threading.current_thread().name}).")
 
         return str(page_id) # Return as string for consistency
     
@@ -455,48 +531,40 @@ def save_page_content_to_db(page_data: PageContent) -> Optional[str]:
 
 def save_attachments_to_db(attachments_data: List[dict]) -> int:
     """
-    İndirilen dosya bilgilerini MongoDB'ye kaydeder.
+    İndirilen dosya bilgilerini write-behind tamponuna ekler; kuyruğa alınan ek sayısını döndürür.
+    Değişen bir sayfa tekrar işlendiğinde aynı ek (page_content_id + original_url) güncellenir.
     """
     if not attachments_data:
         return 0
 
-    client = get_db_connection()
-    if not client:
+    writer = get_bulk_writer()
+    if not writer:
         logging.error("MongoDB bağlantısı yok, ek dosya kaydetme işlemi atlanıyor.")
         return 0
 
-    db = client[MONGO_DB_NAME]
-    attachments_collection = db[ATTACHMENTS_COLLECTION]
-    inserted_count = 0
-
-    try:
-        result = attachments_collection.insert_many(attachments_data, ordered=False)
-        inserted_count = len(result.inserted_ids)
-        logging.info(f"{inserted_count} adet ek dosya bilgisi MongoDB'ye kaydedildi (Thread: {threading.current_thread().name}).")
-        if len(attachments_data) != inserted_count:
-             logging.warning(f"Toplu ekleme sırasında bazı ekler kaydedilemedi (page_id: {attachments_data[0].get('page_content_id', 'N/A')}, Thread: {threading.current_thread().name}).")
-
-    except pymongo.errors.BulkWriteError as bwe:
-        inserted_count = bwe.details.get('nInserted', 0)
-        logging.error(f"Toplu ekleme sırasında MongoDB hatası (page_id: {attachments_data[0].get('page_content_id', 'N/A')}, Thread: {threading.current_thread().name}): {bwe.details}")
-    except pymongo.errors.PyMongoError as e:
-        logging.error(f"Ekleri MongoDB'ye kaydederken hata (page_id: {attachments_data[0].get('page_content_id', 'N/A')}, Thread: {threading.current_thread().name}): {e}")
-    except Exception as e:
-        logging.exception(f"Ekleri kaydederken beklenmedik hata (page_id: {attachments_data[0].get('page_content_id', 'N/A')}, Thread: {threading.current_thread().name}): {e}")
-
-    return inserted_count
+    for doc in attachments_data:
+        writer.add(ATTACHMENTS_COLLECTION, pymongo.UpdateOne(
+            {"page_content_id": doc["page_content_id"], "original_url": doc["original_url"]},
+            {"$set": doc},
+            upsert=True,
+        ))
+    logging.info(f"{len(attachments_data)} adet ek dosya bilgisi kayıt kuyruğuna alındı (Thread: {threading.current_thread().name}).")
+    return len(attachments_data)
 
 
 def download_file(url: str, save_path: str) -> bool:
     """URL'den dosya indirir."""
     try:
         logging.info(f"İndiriliyor: {url} -> {save_path} (Thread: {threading.current_thread().name})")
-        response = requests.get(url, stream=True, timeout=60) # Longer timeout for downloads
-        response.raise_for_status()
-        os.makedirs(os.path.dirname(save_path), exist_ok=True) # Ensure directory exists
-        with open(save_path, 'wb') as file:
-            for chunk in response.iter_content(chunk_size=8192):
-                file.write(chunk)
+        with http_pool.get(url, stream=True, timeout=60) as response: # Longer timeout for downloads
+            response.raise_for_status()
+            os.makedirs(os.path.dirname(save_path), exist_ok=True) # Ensure directory exists
+            written = 0
+            with open(save_path, 'wb') as file:
+                for chunk in response.iter_content(chunk_size=8192):
+                    file.write(chunk)
+                    written += len(chunk)
+            http_pool.record_transfer(response, written)
         logging.info(f"Dosya indirildi: {save_path}")
         return True
     except requests.exceptions.RequestException as e:
@@ -512,10 +580,12 @@ def download_file(url: str, save_path: str) -> bool:
         logging.error(f"Dosya indirirken beklenmedik hata ({url}) (Thread: {threading.current_thread().name}): {e}")
         return False
 
-def process_html_attachments(soup: BeautifulSoup, department: str, page_content_id: str, base_url: str, year: str):
+def process_html_attachments(soup: BeautifulSoup, department: str, page_content_id: str, base_url: str, year: str, download=None):
     """
     HTML sayfasındaki ek dosyaları işler ve kaydeder.
+    download(url, save_path) -> bool verilmezse download_file kullanılır.
     """
+    download = download or download_file
     if not page_content_id: # Don't save attachments if the main page wasn't saved
         logging.warning(f"Ana sayfa kaydedilmediği için ekler kaydedilmiyor (department: {department}, base_url: {base_url}).")
         return
@@ -561,7 +631,7 @@ def process_html_attachments(soup: BeautifulSoup, department: str, page_content_
                     logging.info(f"Dosya zaten var, indirme atlanıyor: {file_path}")
                     download_successful = True
                 else:
-                    download_successful = download_file(absolute_url, file_path)
+                    download_successful = download(absolute_url, file_path)
 
                 if download_successful:
                     attachment_doc = {
@@ -624,14 +694,6 @@ def handle_direct_pdf(response: requests.Response, department: str, url: str):
             url=url
         )
 
-        # Sayfa verisini kaydet
-        page_id = save_page_content_to_db(pdf_page_data)
-
-        if not page_id:
-            logging.error(f"Doğrudan PDF için ana içerik kaydı oluşturulamadı, ek kaydedilemiyor: {url}")
-            return None # Indicate failure
-
-
         save_dir = os.path.join(PROJECT_DIR, "assets", "direct_downloads", department, file_extension)
         safe_file_name_for_path = "".join(c for c in file_name if c.isalnum() or c in (' ', '_', '-')).strip()
         if not safe_file_name_for_path: safe_file_name_for_path = f"untitled_{int(now.timestamp())}"
@@ -660,6 +722,12 @@ def handle_direct_pdf(response: requests.Response, department: str, url: str):
 
 
         if download_successful:
+            # Sayfa verisini kaydet; id istemci tarafında üretildiği için ek hemen bağlanabilir
+            page_id = save_page_content_to_db(pdf_page_data)
+            if not page_id:
+                logging.error(f"Doğrudan PDF için ana içerik kaydı oluşturulamadı, ek kaydedilemiyor: {url}")
+                return None # Indicate failure
+
             attachment_doc = {
                 "page_content_id": page_id, 
                 "original_url": url,
@@ -673,10 +741,7 @@ def handle_direct_pdf(response: requests.Response, department: str, url: str):
             save_attachments_to_db([attachment_doc]) # Use the list-based saver
             return pdf_page_data # Return the created page data object on success
         else:
-             logging.error(f"PDF indirme başarısız olduğu için ek kaydedilmedi: {url}")
-             # Optionally: Delete the minimal PageContent entry if download fails?
-             client = get_db_connection()
-             if client: client[MONGO_DB_NAME]['page_contents'].delete_one({"_id": pymongo.ObjectId(page_id)})
+             logging.error(f"PDF indirme başarısız olduğu için sayfa ve ek kaydedilmedi: {url}")
              return None # Indicate failure
 
 
@@ -694,8 +759,16 @@ def get_data_from_page(url, department):
         # Error logged in fetch_page
         return None # Indicate failure
 
+    return process_page(response, url, department)
+
+
+def process_page(response, url, department, base_url=None, download=None):
+    """
+    Getirilmiş sayfayı türüne göre işler (HTML/PDF) ve veritabanına kaydeder.
+    base_url verilmezse url_list'teki bölüm adresi, download verilmezse download_file kullanılır.
+    """
     content_type = response.headers.get('Content-Type', '').lower()
-    base_url = url_list[department] 
+    base_url = base_url or url_list[department]
 
     is_pdf = 'application/pdf' in content_type or url.lower().endswith('.pdf')
 
@@ -744,7 +817,8 @@ def get_data_from_page(url, department):
                                       department=department,
                                       page_content_id=page_id,
                                       base_url=base_url,
-                                      year=year_for_attachments)
+                                      year=year_for_attachments,
+                                      download=download)
         else:
              logging.warning(f"Ana içerik kaydedilmediği için '{title}' ({url}) HTML ekleri işlenmedi.")
 
@@ -808,77 +882,225 @@ def prepare_urls(url_map, pagination=1): # Renamed url_list to url_map
     return paginated_urls
 
 
-def main(base_url_list, pagination=PAGINATION, num_threads=None): # Renamed url_list
+def get_crawl_state_store() -> Optional[CrawlStateStore]:
     """
-    Ana scraping işlemini gerçekleştirir.
+    MongoDB'deki tarama durumu deposunu yükler. Bağlantı yoksa None döner
+    (tarama koşulsuz isteklerle yapılır).
     """
+    client = get_db_connection()
+    if not client:
+        logging.warning("MongoDB bağlantısı yok, tarama durumu kullanılmadan tüm sayfalar indirilecek.")
+        return None
+    db = client[MONGO_DB_NAME]
+    # save_page_content_to_db url ile upsert eder
+    db['page_contents'].create_index('url')
+    state = CrawlStateStore(db[CRAWL_STATE_COLLECTION], writer=get_bulk_writer())
+    state.load()
+    return state
 
-    if num_threads is None or num_threads <= 0:
-        num_threads = min(len(base_url_list), os.cpu_count() or 1) * 2 # Example: 2 threads per department/core
-        num_threads = max(1, num_threads) # Ensure at least one thread
-    logging.info(f"Scraping işlemi {num_threads} thread ile başladı.")
-
-    paginated_urls_map = prepare_urls(base_url_list, pagination)
 
-    all_page_urls = {}
-    logging.info("Bölüm haber listesi sayfaları taranıyor...")
+async def crawl(base_url_list, pagination=PAGINATION, crawler=None, state=None,
+                incremental=SCRAPER_INCREMENTAL, backfill=False):
+    """
+    Tüm bölümlerin haber listelerini ve haberlerini tek bir asenkron tarayıcıyla işler.
+    Liste sayfalarından çıkan haberler hemen kuyruğa girer; istekler bölüm yerine
+    host başına sınırlanır.
+
+    state (CrawlStateStore) verilirse istekler ETag/Last-Modified ile koşullu gönderilir;
+    304 dönen ya da içerik hash'i değişmeyen sayfalar işlenmez.
+
+    incremental (state gerekir): liste sayfaları en yeniden başlayarak sırayla gezilir ve
+    yalnızca bilinmeyen haberler kuyruğa alınır. Bölümün high-water mark'ı (önceki
+    taramanın ilk liste sayfasındaki haberler) görülünce durulur; high-water mark yoksa
+    ilk pagination sayfa gezilir. Mark tarama sonunda, yalnızca bölümün gezintisi bittiyse
+    ve kuyruğa alınan tüm haberleri kaydedildiyse ilerletilir. backfill=True ise pagination
+    sınırı aşılarak liste bitene (en fazla SCRAPER_MAX_PAGES) kadar devam edilir.
+    incremental kapalıysa her bölümün 1..pagination sayfaları getirilir; değişmeyen
+    liste sayfalarının haberleri kayıtlı bağlantılardan koşullu olarak tekrar kontrol edilir.
+
+    Bölüm -> kaydedilen (yeni ya da değişen) PageContent listesi döndürür.
+    """
+    crawler = crawler or Crawler(
+        per_host_concurrency=SCRAPER_PER_HOST_CONCURRENCY,
+        delay=SCRAPER_POLITENESS_DELAY,
+        max_connections=SCRAPER_MAX_CONNECTIONS,
+        timeout=SCRAPER_TIMEOUT,
+        max_retries=SCRAPER_MAX_RETRIES,
+        backoff_base=SCRAPER_RETRY_BACKOFF,
+    )
+    results = {department: [] for department in base_url_list}
+
+    def download(url, save_path):
+        try:
+            crawler.download_from_thread(url, save_path)
+            logging.info(f"Dosya indirildi: {save_path}")
+            return True
+        except Exception as e:
+            logging.error(f"Dosya indirme hatası ({url}): {e}")
+            return False
+
+    def enqueue(url, handler, **context):
+        headers = state.conditional_headers(url) if state is not None else None
+        crawler.enqueue(url, handler, headers=headers, url=url, **context)
+
+    def unchanged(response, url, digest):
+        if state is None:
+            return False
+        if response.status_code == 304:
+            state.mark_seen(url)
+            return True
+        if state.is_unchanged(url, digest):
+            # Sunucu koşullu isteği desteklemese de aynı içerik tekrar işlenmez
+            state.mark_seen(url, not_modified=False)
+            return True
+        return False
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=num_threads, thread_name_prefix="URL_Getter") as executor:
-        future_to_department = {
-            executor.submit(get_page_urls, department, urls): department
-            for department, urls in paginated_urls_map.items() if urls 
-        }
-        for future in concurrent.futures.as_completed(future_to_department):
-            department = future_to_department[future]
-            try:
-                department_urls = future.result() # This is now a list
-                if department_urls:
-                    all_page_urls[department] = department_urls # Store the list
-                    logging.info(f"'{department}' için {len(department_urls)} sayfa URL'si bulundu.")
-                else:
-                    logging.warning(f"'{department}' için hiç sayfa URL'si bulunamadı.")
-                    all_page_urls[department] = [] # Store empty list
-            except Exception as exc:
-                logging.error(f"'{department}' için URL alma işlemi başarısız: {exc}", exc_info=True)
-                all_page_urls[department] = [] # Store empty list on error
+    async def on_article(response, department, base_url, url):
+        digest = content_hash(response.content)
+        if unchanged(response, url, digest):
+            return
+        # Ayrıştırma ve MongoDB kaydı senkron; event loop'u bloklamasın
+        page_data = await asyncio.to_thread(process_page, response, url, department, base_url, download)
+        if page_data:
+            results[department].append(page_data)
+            # Durum yalnızca başarılı kayıttan sonra yazılır; başarısız sayfa sonraki taramada tekrar denenir
+            if state is not None:
+                await asyncio.to_thread(state.record, url, response.headers, digest)
+        else:
+            logging.warning(f"Başarısız işlem: {url}")
+
+    async def list_links(response, base_url, url):
+        # Liste sayfasındaki haber bağlantıları; sayfa değişmediyse önceki taramada kaydedilenler
+        digest = content_hash(response.content)
+        if unchanged(response, url, digest):
+            return state.get(url).get("links", [])
+        text = decode_content(response)
+        if text is None:
+            logging.error(f"Liste sayfası çözümlenemedi: {url}")
+            return None
+        links = parse_article_links(BeautifulSoup(text, 'html.parser'), base_url, url)
+        if state is not None:
+            await asyncio.to_thread(state.record, url, response.headers, digest, links=links)
+        return links
+
+    async def on_list_page(response, department, base_url, url):
+        for page_url in await list_links(response, base_url, url) or []:
+            enqueue(page_url, on_article, department=department, base_url=base_url)
+
+    async def on_incremental_page(response, department, base_url, url, page):
+        links = await list_links(response, base_url, url)
+        if links is None:
+            return
+        mark = marks[department]
+        walk = walks[department]
+        if page == 1 and links and (mark is None or mark.get("url") != links[0]):
+            walk["mark"] = links
+
+        new_links = [link for link in links if state.get(link) is None]
+        walk["articles"].update(new_links)
+        for page_url in new_links:
+            enqueue(page_url, on_article, department=department, base_url=base_url)
+
+        if not links:
+            done = "liste sonuna gelindi"
+        elif page >= SCRAPER_MAX_PAGES:
+            done = f"SCRAPER_MAX_PAGES ({SCRAPER_MAX_PAGES}) sayfa gezildi"
+        elif backfill:
+            done = None
+        elif mark is None:
+            # İlk tarama: eski davranıştaki gibi ilk pagination sayfa
+            done = f"ilk {pagination} sayfa gezildi" if page >= max(1, pagination) else None
+        elif {mark["url"], *mark.get("recent", [])} & set(links):
+            done = "bilinen haberlere ulaşıldı"
+        else:
+            done = None
 
-    total_unique_urls = sum(len(urls) for urls in all_page_urls.values())
-    logging.info(f"Toplam {total_unique_urls} adet benzersiz haber/duyuru URL'si bulundu.")
+        if done:
+            walk["done"] = True
+            logging.info(f"'{department}' için {page} liste sayfası gezildi, {done}.")
+        else:
+            enqueue(create_paginated_url(base_url, page + 1), on_incremental_page,
+                    department=department, base_url=base_url, page=page + 1)
+
+    def update_high_water_marks():
+        # Mark yalnızca bölümün gezintisi bittiyse ve kuyruğa alınan tüm haberleri kaydedildiyse
+        # ilerletilir; aksi halde sonraki tarama eski mark'a kadar tekrar gezer ve eksikleri alır
+        for department, walk in walks.items():
+            if walk["mark"] is None:
+                continue
+            missing = [url for url in walk["articles"] if state.get(url) is None]
+            if not walk["done"] or missing:
+                logging.warning(f"'{department}' için high-water mark ilerletilmedi "
+                                f"(gezinti {'tamamlandı' if walk['done'] else 'yarıda kaldı'}, {len(missing)} haber kaydedilemedi).")
+                continue
+            state.set_high_water_mark(department, walk["mark"][0], recent=walk["mark"])
+
+    # Taramanın başındaki high-water mark'lar; yeni mark'lar tarama sonunda yazılır
+    marks = {department: state.high_water_mark(department) for department in base_url_list} if state is not None else {}
+    walks = {department: {"mark": None, "done": False, "articles": set()} for department in base_url_list}
+
+    async with crawler:
+        if incremental and state is not None:
+            for department, base_url in base_url_list.items():
+                enqueue(create_paginated_url(base_url, 1), on_incremental_page,
+                        department=department, base_url=base_url, page=1)
+        else:
+            for department, list_urls in prepare_urls(base_url_list, pagination).items():
+                for list_url in list_urls:
+                    enqueue(list_url, on_list_page, department=department, base_url=base_url_list[department])
+        await crawler.join()
+
+    if incremental and state is not None:
+        await asyncio.to_thread(update_high_water_marks)
+
+    # Tampondaki sayfa, ek ve durum yazımları; durumlar sayfalardan sonra yazılır
+    writer = await asyncio.to_thread(close_bulk_writer)
+    if writer is not None:
+        stats = writer.stats
+        rate = stats["written"] / stats["seconds"] if stats["seconds"] else 0.0
+        logging.info(f"MongoDB toplu yazma: {stats['written']} doküman, {stats['batches']} batch, "
+                     f"{stats['errors']} hata, {stats['skipped']} atlanan, {rate:.0f} doküman/sn")
+    if state is not None:
+        await asyncio.to_thread(state.flush)
+        logging.info(f"Tarama durumu: {state.stats}")
+
+    metrics = crawler.metrics.snapshot()
+    logging.info(f"Tarama istatistikleri: {crawler.stats}, {metrics['requests']} istek, "
+                 f"bağlantı tekrar kullanımı %{metrics['reuse_rate'] * 100:.1f}, "
+                 f"{metrics['wire_bytes'] / 1024:.0f} KB aktarıldı ({metrics['content_bytes'] / 1024:.0f} KB çözülmüş)")
+    return results
+
+
+def main(base_url_list, pagination=PAGINATION, backfill=False):
+    """
+    Ana scraping işlemini gerçekleştirir.
+    backfill=True ise liste sayfaları PAGINATION sınırı olmadan sonuna kadar gezilir.
+    """
+    logging.info(f"Scraping işlemi başladı (host başına {SCRAPER_PER_HOST_CONCURRENCY} eşzamanlı istek).")
 
-    if total_unique_urls == 0:
-        logging.warning("Hiçbir haber URL'si bulunamadı. Scraping işlemi durduruluyor.")
-        return
+    all_results = asyncio.run(crawl(base_url_list, pagination, state=get_crawl_state_store(), backfill=backfill))
+    for department, department_results in all_results.items():
+        logging.info(f"'{department}' bölümü için {len(department_results)} yeni ya da değişen sayfa kaydedildi.")
 
-    # 3. Scrape individual pages concurrently
-    logging.info("Sayfa içerikleri ve ekleri indirilip kaydediliyor...")
-    all_results = {}
-    with concurrent.futures.ThreadPoolExecutor(max_workers=num_threads, thread_name_prefix="Scraper") as executor:
-        future_to_department_scrape = {
-            executor.submit(scrape_department, department, urls): department
-            for department, urls in all_page_urls.items() if urls # Only submit if URLs were found
-        }
-        for future in concurrent.futures.as_completed(future_to_department_scrape):
-            department = future_to_department_scrape[future]
-            try:
-                 # scrape_department logs its own completion/stats
-                 department_results = future.result() # Get results if scrape_department returns them
-                 all_results[department] = department_results
-            except Exception as exc:
-                # Log errors from the scrape_department *task execution* itself
-                logging.error(f"'{department}' bölümünün scraping görevi sırasında beklenmedik hata: {exc}", exc_info=True)
-
-    if hasattr(thread_local, "db_client") and thread_local.db_client:
+    close_bulk_writer()
+    if _db_client is not None:
         try:
-            thread_local.db_client.close()
-            logging.info(f"Ana thread ({threading.current_thread().name}) MongoDB bağlantısı kapatıldı.")
+            _db_client.close()
+            logging.info("MongoDB bağlantısı kapatıldı.")
         except Exception as e:
-             logging.error(f"Ana thread MongoDB bağlantısı kapatılırken hata: {e}")
+             logging.error(f"MongoDB bağlantısı kapatılırken hata: {e}")
 
 
     logging.info("Scraping işlemi tamamlandı.")
 
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backfill", action="store_true", help="Haber listelerini PAGINATION sınırı olmadan sonuna kadar tarar")
+    args = parser.parse_args()
+
     start_time = time.time()
     try:
         if not MONGO_DB_URI:
@@ -895,7 +1117,7 @@ if __name__ == "__main__":
         sys.exit(1) # Exit if config is missing
 
 
-    main(url_list, pagination_value)
+    main(url_list, pagination_value, backfill=args.backfill)
 
     logging.info("Ana program tamamlandı.")
     logging.info(f"Toplam çalışma süresi: {time.time() - start_time:.2f} saniye")
\ No newline at end of file
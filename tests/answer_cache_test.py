@@ -0,0 +1,137 @@
+import time
+from typing import Any
+from unittest.mock import Mock
+
+from langchain_core.retrievers import BaseRetriever
+
+from chains.answer_cache import AnswerCache, CachedQAChain, normalize_query
+from retriever.context_packer import ContextPackingRetriever
+from retriever.indexing import find_indexer
+from tests.indexing_test import doc, make_indexer
+
+VECTORS = {
+    "Yaz okulu şartları nelerdir?": [1.0, 0.0, 0.0],
+    "Yaz okuluna katılma şartları neler?": [0.98, 0.2, 0.0],
+    "Bütünleme sınavı ne zaman?": [0.0, 1.0, 0.0],
+}
+
+
+class FakeEmbeddings:
+    """Sorulara sabit vektörler döndüren sahte embedding modeli."""
+
+    def embed_query(self, text):
+        return VECTORS[text]
+
+
+def make_chain():
+    chain = Mock()
+    chain.invoke.side_effect = lambda inputs: {"query": inputs["query"], "result": "Cevap", "source_documents": []}
+    retriever = Mock()
+    cache = AnswerCache(embedding_model=FakeEmbeddings(), similarity_threshold=0.95)
+    return CachedQAChain(chain, retriever, cache), chain, retriever
+
+
+def test_normalize_query():
+    """normalize_query fonksiyonunun Türkçe büyük harf ve noktalamayı normalize ettiğini test eder."""
+    assert normalize_query("  YAZ Okulu   ŞARTLARI nelerdir?? ") == "yaz okulu şartları nelerdir"
+    assert normalize_query("İSİM") == "isim"
+
+
+def test_exact_hit_skips_chain():
+    """Aynı soru tekrar sorulduğunda zincirin çağrılmadığını test eder."""
+    qa, chain, _ = make_chain()
+    qa.invoke({"query": "Yaz okulu şartları nelerdir?"})
+    response = qa.invoke({"query": "yaz okulu şartları nelerdir"})
+    assert chain.invoke.call_count == 1
+    assert response["result"] == "Cevap"
+    assert qa.cache.stats()["exact_hits"] == 1
+
+
+def test_semantic_hit_and_miss():
+    """Benzer sorunun önbellekten, farklı sorunun zincirden cevaplandığını test eder."""
+    qa, chain, _ = make_chain()
+    qa.invoke({"query": "Yaz okulu şartları nelerdir?"})
+    response = qa.invoke({"query": "Yaz okuluna katılma şartları neler?"})
+    assert response["query"] == "Yaz okuluna katılma şartları neler?"
+    assert chain.invoke.call_count == 1
+    qa.invoke({"query": "Bütünleme sınavı ne zaman?"})
+    assert chain.invoke.call_count == 2
+    stats = qa.cache.stats()
+    assert stats["semantic_hits"] == 1 and stats["misses"] == 2
+
+
+def test_add_documents_invalidates_cache():
+    """add_documents çağrıldığında önbelleğin temizlendiğini test eder."""
+    qa, chain, retriever = make_chain()
+    qa.invoke({"query": "Yaz okulu şartları nelerdir?"})
+    qa.add_documents(["yeni belge"])
+    retriever.add_documents.assert_called_once_with(["yeni belge"])
+    qa.invoke({"query": "Yaz okulu şartları nelerdir?"})
+    assert chain.invoke.call_count == 2
+
+
+def test_put_after_invalidate_is_ignored():
+    """Korpus değişmeden önce başlamış bir sorgunun cevabının önbelleğe yazılmadığını test eder."""
+    cache = AnswerCache(embedding_model=FakeEmbeddings())
+    _, context = cache.get("Bütünleme sınavı ne zaman?")
+    cache.invalidate()
+    cache.put(context, {"result": "eski"})
+    assert cache.stats()["size"] == 0
+
+
+def test_lru_eviction():
+    """max_size aşıldığında en az kullanılan kaydın silindiğini test eder."""
+    cache = AnswerCache(max_size=2)
+    for query in ["a", "b"]:
+        _, context = cache.get(query)
+        cache.put(context, {"result": query})
+    cache.get("a")  # "a" en son kullanılan olur
+    _, context = cache.get("c")
+    cache.put(context, {"result": "c"})
+    assert cache.get("a")[0] is not None
+    assert cache.get("b")[0] is None
+
+
+class IndexStubRetriever(BaseRetriever):
+    """Yalnızca indexer alanı olan retriever."""
+
+    indexer: Any = None
+
+    def _get_relevant_documents(self, query, *, run_manager):
+        return []
+
+
+def test_indexer_write_invalidates_cache(tmp_path):
+    """Belgeler zincir dışından (indexer.index / retriever.add_documents) eklendiğinde de önbelleğin temizlendiğini test eder."""
+    indexer = make_indexer(tmp_path)
+    retriever = ContextPackingRetriever(base_retriever=IndexStubRetriever(indexer=indexer), budget=100)
+    assert find_indexer(retriever) is indexer
+    assert find_indexer(Mock()) is None
+
+    chain = Mock()
+    chain.invoke.side_effect = lambda inputs: {"query": inputs["query"], "result": "Cevap"}
+    qa = CachedQAChain(chain, retriever, AnswerCache(), indexer=find_indexer(retriever))
+    qa.invoke({"query": "a"})
+    indexer.index([doc("madde 1", "yonetmelik.pdf")])
+    qa.invoke({"query": "a"})
+    assert chain.invoke.call_count == 2
+
+    # Değişiklik olmayan indeksleme önbelleği temizlemez
+    indexer.index([doc("madde 1", "yonetmelik.pdf")])
+    qa.invoke({"query": "a"})
+    assert chain.invoke.call_count == 2
+
+
+def test_semantic_lookup_skips_expired_best_match():
+    """En benzer kaydın süresi dolmuşsa eşik üstündeki bir sonraki kaydın kullanıldığını test eder."""
+    cache = AnswerCache(embedding_model=FakeEmbeddings(), similarity_threshold=0.99)
+    for query in ["Yaz okulu şartları nelerdir?", "Yaz okuluna katılma şartları neler?"]:
+        _, context = cache.get(query)
+        cache.put(context, {"result": query})
+    cache.similarity_threshold = 0.95
+    cache._entries[normalize_query("Yaz okulu şartları nelerdir?")].created_at -= cache.ttl + 1
+
+    # Sorgu süresi dolmuş kayda birebir eşit, diğerine eşik üstünde benzer
+    vector = cache._embed("Yaz okulu şartları nelerdir?")
+    match = cache._semantic_lookup(vector, time.monotonic())
+    assert match == normalize_query("Yaz okuluna katılma şartları neler?")
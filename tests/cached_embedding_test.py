@@ -0,0 +1,83 @@
+from embeddings.cached_embedding import CachedEmbeddings, EmbeddingStore, text_hash
+
+
+class CountingEmbeddings:
+    """Kaç metnin gerçekten embed edildiğini sayan sahte model."""
+
+    def __init__(self):
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        self.embedded.append(text)
+        return [float(len(text)), 0.0]
+
+
+def test_text_hash_normalizes_whitespace():
+    """text_hash fonksiyonunun boşluk farklarını yok saydığını test eder."""
+    assert text_hash("Madde 5  -  Yaz okulu\n") == text_hash("Madde 5 - Yaz okulu")
+
+
+def test_only_misses_are_embedded(tmp_path):
+    """Önbellekte olan ve tekrar eden metinlerin modele gönderilmediğini test eder."""
+    store = EmbeddingStore(str(tmp_path / "cache.sqlite3"))
+    model = CountingEmbeddings()
+    cached = CachedEmbeddings(model, "test-model", store=store, batch_size=2)
+
+    first = cached.embed_documents(["a", "bb", "a"])
+    assert model.embedded == ["a", "bb"]
+    assert first == [[1.0, 1.0], [2.0, 1.0], [1.0, 1.0]]
+
+    second = cached.embed_documents(["bb", "ccc"])
+    assert model.embedded == ["a", "bb", "ccc"]
+    assert second == [[2.0, 1.0], [3.0, 1.0]]
+
+
+def test_cache_persists_and_is_scoped_by_model(tmp_path):
+    """Vektörlerin dosyada kalıcı olduğunu ve model adına göre ayrıldığını test eder."""
+    path = str(tmp_path / "cache.sqlite3")
+    CachedEmbeddings(CountingEmbeddings(), "model-a", store=EmbeddingStore(path)).embed_documents(["metin"])
+
+    model = CountingEmbeddings()
+    reopened = CachedEmbeddings(model, "model-a", store=EmbeddingStore(path))
+    reopened.embed_documents(["metin"])
+    assert model.embedded == []
+
+    other = CachedEmbeddings(model, "model-b", store=EmbeddingStore(path))
+    other.embed_documents(["metin"])
+    assert model.embedded == ["metin"]
+
+
+def test_query_and_document_vectors_are_separate(tmp_path):
+    """Aynı metnin sorgu ve doküman vektörlerinin ayrı saklandığını test eder."""
+    model = CountingEmbeddings()
+    cached = CachedEmbeddings(model, "test-model", store=EmbeddingStore(str(tmp_path / "c.sqlite3")))
+    assert cached.embed_documents(["soru"]) == [[4.0, 1.0]]
+    assert cached.embed_query("soru") == [4.0, 0.0]
+    assert cached.embed_query("soru") == [4.0, 0.0]
+    assert model.embedded == ["soru", "soru"]
+
+
+def test_queries_are_not_written_to_disk_and_cache_is_bounded(tmp_path):
+    """Soruların diske yazılmadığını, bellek önbelleğinin boyut ve süreyle sınırlı olduğunu test eder."""
+    path = str(tmp_path / "c.sqlite3")
+    store = EmbeddingStore(path)
+    store.put_many("test-model", [("query:" + text_hash("eski soru"), [1.0, 0.0])])
+    store.close()
+
+    model = CountingEmbeddings()
+    store = EmbeddingStore(path)
+    cached = CachedEmbeddings(model, "test-model", store=store, query_cache_size=2, query_ttl=60)
+    for question in ["a", "bb", "a", "ccc", "bb"]:
+        cached.embed_query(question)
+
+    # "ccc" eklenince en az kullanılan "bb" çıkarıldı
+    assert model.embedded == ["a", "bb", "ccc", "bb"]
+    assert store._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] == 0
+
+    cached.query_ttl = 0
+    cached.embed_query("ccc")
+    assert model.embedded[-1] == "ccc"
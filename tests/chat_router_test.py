@@ -0,0 +1,157 @@
+import asyncio
+import time
+from typing import Any
+
+from langchain_core.callbacks import AsyncCallbackHandler, BaseCallbackHandler
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from chat_models.router import OPEN, RoutingChatModel
+
+
+class StubProvider(BaseChatModel):
+    """Gecikmeli cevap veren, istenirse hata fırlatan ve token'ları callback'e bildiren yerel sağlayıcı."""
+
+    answer: str
+    latency: float = 0.0
+    fail: bool = False
+    calls: int = 0
+    model_name: str = "stub"
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        self.calls += 1
+        time.sleep(self.latency)
+        if self.fail:
+            raise ConnectionError(f"{self.answer} erişilemez")
+        for word in self.answer.split():
+            if run_manager:
+                run_manager.on_llm_new_token(word + " ")
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.answer))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.fail:
+            raise ConnectionError(f"{self.answer} erişilemez")
+        for word in self.answer.split():
+            if run_manager:
+                await run_manager.on_llm_new_token(word + " ")
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.answer))])
+
+
+class TokenCollector(AsyncCallbackHandler):
+    def __init__(self):
+        self.tokens = []
+
+    async def on_llm_new_token(self, token, **kwargs):
+        self.tokens.append(token)
+
+
+class SyncTokenCollector(BaseCallbackHandler):
+    def __init__(self):
+        self.tokens = []
+
+    def on_llm_new_token(self, token, **kwargs):
+        self.tokens.append(token)
+
+
+def make_router(*providers, **kwargs):
+    return RoutingChatModel(
+        providers=list(providers), names=[p.answer for p in providers], **kwargs
+    )
+
+
+def test_fallback_on_error_and_timeout():
+    """Hata veren ve zaman aşımına uğrayan sağlayıcıdan sonrakine geçildiğini test eder."""
+    broken = StubProvider(answer="bozuk", fail=True)
+    slow = StubProvider(answer="yavaş", latency=1.0)
+    healthy = StubProvider(answer="sağlam cevap")
+    router = make_router(broken, slow, healthy, timeout=0.1, hedge_percentile=None)
+
+    start = time.perf_counter()
+    assert router.invoke("soru").content == "sağlam cevap"
+    assert time.perf_counter() - start < 0.5
+    stats = router.stats()
+    assert stats["bozuk"]["failures"] == 1
+    assert stats["yavaş"]["timeouts"] == 1
+    assert stats["sağlam cevap"]["wins"] == 1
+
+
+def test_circuit_breaker_skips_failing_provider_until_reset():
+    """Art arda hata alan sağlayıcının devresinin açılıp süre dolana kadar atlandığını test eder."""
+    broken = StubProvider(answer="bozuk", fail=True)
+    healthy = StubProvider(answer="yedek")
+    router = make_router(broken, healthy, failure_threshold=2, reset_timeout=0.2, hedge_percentile=None)
+
+    for _ in range(4):
+        assert router.invoke("soru").content == "yedek"
+    assert broken.calls == 2
+    assert router.stats()["bozuk"]["state"] == OPEN
+
+    # Süre dolunca tek deneme isteği geçer; başarılıysa devre kapanır
+    time.sleep(0.25)
+    broken.fail = False
+    assert router.invoke("soru").content == "bozuk"
+    assert router.stats()["bozuk"]["state"] == "closed"
+
+
+def test_hedged_request_wins_when_primary_is_slow():
+    """Birincil sağlayıcı yüzdelik süresini aşınca gönderilen ikinci isteğin cevabının kullanıldığını test eder."""
+    primary = StubProvider(answer="birincil", latency=0.01)
+    secondary = StubProvider(answer="ikincil", latency=0.01)
+    router = make_router(primary, secondary, hedge_percentile=90, hedge_min_samples=5)
+
+    for _ in range(5):
+        assert router.invoke("soru").content == "birincil"
+    assert secondary.calls == 0
+
+    primary.latency = 1.0
+    start = time.perf_counter()
+    assert router.invoke("soru").content == "ikincil"
+    assert time.perf_counter() - start < 0.5
+    assert router.stats()["birincil"]["hedges"] == 1
+
+
+def test_tokens_are_forwarded_from_one_provider():
+    """Akışta yalnızca tek bir sağlayıcının token'larının iletildiğini test eder."""
+    broken = StubProvider(answer="bozuk", fail=True)
+    healthy = StubProvider(answer="merhaba dünya")
+    router = make_router(broken, healthy, hedge_percentile=None)
+    collector = TokenCollector()
+
+    async def run():
+        return await router.ainvoke("soru", config={"callbacks": [collector]})
+
+    assert asyncio.run(run()).content == "merhaba dünya"
+    assert collector.tokens == ["merhaba ", "dünya "]
+    assert router.model_name == "stub"
+
+
+class SyncOnlyProvider(StubProvider):
+    """Async yolu kullanılırsa hata veren sağlayıcı (ör. başka bir loop'a bağlı async istemci)."""
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        raise RuntimeError("async istemci başka bir event loop'a bağlı")
+
+
+def test_sync_invoke_uses_provider_sync_path():
+    """Senkron invoke'un sağlayıcıların senkron yolunu kullandığını ve çalışan bir loop içinden de çağrılabildiğini test eder."""
+    broken = SyncOnlyProvider(answer="bozuk", fail=True)
+    healthy = SyncOnlyProvider(answer="merhaba dünya")
+    router = make_router(broken, healthy, hedge_percentile=None)
+    collector = SyncTokenCollector()
+
+    assert router.invoke("soru", config={"callbacks": [collector]}).content == "merhaba dünya"
+    assert collector.tokens == ["merhaba ", "dünya "]
+    assert router.stats()["bozuk"]["failures"] == 1
+
+    # Ör. bir event loop'tan senkron çağrılan araçlar: asyncio.run kullanılmadığı için hata vermez
+    async def run():
+        return router.invoke("soru")
+
+    assert asyncio.run(run()).content == "merhaba dünya"
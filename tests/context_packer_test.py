@@ -0,0 +1,140 @@
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from retriever.context_packer import (
+    ContextPackingRetriever, count_tokens, merge_adjacent, pack_context, relevance_cutoff, token_budget,
+)
+from retriever.hybrid import HybridRetriever
+from retriever.retriever import TOP_K, setup_context_packing
+from tests.hybrid_retriever_test import CHUNKS, FixedVectorStore, make_bm25
+from tests.rerank_test import ListRetriever
+
+PAGE = " ".join(f"Madde {i}: öğrenci bu maddeye göre işlem yapar." for i in range(1, 30))
+
+
+def split_page(source="yonetmelik.pdf", page=3):
+    splitter = RecursiveCharacterTextSplitter(chunk_size=120, chunk_overlap=30, add_start_index=True)
+    return splitter.split_documents([Document(page_content=PAGE, metadata={"source": source, "page": page})])
+
+
+def test_merge_adjacent_restores_page_text():
+    """Aynı sayfadaki çakışan komşu parçaların orijinal metne birleştirildiğini test eder."""
+    chunks = split_page()
+    merged = merge_adjacent([chunks[3], chunks[1], chunks[2], chunks[7]])
+
+    assert len(merged) == 2
+    start = chunks[1].metadata["start_index"]
+    end = chunks[3].metadata["start_index"] + len(chunks[3].page_content)
+    assert merged[0].page_content == PAGE[start:end]
+    assert merged[0].metadata["start_index"] == start
+    assert merged[1].page_content == chunks[7].page_content
+
+
+def test_merge_keeps_other_pages_and_unpositioned_chunks():
+    """Farklı sayfadaki ve start_index'i olmayan parçaların birleştirilmediğini test eder."""
+    first, second = split_page(page=1)[0], split_page(page=2)[1]
+    plain = Document(page_content="konum bilgisi yok")
+    assert merge_adjacent([first, plain, second]) == [first, plain, second]
+
+
+def test_pack_context_fills_budget_and_skips_contained_chunks():
+    """Bütçeye sığan parçaların sırayla seçildiğini, başka parçanın içindeki parçanın atlandığını test eder."""
+    long = Document(page_content="uzun " * 300)
+    short = [Document(page_content=f"kısa parça {i}") for i in range(5)]
+    contained = Document(page_content="kısa parça 1")
+    budget = sum(count_tokens(d.page_content) for d in short[:3])
+
+    packed = pack_context([short[0], long, contained, short[1], short[2], short[3]], budget)
+    assert [d.page_content for d in packed] == [d.page_content for d in short[:3]]
+    # En iyi parça bütçeyi aşsa da gönderilir
+    assert pack_context([long] + short, 5) == [long]
+
+
+def test_budget_per_model_and_retriever():
+    """Model adına göre bütçe seçildiğini ve retriever'ın paketlenmiş listeyi döndürdüğünü test eder."""
+
+    class FakeChat:
+        model_name = "gpt-4"
+
+    assert token_budget(FakeChat()) == 2000
+    assert token_budget(FakeChat(), {"gpt-4": 500}) == 500
+    assert token_budget(object()) == 1500
+
+    chunks = split_page()
+    retriever = ContextPackingRetriever(base_retriever=ListRetriever(documents=[chunks[2], chunks[0], chunks[1]]))
+    end = chunks[2].metadata["start_index"] + len(chunks[2].page_content)
+    assert [d.page_content for d in retriever.invoke("madde")] == [PAGE[:end]]
+
+
+class TopicEmbeddings:
+    """Metni, içerdiği konu kelimelerine göre vektörleyen sahte embedding modeli."""
+
+    TOPICS = ["yaz okulu", "harç", "mazeret", "staj"]
+
+    def _vector(self, text):
+        return [1.0 + text.count(topic) if topic in text else 0.1 for topic in self.TOPICS]
+
+    def embed_query(self, text):
+        return self._vector(text.lower())
+
+    def embed_documents(self, texts):
+        return [self._vector(text.lower()) for text in texts]
+
+
+def test_simple_question_packs_fewer_chunks_than_top_k():
+    """Basit bir soruda bütçe dolmasa da yalnızca ilgili parçaların gönderildiğini (TOP_K'dan az) test eder."""
+    candidates = [Document(page_content="Yaz okulu başvurusu haziranda yapılır.")] + [
+        Document(page_content=f"{topic} hakkında madde {i}.")
+        for i, topic in enumerate(["Harç", "Mazeret", "Staj", "Harç", "Staj"])
+    ]
+    retriever = ContextPackingRetriever(
+        base_retriever=ListRetriever(documents=candidates), budget=3000, embeddings=TopicEmbeddings(),
+        relevance_margin=0.05,
+    )
+    packed = retriever.invoke("Yaz okulu başvurusu ne zaman?")
+    assert len(packed) < TOP_K
+    assert packed == candidates[:1]
+
+    # Birden fazla konuyu soran soruda benzer skorlu adayların hepsi kalır, sıra korunur
+    wide = relevance_cutoff("harç ve staj", candidates, TopicEmbeddings(), margin=0.05)
+    assert [d.page_content for d in wide] == [d.page_content for d in candidates if "Harç" in d.page_content or "Staj" in d.page_content]
+    # Embedding modeli yoksa kesme yapılmaz
+    assert relevance_cutoff("yaz okulu", candidates, None, margin=0.05) == candidates
+    # Kesme varsayılan olarak kapalıdır
+    assert relevance_cutoff("yaz okulu", candidates, TopicEmbeddings()) == candidates
+
+
+class KeywordBlindEmbeddings:
+    """BM25'in bulduğu bütünleme maddesini sorudan uzak, diğer parçaları yakın gören embedding modeli."""
+
+    def _vector(self, text):
+        return [0.0, 1.0] if text == CHUNKS[0] else [1.0, 0.0]
+
+    def embed_query(self, text):
+        return [1.0, 0.0]
+
+    def embed_documents(self, texts):
+        return [self._vector(text) for text in texts]
+
+
+class EmbeddedVectorStore(FixedVectorStore):
+    """Embedding modeli olan sabit sonuçlu vektör deposu."""
+
+    @property
+    def embeddings(self):
+        return KeywordBlindEmbeddings()
+
+
+def test_bm25_only_hit_survives_packing():
+    """Vektör aramasının bulmadığı, yalnızca BM25'in bulduğu parçanın varsayılan paketlemede atılmadığını test eder."""
+    vector_results = [Document(page_content=text) for text in (CHUNKS[2], CHUNKS[3])]
+    hybrid = HybridRetriever(vectorstore=EmbeddedVectorStore(vector_results), bm25=make_bm25(), k=3, fetch_k=3)
+    query = "Bütünleme sınavı"
+    assert CHUNKS[0] in [d.page_content for d in hybrid.invoke(query)]
+
+    packed = setup_context_packing(hybrid, object(), enabled=True).invoke(query)
+    assert CHUNKS[0] in [d.page_content for d in packed]
+
+    # Bi-encoder kesmesi açıkça açılırsa aynı parça atılabilir
+    strict = ContextPackingRetriever(base_retriever=hybrid, embeddings=KeywordBlindEmbeddings(), relevance_margin=0.05)
+    assert CHUNKS[0] not in [d.page_content for d in strict.invoke(query)]
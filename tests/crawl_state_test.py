@@ -0,0 +1,106 @@
+import asyncio
+
+import httpx
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+import tests.mongomock_compat  # noqa: E402,F401  mongomock / pymongo bulk_write uyumu
+
+import scraper.scraper as scraper
+from utils.crawl_state import CrawlStateStore, content_hash
+from utils.crawler import Crawler
+
+BASE_URL = "http://bil.omu.edu.tr"
+LIST_PAGE = "".join(
+    f'<article class="news-item"><a href="/haber/{i}">Haber {i}</a></article>' for i in range(3)
+)
+ARTICLE = """<html><body><h1 class="heading-title">Duyuru {i}</h1>
+<div class="news-wrapper"><p class="meta text-muted">Yazar: Bölüm | Tarih: 10 Ocak 2024</p>
+<p>{text}</p></div></body></html>"""
+
+
+class StubSite:
+    """ETag üreten ve If-None-Match eşleşirse 304 dönen sahte bölüm sitesi."""
+
+    def __init__(self):
+        self.pages = {"/haberler/": LIST_PAGE, "/haberler/page:1": LIST_PAGE}
+        for i in range(3):
+            self.pages[f"/haber/{i}"] = ARTICLE.format(i=i, text=f"Duyuru metni {i}")
+        self.statuses = []
+
+    def handler(self, request: httpx.Request):
+        body = self.pages[request.url.path]
+        etag = f'"{content_hash(body)[:16]}"'
+        if request.headers.get("If-None-Match") == etag:
+            self.statuses.append(304)
+            return httpx.Response(304, headers={"ETag": etag})
+        self.statuses.append(200)
+        return httpx.Response(200, text=body, headers={"ETag": etag, "Content-Type": "text/html; charset=utf-8"})
+
+
+@pytest.fixture
+def db(monkeypatch):
+    client = mongomock.MongoClient()
+    monkeypatch.setattr(scraper, "get_db_connection", lambda: client)
+    return client[scraper.MONGO_DB_NAME]
+
+
+def run_crawl(site, db):
+    state = scraper.get_crawl_state_store()
+    crawler = Crawler(delay=0.0, transport=httpx.MockTransport(site.handler))
+    site.statuses = []
+    results = asyncio.run(scraper.crawl(
+        {"bilgisayar": BASE_URL}, pagination=1, crawler=crawler, state=state, incremental=False
+    ))
+    return results["bilgisayar"], state
+
+
+def test_recrawl_sends_conditional_requests_and_skips_unchanged_pages(db):
+    """İkinci taramada tüm sayfaların 304 ile atlandığını ve kayıtların çoğalmadığını test eder."""
+    site = StubSite()
+    saved, state = run_crawl(site, db)
+    assert len(saved) == 3
+    assert state.stats["new"] == 5
+    assert db["page_contents"].count_documents({}) == 3
+
+    saved, state = run_crawl(site, db)
+    assert saved == []
+    assert site.statuses == [304] * 5
+    assert state.stats["not_modified"] == 5
+    assert db["page_contents"].count_documents({}) == 3
+    assert db[scraper.CRAWL_STATE_COLLECTION].count_documents({}) == 5
+
+
+def test_only_changed_article_is_upserted(db):
+    """Değişen haberin aynı kayıt üzerine yazıldığını, diğerlerinin dokunulmadığını test eder."""
+    site = StubSite()
+    run_crawl(site, db)
+    first_id = db["page_contents"].find_one({"url": f"{BASE_URL}/haber/1"})["_id"]
+
+    site.pages["/haber/1"] = ARTICLE.format(i=1, text="Güncellenmiş duyuru metni")
+    saved, state = run_crawl(site, db)
+
+    assert [page.url for page in saved] == [f"{BASE_URL}/haber/1"]
+    assert state.stats["changed"] == 1 and state.stats["not_modified"] == 4
+    document = db["page_contents"].find_one({"url": f"{BASE_URL}/haber/1"})
+    assert document["_id"] == first_id
+    assert "Güncellenmiş" in document["content"]
+    assert db["page_contents"].count_documents({}) == 3
+
+
+def test_same_content_without_etag_is_not_rewritten():
+    """Sunucu 304 desteklemese de aynı içerik hash'inin değişmemiş sayıldığını test eder."""
+    collection = mongomock.MongoClient().db.crawl_state
+    store = CrawlStateStore(collection)
+    store.record("http://a/1", {"Last-Modified": "Wed, 10 Jan 2024 10:00:00 GMT"}, content_hash("metin"))
+
+    store = CrawlStateStore(collection)
+    store.load()
+    assert store.conditional_headers("http://a/1") == {"If-Modified-Since": "Wed, 10 Jan 2024 10:00:00 GMT"}
+    assert store.is_unchanged("http://a/1", content_hash("metin"))
+    assert not store.is_unchanged("http://a/1", content_hash("yeni metin"))
+
+    before = collection.find_one({"_id": "http://a/1"})["last_seen"]
+    store.mark_seen("http://a/1", not_modified=False)
+    assert store.flush() == 1
+    assert collection.find_one({"_id": "http://a/1"})["last_seen"] >= before
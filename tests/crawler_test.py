@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import httpx
+
+from utils.crawler import Crawler
+
+
+def make_transport(log, latency=0.02, status=None):
+    """Her isteği (host, başlangıç, bitiş) olarak kaydeden, liste sayfasında bağlantı döndüren sahte site."""
+    status = status or {}
+    in_flight = {}
+
+    async def handler(request: httpx.Request):
+        host = request.url.host
+        in_flight[host] = in_flight.get(host, 0) + 1
+        start = time.monotonic()
+        await asyncio.sleep(latency)
+        log.append((host, request.url.path, start, in_flight[host]))
+        in_flight[host] -= 1
+        codes = status.get(request.url.path)
+        if codes:
+            return httpx.Response(codes.pop(0))
+        if request.url.path == "/haberler/":
+            links = "".join(f'<a href="/haber/{i}">h</a>' for i in range(6))
+            return httpx.Response(200, text=links)
+        return httpx.Response(200, text=f"haber {request.url.path}")
+
+    return httpx.MockTransport(handler)
+
+
+async def crawl(crawler, hosts):
+    pages = []
+
+    async def on_article(response):
+        pages.append(str(response.url))
+
+    async def on_list(response, host):
+        for href in response.text.split('"')[1::2]:
+            crawler.enqueue(f"http://{host}{href}", on_article)
+            # Aynı URL ikinci kez kuyruğa girmez
+            crawler.enqueue(f"http://{host}{href}", on_article)
+
+    async with crawler:
+        for host in hosts:
+            crawler.enqueue(f"http://{host}/haberler/", on_list, host=host)
+        await crawler.join()
+    return pages
+
+
+def test_frontier_fetches_every_url_once_within_per_host_limit():
+    """Handler'ın eklediği URL'lerin bir kez getirildiğini ve host başına sınırın aşılmadığını test eder."""
+    log = []
+    crawler = Crawler(per_host_concurrency=2, delay=0.0, transport=make_transport(log))
+    pages = asyncio.run(crawl(crawler, ["a.omu.edu.tr", "b.omu.edu.tr"]))
+
+    assert len(pages) == len(set(pages)) == 12
+    assert len(log) == 14
+    assert max(in_flight for *_, in_flight in log) == 2
+    assert crawler.host_stats() == {"a.omu.edu.tr": 7, "b.omu.edu.tr": 7}
+    assert crawler.stats["pages"] == 14 and crawler.stats["errors"] == 0
+
+
+def test_slow_host_does_not_hold_back_other_hosts():
+    """Nezaket beklemesinin host başına uygulandığını, diğer host'ları bekletmediğini test eder."""
+    log = []
+    crawler = Crawler(per_host_concurrency=1, delay=0.05, transport=make_transport(log, latency=0.0))
+    start = time.monotonic()
+    asyncio.run(crawl(crawler, ["a.omu.edu.tr", "b.omu.edu.tr", "c.omu.edu.tr"]))
+    elapsed = time.monotonic() - start
+
+    for host in ("a.omu.edu.tr", "b.omu.edu.tr", "c.omu.edu.tr"):
+        starts = sorted(t for h, _, t, _ in log if h == host)
+        assert all(b - a >= 0.045 for a, b in zip(starts, starts[1:]))
+    # Host'lar paralel: 7 istek x 50 ms ~ 0.3 sn (sıralı olsaydı ~1 sn)
+    assert elapsed < 0.7
+
+
+def test_retries_transient_errors_and_counts_failures():
+    """503'ün yeniden denendiğini, 404'ün taramayı durdurmadan hata sayıldığını test eder."""
+    log = []
+    status = {"/haber/1": [503], "/haber/2": [404]}
+    crawler = Crawler(delay=0.0, backoff_base=0.01, transport=make_transport(log, latency=0.0, status=status))
+    pages = asyncio.run(crawl(crawler, ["a.omu.edu.tr"]))
+
+    assert "http://a.omu.edu.tr/haber/1" in pages
+    assert "http://a.omu.edu.tr/haber/2" not in pages
+    assert len(pages) == 5
+    assert crawler.stats["retries"] == 1 and crawler.stats["errors"] == 1
+
+
+def test_download_from_thread_uses_crawler_loop(tmp_path):
+    """Senkron koddan (to_thread) yapılan indirmenin dosyayı tarayıcı üzerinden yazdığını test eder."""
+    log = []
+    crawler = Crawler(delay=0.0, transport=make_transport(log, latency=0.0))
+    destination = tmp_path / "ekler" / "dosya.pdf"
+
+    async def run():
+        async with crawler:
+            return await asyncio.to_thread(
+                crawler.download_from_thread, "http://a.omu.edu.tr/ek.pdf", str(destination)
+            )
+
+    written = asyncio.run(run())
+    assert destination.read_bytes() == b"haber /ek.pdf"
+    assert written == len(b"haber /ek.pdf")
+    assert crawler.stats["downloads"] == 1
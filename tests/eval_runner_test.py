@@ -0,0 +1,182 @@
+import asyncio
+import json
+import time
+from typing import Any
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.language_models.chat_models import BaseChatModel, generate_from_stream
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult, LLMResult
+
+from utils.eval_runner import AsyncRateLimiter, EvaluationRunner, UsageCallback
+
+QUESTIONS = [{"query": f"soru {i}"} for i in range(3)]
+
+
+class StubChain:
+    """Retriever ve chat modelinin adını cevaba yazan, istenen sorularda hata veren zincir."""
+
+    def __init__(self, retriever, chat_model, failing=(), latency=0.01):
+        self.retriever = retriever
+        self.chat_model = chat_model
+        self.failing = failing
+        self.latency = latency
+        self.calls = []
+
+    async def ainvoke(self, inputs, config=None):
+        self.calls.append(inputs["query"])
+        await asyncio.sleep(self.latency)
+        if inputs["query"] in self.failing:
+            raise TimeoutError("sağlayıcı cevap vermedi")
+        for callback in config["callbacks"]:
+            message = AIMessage(content="cevap", usage_metadata={"input_tokens": 10, "output_tokens": 2, "total_tokens": 12})
+            callback.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]))
+        return {
+            "query": inputs["query"],
+            "result": f"{self.retriever}+{self.chat_model}",
+            "source_documents": [Document(page_content="madde 1", metadata={"page": 1})],
+        }
+
+
+def make_runner(path, built, chains, failing=()):
+    def build_retriever(name):
+        built.append(name)
+        return f"index-{name}"
+
+    def build_chain(retriever, chat_model):
+        chain = StubChain(retriever, chat_model, failing)
+        chains.append(chain)
+        return chain
+
+    return EvaluationRunner(
+        build_retriever, lambda name: f"chat-{name}", build_chain,
+        checkpoint_path=str(path), rate_limits={"b": 0}, default_rpm=0, max_concurrency=3,
+    )
+
+
+def test_matrix_shares_one_index_per_embedding_and_reports_usage(tmp_path):
+    """Tüm kombinasyonların çalıştığını, her embedding için indeksin bir kez kurulduğunu test eder."""
+    built, chains = [], []
+    runner = make_runner(tmp_path / "checkpoint.jsonl", built, chains)
+    results, summary = asyncio.run(runner.run(QUESTIONS, ["e1", "e2"], ["a", "b"]))
+
+    assert built == ["e1", "e2"]
+    assert len(results) == 12
+    assert [(r["embedding_model"], r["chat_model"], r["index"]) for r in results[:4]] == [
+        ("e1", "a", 0), ("e1", "a", 1), ("e1", "a", 2), ("e1", "b", 0),
+    ]
+    assert results[-1]["response"]["result"] == "index-e2+chat-b"
+    assert results[0]["response"]["source_documents"] == [{"page_content": "madde 1", "metadata": {"page": 1}}]
+    assert len(summary) == 4
+    assert all(row["questions"] == 3 and row["errors"] == 0 for row in summary)
+    assert summary[0]["input_tokens"] == 30 and summary[0]["output_tokens"] == 6
+    json.dumps(results)
+
+
+def test_interrupted_run_resumes_from_checkpoint(tmp_path):
+    """Tekrar çalıştırmada yalnızca hata alan ve eksik soruların çalıştırıldığını test eder."""
+    path = tmp_path / "checkpoint.jsonl"
+    built, chains = [], []
+    results, summary = asyncio.run(
+        make_runner(path, built, chains, failing={"soru 1"}).run(QUESTIONS, ["e1"], ["a", "b"])
+    )
+    assert sum(row["errors"] for row in summary) == 2
+    # Kesilen çalışmanın yarım yazılmış satırı
+    with open(path, "a", encoding="utf-8") as file:
+        file.write('{"embedding_model": "e1", "chat')
+
+    built, chains = [], []
+    results, summary = asyncio.run(make_runner(path, built, chains).run(QUESTIONS, ["e1", "e2"], ["a", "b"]))
+    calls = {(chain.retriever, chain.chat_model): chain.calls for chain in chains}
+    assert calls[("index-e1", "chat-a")] == ["soru 1"]
+    assert calls[("index-e1", "chat-b")] == ["soru 1"]
+    assert sorted(calls[("index-e2", "chat-a")]) == ["soru 0", "soru 1", "soru 2"]
+    assert len(results) == 12
+    assert all(row["errors"] == 0 for row in summary)
+
+
+def test_completed_embedding_is_not_rebuilt(tmp_path):
+    """Checkpoint'te tamamlanmış embedding modelinin indeksinin yeniden kurulmadığını test eder."""
+    path = tmp_path / "checkpoint.jsonl"
+    asyncio.run(make_runner(path, [], []).run(QUESTIONS, ["e1"], ["a"]))
+    built = []
+    results, _ = asyncio.run(make_runner(path, built, []).run(QUESTIONS, ["e1", "e2"], ["a"]))
+    assert built == ["e2"]
+    assert len(results) == 6
+
+
+def test_rate_limiter_spaces_requests():
+    """Dakikalık sınırın istekleri aralıklandırdığını ve eşzamanlılığı sınırladığını test eder."""
+    active = {"now": 0, "max": 0}
+
+    async def request(limiter):
+        async with limiter:
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+            await asyncio.sleep(0.05)
+            active["now"] -= 1
+
+    async def run():
+        # 1200 istek/dk = 50 ms'de bir istek
+        limiter = AsyncRateLimiter(requests_per_minute=1200, max_concurrency=2)
+        start = time.perf_counter()
+        await asyncio.gather(*(request(limiter) for _ in range(5)))
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(run())
+    assert elapsed >= 0.2
+    assert active["max"] <= 2
+
+
+def test_usage_callback_reads_llm_output_token_usage():
+    """usage_metadata olmayan sağlayıcılarda llm_output["token_usage"] kullanıldığını test eder."""
+    usage = UsageCallback()
+    usage.on_llm_end(LLMResult(
+        generations=[[ChatGeneration(message=AIMessage(content="cevap"))]],
+        llm_output={"token_usage": {"prompt_tokens": 7, "completion_tokens": 3}},
+    ))
+    assert (usage.input_tokens, usage.output_tokens, usage.reported) == (7, 3, True)
+
+
+class UsageStreamingChatModel(BaseChatModel):
+    """stream_usage=True ile çalışan OpenAI uyumlu model gibi, kullanımı son parçada bildiren akışlı model."""
+
+    streaming: bool = False
+
+    @property
+    def _llm_type(self) -> str:
+        return "usage-streaming"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        # ChatOpenAI gibi: streaming açıksa cevap akıştan birleştirilir
+        assert self.streaming
+        return generate_from_stream(self._stream(messages, stop, run_manager, **kwargs))
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        for token in ["Bütünleme ", "haziranda."]:
+            if run_manager:
+                run_manager.on_llm_new_token(token)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+        yield ChatGenerationChunk(message=AIMessageChunk(
+            content="", usage_metadata={"input_tokens": 12, "output_tokens": 2, "total_tokens": 14},
+        ))
+
+
+def test_usage_callback_counts_streaming_model_tokens():
+    """Akışlı (streaming=True) modelde token kullanımının UsageCallback'e ulaştığını test eder."""
+    usage = UsageCallback()
+    output = UsageStreamingChatModel(streaming=True).invoke("soru", config={"callbacks": [usage]})
+    assert output.content == "Bütünleme haziranda."
+    assert (usage.input_tokens, usage.output_tokens, usage.reported) == (12, 2, True)
+
+
+@pytest.mark.parametrize("provider", ["deepseek", "openai"])
+def test_openai_compatible_providers_stream_usage(provider, monkeypatch):
+    """OpenAI uyumlu sağlayıcıların akışta token kullanımını istediğini test eder."""
+    pytest.importorskip("langchain_openai")
+    import importlib
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    model = importlib.import_module(f"chat_models.{provider}_chat").get_chat_model()
+    assert model.stream_usage is True
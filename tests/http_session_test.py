@@ -0,0 +1,98 @@
+import concurrent.futures
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.crawler import Crawler
+from utils.http_session import PooledSession, RetryPolicy
+
+BODY = ("Yaz okulu duyurusu. " * 200).encode("utf-8")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Keep-alive destekleyen, istenirse gzip'leyen ve /flaky için önce 503 dönen sunucu."""
+
+    protocol_version = "HTTP/1.1"
+    flaky = {}
+
+    def do_GET(self):
+        if self.path.startswith("/flaky") and self.flaky.get(self.path, 0) < 1:
+            self.flaky[self.path] = self.flaky.get(self.path, 0) + 1
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+        body = BODY
+        self.send_response(200)
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def base_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_threads_share_pooled_connections(base_url):
+    """Farklı thread'lerin session'larının aynı havuzu paylaştığını ve bağlantıların tekrar kullanıldığını test eder."""
+    pool = PooledSession(pool_maxsize=4, backoff_factor=0)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        responses = list(executor.map(lambda i: pool.get(f"{base_url}/haber/{i}"), range(40)))
+        other = executor.submit(pool.session).result()
+
+    assert all(response.content == BODY for response in responses)
+    assert other is not pool.session()
+    assert other.get_adapter(base_url) is pool.session().get_adapter(base_url)
+    metrics = pool.metrics.snapshot()
+    assert metrics["requests"] == 40
+    assert metrics["connections"] <= 4
+    assert metrics["reuse_rate"] >= 0.9
+    pool.close()
+
+
+def test_gzip_is_negotiated_and_wire_bytes_are_counted(base_url):
+    """gzip istendiğini ve ağdan gelen baytın çözülmüş gövdeden küçük sayıldığını test eder."""
+    pool = PooledSession()
+    assert pool.get(f"{base_url}/haber/1").content == BODY
+    metrics = pool.metrics.snapshot()
+    assert metrics["content_bytes"] == len(BODY)
+    assert 0 < metrics["wire_bytes"] < len(BODY) / 10
+    assert metrics["hosts"]["127.0.0.1"]["requests"] == 1
+
+
+def test_retries_503_and_counts_streamed_download(base_url, tmp_path):
+    """503 cevabının yeniden denendiğini ve parça parça okunan cevabın metriklere eklendiğini test eder."""
+    pool = PooledSession(backoff_factor=0)
+    with pool.get(f"{base_url}/flaky/ek.pdf", stream=True) as response:
+        assert response.status_code == 200
+        written = sum(len(chunk) for chunk in response.iter_content(1024))
+        pool.record_transfer(response, written)
+
+    metrics = pool.metrics.snapshot()
+    assert written == len(BODY)
+    assert metrics["requests"] == 1 and metrics["content_bytes"] == len(BODY)
+
+
+def test_crawler_and_pooled_session_share_retry_policy():
+    """Crawler ve PooledSession'ın aynı yeniden deneme kuralını kullandığını test eder."""
+    policy = RetryPolicy(max_retries=2, backoff_base=0.5, backoff_max=4.0)
+    assert policy.should_retry(0) and policy.should_retry(1, 503) and policy.should_retry(0, 429)
+    assert not policy.should_retry(0, 404) and not policy.should_retry(2, 503)
+    assert policy.delay(0, retry_after="30") == 4.0
+    assert 0 <= policy.delay(5) <= 4.0
+
+    assert type(Crawler().retry) is type(PooledSession().retry) is RetryPolicy
@@ -0,0 +1,73 @@
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+from retriever.hybrid import BM25Index, HybridRetriever, reciprocal_rank_fusion, tokenize
+from retriever.indexing import chunk_id
+
+CHUNKS = [
+    "Madde 12 - Bütünleme sınavına final sınavına girmeyen öğrenciler giremez.",
+    "Madde 14 - Mazeret sınavı hakkı sağlık raporu olan öğrencilere verilir.",
+    "Madde 3 - Bu yönetmelik Ondokuz Mayıs Üniversitesi önlisans ve lisans programlarını kapsar.",
+    "Madde 20 - Yaz okulunda alınabilecek ders sayısı en fazla üçtür.",
+]
+
+
+class FixedVectorStore(VectorStore):
+    """Sorudan bağımsız olarak sabit sırada sonuç döndüren sahte vektör deposu."""
+
+    def __init__(self, documents):
+        self.documents = documents
+
+    def add_texts(self, texts, metadatas=None, **kwargs):
+        raise NotImplementedError
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, **kwargs):
+        raise NotImplementedError
+
+    def similarity_search(self, query, k=4, **kwargs):
+        return self.documents[:k]
+
+
+def make_bm25():
+    index = BM25Index()
+    index.update({chunk_id(Document(page_content=text)): Document(page_content=text) for text in CHUNKS}, [])
+    return index
+
+
+def test_tokenize_stems_turkish_inflections():
+    """Çekimli kelimelerin aynı terime indiğini, madde numaralarının korunduğunu test eder."""
+    assert tokenize("Bütünlemeye") == tokenize("bütünleme")
+    assert tokenize("sınavları") == tokenize("Sınav")
+    assert tokenize("YÖNETMELİĞİN") == tokenize("yönetmelik")
+    assert "12" in tokenize("Madde 12 nedir?")
+
+
+def test_bm25_finds_exact_terms():
+    """BM25'in terim ve madde numarası içeren parçayı ilk sırada bulduğunu test eder."""
+    index = make_bm25()
+    assert index.search("mazeret sınavı", k=1)[0][0].page_content == CHUNKS[1]
+    assert index.search("madde 20", k=1)[0][0].page_content == CHUNKS[3]
+    assert index.search("kuantum fiziği") == []
+
+
+def test_bm25_update_removes_deleted_chunks():
+    """Silinen parçanın sonraki aramalarda dönmediğini test eder."""
+    index = make_bm25()
+    index.update({}, [chunk_id(Document(page_content=CHUNKS[1]))])
+    assert all(doc.page_content != CHUNKS[1] for doc, _ in index.search("mazeret"))
+
+
+def test_rrf_merges_duplicates():
+    """Aynı parçanın iki listede de bulunduğunda tek sonuç olarak öne çıktığını test eder."""
+    a, b, c = (Document(page_content=text) for text in CHUNKS[:3])
+    fused = reciprocal_rank_fusion([[a, b], [Document(page_content=b.page_content), c]], limit=3)
+    assert [doc.page_content for doc in fused] == [b.page_content, a.page_content, c.page_content]
+
+
+def test_hybrid_retriever_surfaces_keyword_match():
+    """Vektör aramasının kaçırdığı terimin hibrit sonuçlarda yer aldığını test eder."""
+    vector_results = [Document(page_content=text) for text in (CHUNKS[2], CHUNKS[3], CHUNKS[0])]
+    retriever = HybridRetriever(vectorstore=FixedVectorStore(vector_results), bm25=make_bm25(), k=2, fetch_k=3)
+    results = retriever.invoke("Bütünleme sınavı")
+    assert CHUNKS[0] in [doc.page_content for doc in results]
@@ -0,0 +1,111 @@
+import asyncio
+
+import httpx
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+import tests.mongomock_compat  # noqa: E402,F401  mongomock / pymongo bulk_write uyumu
+
+import scraper.scraper as scraper
+from utils.crawler import Crawler
+
+BASE_URL = "http://bil.omu.edu.tr"
+PER_PAGE = 3
+
+
+class PaginatedSite:
+    """Haberleri en yeniden eskiye, sayfa başına PER_PAGE haber listeleyen sahte bölüm sitesi."""
+
+    def __init__(self, count):
+        self.articles = [f"h{i}" for i in range(count, 0, -1)]
+        self.requests = []
+        self.failing = set()
+
+    def publish(self, count):
+        start = len(self.articles)
+        self.articles = [f"h{i}" for i in range(start + count, start, -1)] + self.articles
+
+    def handler(self, request: httpx.Request):
+        path = request.url.path
+        self.requests.append(path)
+        if path in self.failing:
+            return httpx.Response(404)
+        if path.startswith("/haberler/page:"):
+            page = int(path.rsplit(":", 1)[-1])
+            items = self.articles[(page - 1) * PER_PAGE:page * PER_PAGE]
+            body = "".join(f'<article class="news-item"><a href="/haber/{a}">{a}</a></article>' for a in items)
+        else:
+            body = f'<h1 class="heading-title">{path}</h1><div class="news-wrapper"><p>Metin {path}</p></div>'
+        return httpx.Response(200, text=body, headers={"Content-Type": "text/html; charset=utf-8"})
+
+    def list_requests(self):
+        return [path for path in self.requests if path.startswith("/haberler/")]
+
+
+@pytest.fixture
+def db(monkeypatch):
+    client = mongomock.MongoClient()
+    monkeypatch.setattr(scraper, "get_db_connection", lambda: client)
+    return client[scraper.MONGO_DB_NAME]
+
+
+def run_crawl(site, pagination=2, backfill=False):
+    site.requests = []
+    crawler = Crawler(delay=0.0, transport=httpx.MockTransport(site.handler))
+    results = asyncio.run(scraper.crawl(
+        {"bilgisayar": BASE_URL}, pagination=pagination, crawler=crawler,
+        state=scraper.get_crawl_state_store(), incremental=True, backfill=backfill,
+    ))
+    return sorted(page.url.rsplit("/", 1)[-1] for page in results["bilgisayar"])
+
+
+def test_first_run_is_limited_to_pagination_and_steady_state_fetches_one_page(db):
+    """İlk taramanın pagination kadar sayfa gezdiğini, yeni haber yokken tek liste sayfası getirildiğini test eder."""
+    site = PaginatedSite(12)
+    assert len(run_crawl(site)) == 6
+    assert site.list_requests() == ["/haberler/page:1", "/haberler/page:2"]
+    mark = db[scraper.CRAWL_STATE_COLLECTION].find_one({"_id": "department:bilgisayar"})
+    assert mark["url"] == f"{BASE_URL}/haber/h12"
+
+    assert run_crawl(site) == []
+    assert site.requests == ["/haberler/page:1"]
+
+
+def test_new_articles_are_fetched_until_high_water_mark(db):
+    """Yeni haberler birden fazla sayfaya yayılsa da high-water mark'a kadar gezildiğini test eder."""
+    site = PaginatedSite(6)
+    run_crawl(site)
+
+    site.publish(4)
+    assert run_crawl(site, pagination=1) == ["h10", "h7", "h8", "h9"]
+    # h6 (high-water mark) ikinci sayfada; üçüncü sayfa istenmez
+    assert site.list_requests() == ["/haberler/page:1", "/haberler/page:2"]
+    assert db[scraper.CRAWL_STATE_COLLECTION].find_one({"_id": "department:bilgisayar"})["url"] == f"{BASE_URL}/haber/h10"
+
+
+def test_backfill_goes_past_pagination_until_listing_ends(db):
+    """backfill'de pagination sınırı aşılarak liste bitene kadar gezildiğini test eder."""
+    site = PaginatedSite(10)
+    run_crawl(site, pagination=1)
+
+    saved = run_crawl(site, pagination=1, backfill=True)
+    assert saved == ["h1", "h2", "h3", "h4", "h5", "h6", "h7"]
+    assert site.list_requests() == [f"/haberler/page:{page}" for page in range(1, 6)]
+    assert db["page_contents"].count_documents({}) == 10
+
+
+def test_failed_article_does_not_advance_high_water_mark(db):
+    """Kaydedilemeyen haber varken mark'ın ilerletilmediğini ve haberin sonraki taramada alındığını test eder."""
+    site = PaginatedSite(6)
+    run_crawl(site)
+
+    site.publish(4)
+    site.failing = {"/haber/h7"}
+    assert run_crawl(site, pagination=1) == ["h10", "h8", "h9"]
+    assert db[scraper.CRAWL_STATE_COLLECTION].find_one({"_id": "department:bilgisayar"})["url"] == f"{BASE_URL}/haber/h6"
+
+    # İlk sayfadaki haberlerin hepsi bilinse de h7'nin bulunduğu ikinci sayfaya kadar gezilir
+    site.failing = set()
+    assert run_crawl(site, pagination=1) == ["h7"]
+    assert site.list_requests() == ["/haberler/page:1", "/haberler/page:2"]
+    assert db[scraper.CRAWL_STATE_COLLECTION].find_one({"_id": "department:bilgisayar"})["url"] == f"{BASE_URL}/haber/h10"
@@ -0,0 +1,116 @@
+from langchain_core.documents import Document
+
+from retriever.indexing import DocumentIndexer
+
+
+class LineSplitter:
+    """Her satırı ayrı bir parça yapan basit bölücü."""
+
+    def split_documents(self, documents):
+        return [
+            Document(page_content=line, metadata=doc.metadata)
+            for doc in documents for line in doc.page_content.splitlines() if line.strip()
+        ]
+
+
+class FakeVectorStore:
+    """Eklenen ve silinen parçaları kaydeden sahte vektör deposu."""
+
+    def __init__(self):
+        self.docs = {}
+        self.added = []
+
+    def add_documents(self, documents, ids):
+        self.added.extend(ids)
+        self.docs.update(zip(ids, documents))
+
+    def delete(self, ids):
+        for cid in ids:
+            self.docs.pop(cid, None)
+
+    def get(self, include=None):
+        return {"ids": list(self.docs)}
+
+
+def make_indexer(tmp_path, vectorstore=None):
+    return DocumentIndexer(vectorstore or FakeVectorStore(), str(tmp_path / "manifest.json"), LineSplitter())
+
+
+def doc(content, source):
+    return Document(page_content=content, metadata={"source": source})
+
+
+def test_unchanged_corpus_is_skipped(tmp_path):
+    """Değişmemiş bir korpusun yeniden indekslenmediğini test eder."""
+    vectorstore = FakeVectorStore()
+    make_indexer(tmp_path, vectorstore).index([doc("madde 1\nmadde 2", "yonetmelik.pdf")])
+    assert len(vectorstore.added) == 2
+
+    # Yeni süreç: manifest diskten okunur
+    result = make_indexer(tmp_path, vectorstore).index([doc("madde 1\nmadde 2", "yonetmelik.pdf")])
+    assert result == {"added": 0, "deleted": 0, "skipped_sources": 1}
+    assert len(vectorstore.added) == 2
+
+
+def test_changed_source_adds_new_and_deletes_stale(tmp_path):
+    """Değişen kaynağın yalnızca yeni parçalarının eklendiğini ve eskilerin silindiğini test eder."""
+    vectorstore = FakeVectorStore()
+    indexer = make_indexer(tmp_path, vectorstore)
+    indexer.index([doc("madde 1\nmadde 2", "yonetmelik.pdf")])
+    result = indexer.index([doc("madde 1\nmadde 3", "yonetmelik.pdf")])
+    assert result["added"] == 1 and result["deleted"] == 1
+    assert sorted(d.page_content for d in vectorstore.docs.values()) == ["madde 1", "madde 3"]
+
+
+def test_duplicate_upload_is_not_reembedded(tmp_path):
+    """Aynı içeriğin farklı kaynak adıyla tekrar eklenmesinin parça çoğaltmadığını test eder."""
+    vectorstore = FakeVectorStore()
+    indexer = make_indexer(tmp_path, vectorstore)
+    indexer.index([doc("ders kaydı\nmazeret sınavı", "telegram/a")])
+    result = indexer.index([doc("ders kaydı\nmazeret sınavı", "telegram/b")])
+    assert result["added"] == 0
+    assert len(vectorstore.docs) == 2
+
+
+def test_shared_chunk_survives_other_source_change(tmp_path):
+    """İki kaynağın ortak parçasının, biri değiştiğinde silinmediğini test eder."""
+    vectorstore = FakeVectorStore()
+    indexer = make_indexer(tmp_path, vectorstore)
+    indexer.index([doc("ortak\nA", "a.pdf"), doc("ortak\nB", "b.pdf")])
+    indexer.index([doc("yeni\nA", "a.pdf")])
+    assert sorted(d.page_content for d in vectorstore.docs.values()) == ["A", "B", "ortak", "yeni"]
+
+
+def test_add_documents_returns_stored_chunk_ids(tmp_path):
+    """add_documents'ın girdi dokümanlarının değil, depodaki parçaların kimliklerini döndürdüğünü test eder."""
+    from retriever.indexing import IndexedRetriever, chunk_id
+
+    vectorstore = FakeVectorStore()
+    indexer = make_indexer(tmp_path, vectorstore)
+    retriever = IndexedRetriever.model_construct(vectorstore=vectorstore, indexer=indexer)
+    indexer.index([doc("ortak", "a.pdf")])
+
+    ids = retriever.add_documents([doc("ortak\nyeni madde", "b.pdf")])
+    assert ids == [chunk_id(doc("ortak", "")), chunk_id(doc("yeni madde", ""))]
+    assert set(ids) <= set(vectorstore.docs)
+    # Ortak parçanın metadata'sı ilk kaynağınkidir, manifest iki kaynağı da tutar
+    assert vectorstore.docs[ids[0]].metadata["source"] == "a.pdf"
+    assert indexer.sources_of(ids[0]) == ["a.pdf", "b.pdf"]
+
+
+def test_same_chunk_is_kept_per_department(tmp_path):
+    """İki bölümde geçen aynı metnin her bölüm için kendi metadata'sıyla saklandığını test eder."""
+    vectorstore = FakeVectorStore()
+    pages = [
+        Document(page_content="staj duyurusu", metadata={"source": f"{dep}/duyuru", "department": dep})
+        for dep in ("bilgisayar-muhendisligi", "kimya-muhendisligi")
+    ]
+    make_indexer(tmp_path, vectorstore).index(pages)
+    assert sorted(d.metadata["department"] for d in vectorstore.docs.values()) == [
+        "bilgisayar-muhendisligi", "kimya-muhendisligi",
+    ]
+
+    # Aynı bölümün iki sayfasında geçen metin yine tek kez saklanır
+    same = Document(page_content="staj duyurusu", metadata={"source": "x/arsiv", "department": "kimya-muhendisligi"})
+    assert make_indexer(tmp_path, vectorstore).index([*pages, same])["added"] == 0
+    assert len(vectorstore.docs) == 2
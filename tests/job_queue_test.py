@@ -0,0 +1,140 @@
+import asyncio
+
+from utils.job_queue import ChatJobQueue, QUEUED, DUPLICATE, REJECTED
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_submit_duplicate_update_id():
+    """Aynı update_id ikinci kez gönderildiğinde işin tekrar kuyruğa alınmadığını test eder."""
+    async def scenario():
+        handled = []
+
+        async def handler(payload):
+            handled.append(payload)
+
+        queue = ChatJobQueue(handler, workers=2)
+        queue.start()
+        assert queue.submit(1, "a", update_id=10) == QUEUED
+        assert queue.submit(1, "a", update_id=10) == DUPLICATE
+        await queue.join()
+        await queue.stop()
+        return handled
+
+    assert run(scenario()) == ["a"]
+
+
+def test_per_chat_ordering():
+    """Aynı sohbetin işlerinin, çok sayıda worker olsa bile sırayla işlendiğini test eder."""
+    async def scenario():
+        handled = []
+
+        async def handler(payload):
+            chat_id, index = payload
+            # Sonraki işlerin daha hızlı bitmesi sırayı bozmamalı
+            await asyncio.sleep(0.01 * (5 - index))
+            handled.append(payload)
+
+        queue = ChatJobQueue(handler, workers=8)
+        queue.start()
+        for index in range(5):
+            queue.submit(1, (1, index), update_id=index)
+        await queue.join()
+        await queue.stop()
+        return handled
+
+    assert run(scenario()) == [(1, i) for i in range(5)]
+
+
+def test_chats_run_concurrently():
+    """Farklı sohbetlerin işlerinin worker sayısı kadar paralel işlendiğini test eder."""
+    async def scenario():
+        running = 0
+        peak = 0
+
+        async def handler(payload):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+
+        queue = ChatJobQueue(handler, workers=4)
+        queue.start()
+        for chat_id in range(10):
+            queue.submit(chat_id, chat_id, update_id=chat_id)
+        await queue.join()
+        await queue.stop()
+        return peak
+
+    assert run(scenario()) == 4
+
+
+def test_backpressure_rejects_when_full():
+    """Kuyruk dolduğunda yeni işlerin reddedildiğini ve update_id'nin işaretlenmediğini test eder."""
+    async def scenario():
+        async def handler(payload):
+            await asyncio.sleep(0)
+
+        queue = ChatJobQueue(handler, workers=1, max_pending=2, max_pending_per_chat=2)
+        results = [queue.submit(chat_id, chat_id, update_id=chat_id) for chat_id in range(3)]
+        # Reddedilen güncelleme Telegram tekrar gönderdiğinde kabul edilebilmeli
+        queue.start()
+        await queue.join()
+        retried = queue.submit(2, 2, update_id=2)
+        await queue.join()
+        await queue.stop()
+        return results, retried
+
+    results, retried = run(scenario())
+    assert results == [QUEUED, QUEUED, REJECTED]
+    assert retried == QUEUED
+
+
+def test_handler_error_does_not_stop_worker():
+    """Bir işte oluşan hatanın worker'ı durdurmadığını test eder."""
+    async def scenario():
+        handled = []
+
+        async def handler(payload):
+            if payload == "bad":
+                raise RuntimeError("LLM hatası")
+            handled.append(payload)
+
+        queue = ChatJobQueue(handler, workers=1)
+        queue.start()
+        queue.submit(1, "bad", update_id=1)
+        queue.submit(1, "good", update_id=2)
+        await queue.join()
+        await queue.stop()
+        return handled
+
+    assert run(scenario()) == ["good"]
+
+
+def test_handler_error_notifies_chat():
+    """İş hata verdiğinde on_error ile sohbete bildirim yapıldığını, bildirim hatasının worker'ı durdurmadığını test eder."""
+    async def scenario():
+        notified = []
+
+        async def handler(payload):
+            if payload.startswith("bad"):
+                raise RuntimeError("sağlayıcı hatası")
+
+        async def on_error(chat_id, payload, error):
+            notified.append((chat_id, payload, str(error)))
+            if payload == "bad-2":
+                raise ConnectionError("Telegram'a ulaşılamadı")
+
+        queue = ChatJobQueue(handler, workers=1, on_error=on_error)
+        queue.start()
+        queue.submit(1, "bad-1", update_id=1)
+        queue.submit(2, "bad-2", update_id=2)
+        queue.submit(2, "good", update_id=3)
+        await queue.join()
+        await queue.stop()
+        return notified
+
+    assert run(scenario()) == [(1, "bad-1", "sağlayıcı hatası"), (2, "bad-2", "sağlayıcı hatası")]
@@ -0,0 +1,61 @@
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+
+import tests.mongomock_compat  # noqa: E402,F401  mongomock / pymongo bulk_write uyumu
+from langchain_core.documents import Document  # noqa: E402
+from pymongo.errors import ServerSelectionTimeoutError  # noqa: E402
+
+import main  # noqa: E402
+
+PDF = [Document(page_content="Madde 1", metadata={"source": "data/yonetmelik.pdf", "page": 0})]
+
+
+def scraped_collection():
+    collection = mongomock.MongoClient()["scraped_data"]["page_contents"]
+    collection.insert_many([
+        {"url": "https://bil-muhendislik.omu.edu.tr/duyuru", "title": "Duyuru", "content": "Staj tarihleri",
+         "department": "bilgisayar-muhendisligi", "faculty": "muhendislik", "date": "2024-03-01"},
+        {"url": "https://bos.omu.edu.tr/", "title": "Boş", "content": ""},
+    ])
+    return collection
+
+
+@pytest.fixture
+def pdf_only(monkeypatch):
+    monkeypatch.setattr("utils.loader.load_pdf", lambda path: list(PDF))
+
+
+def test_scraped_pages_are_indexed_with_pdf(monkeypatch, pdf_only):
+    """INDEX_SCRAPED_PAGES açıkken taranmış sayfaların PDF ile birlikte retriever'a verildiğini test eder."""
+    monkeypatch.setattr("config.INDEX_SCRAPED_PAGES", True)
+    monkeypatch.setattr(main, "scraped_pages_collection", scraped_collection)
+    captured = {}
+    monkeypatch.setattr("retriever.retriever.setup_retriever",
+                        lambda documents, embeddings, db_name: captured.setdefault("documents", documents))
+    monkeypatch.setattr(main.models, "get", lambda name: object())
+
+    main.build_retriever("bert")
+    documents = captured["documents"]
+    assert [d.metadata["source"] for d in documents] == [
+        "data/yonetmelik.pdf", "https://bil-muhendislik.omu.edu.tr/duyuru",
+    ]
+    assert documents[1].metadata["department"] == "bilgisayar-muhendisligi"
+
+
+def test_scraped_pages_are_off_by_default(monkeypatch, pdf_only):
+    """INDEX_SCRAPED_PAGES kapalıyken veritabanına hiç gidilmediğini test eder."""
+    monkeypatch.setattr("config.INDEX_SCRAPED_PAGES", False)
+    monkeypatch.setattr(main, "scraped_pages_collection", lambda: pytest.fail("MongoDB'ye gidilmemeli"))
+    assert main.load_corpus() == PDF
+
+
+def test_unreachable_database_falls_back_to_pdf(monkeypatch, pdf_only):
+    """MongoDB'ye ulaşılamazsa indekslemenin yalnızca PDF ile sürdüğünü test eder."""
+    class Unreachable:
+        def find(self, query):
+            raise ServerSelectionTimeoutError("bağlantı yok")
+
+    monkeypatch.setattr("config.INDEX_SCRAPED_PAGES", True)
+    monkeypatch.setattr(main, "scraped_pages_collection", Unreachable)
+    assert main.load_corpus() == PDF
@@ -0,0 +1,36 @@
+import main
+from tests.chat_router_test import StubProvider
+from utils.model_registry import ModelRegistry
+
+
+def test_single_provider_is_taken_from_chat_providers(monkeypatch):
+    """Tek sağlayıcı tanımlıysa sabit deepseek yerine CHAT_PROVIDERS'taki sağlayıcının kullanıldığını test eder."""
+    openai = StubProvider(answer="openai")
+    models = ModelRegistry()
+    models.register("chat/deepseek", lambda: StubProvider(answer="deepseek"))
+    models.register("chat/openai", lambda: openai)
+    monkeypatch.setattr(main, "models", models)
+    monkeypatch.setattr(main, "CHAT_PROVIDERS", ["openai"])
+    monkeypatch.setattr(main, "build_retriever", lambda name: object())
+    monkeypatch.setattr("retriever.retriever.setup_query_expansion", lambda retriever, chat_model: retriever)
+    monkeypatch.setattr("retriever.retriever.setup_context_packing", lambda retriever, chat_model: retriever)
+
+    _, chat_model = main.setup_models()
+    assert chat_model is openai
+    assert not models.is_loaded("chat/deepseek")
+
+
+def test_router_providers_come_from_registry(monkeypatch):
+    """Yönlendiricinin sağlayıcıları kayıt defterinden aldığını, aynı nesnelerin paylaşıldığını test eder."""
+    models = ModelRegistry()
+    for name in ("deepseek", "openai"):
+        models.register(f"chat/{name}", lambda name=name: StubProvider(answer=name))
+    models.register("chat/router", main.build_router)
+    monkeypatch.setattr(main, "models", models)
+    monkeypatch.setattr(main, "CHAT_PROVIDERS", ["deepseek", "openai"])
+
+    router = models.get("chat/router")
+    assert router.names == ["deepseek", "openai"]
+    assert router.providers == [models.get("chat/deepseek"), models.get("chat/openai")]
+    assert router.providers[0] is models.get("chat/deepseek")
+    assert all(models.report()[f"chat/{name}"]["loaded"] for name in router.names)
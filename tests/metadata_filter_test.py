@@ -0,0 +1,126 @@
+import datetime
+
+import pytest
+from langchain_core.documents import Document
+
+from retriever.filters import MetadataIndex, infer_department_filter, normalize_filter, to_chroma_where
+from retriever.hybrid import BM25Index
+from retriever.mmap_store import MmapVectorStore
+from retriever.quantized_store import QuantizedVectorStore
+from tests.quantized_store_test import TableEmbeddings
+from utils.loader import page_to_document
+
+DEPARTMENTS = ["bilgisayar-muhendisligi", "kimya-muhendisligi", "makine-muhendisligi"]
+
+
+def row_metadata(i):
+    return {
+        "row": i,
+        "department": DEPARTMENTS[i % 3],
+        "is_pdf_source": i % 5 == 0,
+        "date": f"2024-{i % 12 + 1:02d}-01",
+    }
+
+
+def test_normalize_and_chroma_where():
+    """Filtrenin koşullara ve tarih aralığının Chroma'da date_int'e çevrildiğini test eder."""
+    filter = {"department": "kimya-muhendisligi", "date": {"$gte": "2024-03-01", "$lt": "2024-06-01"}}
+    assert normalize_filter(filter) == [
+        ("department", "$eq", "kimya-muhendisligi"),
+        ("date", "$gte", "2024-03-01"),
+        ("date", "$lt", "2024-06-01"),
+    ]
+    assert to_chroma_where(filter) == {"$and": [
+        {"department": {"$eq": "kimya-muhendisligi"}},
+        {"date_int": {"$gte": 20240301}},
+        {"date_int": {"$lt": 20240601}},
+    ]}
+    assert to_chroma_where({"$and": [{"is_pdf_source": False}]}) == {"is_pdf_source": {"$eq": False}}
+    with pytest.raises(ValueError):
+        normalize_filter({"date": {"$like": "2024"}})
+
+
+def test_metadata_index_select():
+    """İkincil indeksin eşitlik, $in, tarih aralığı ve indekslenmemiş koşulları doğru seçtiğini test eder."""
+    metadatas = [row_metadata(i) for i in range(60)]
+    index = MetadataIndex(metadatas)
+    filter = {
+        "department": {"$in": ["bilgisayar-muhendisligi", "makine-muhendisligi"]},
+        "date": {"$gte": "2024-03-01", "$lte": "2024-05-01"},
+        "row": {"$ne": 2},
+        "is_pdf_source": False,
+    }
+    expected = [
+        i for i, m in enumerate(metadatas)
+        if m["department"] != "kimya-muhendisligi" and "2024-03-01" <= m["date"] <= "2024-05-01"
+        and i != 2 and not m["is_pdf_source"]
+    ]
+    assert index.select(normalize_filter(filter)).tolist() == expected
+    assert len(index.select([])) == 60
+    assert sorted(index.values("department")) == DEPARTMENTS
+
+
+@pytest.mark.parametrize("store_type", ["mmap", "int8"])
+def test_filtered_vector_search(tmp_path, store_type):
+    """Filtreli aramanın yalnızca filtreye uyan parçaları döndürdüğünü test eder."""
+    if store_type == "mmap":
+        store = MmapVectorStore(TableEmbeddings(90), str(tmp_path), auto_compact=False)
+        store.add_texts([str(i) for i in range(60)], [row_metadata(i) for i in range(60)], ids=[str(i) for i in range(60)])
+        store.compact()
+        # Ekleme segmentindeki kayıtlar da filtrelenir
+        store.add_texts([str(i) for i in range(60, 90)], [row_metadata(i) for i in range(60, 90)],
+                        ids=[str(i) for i in range(60, 90)])
+    else:
+        store = QuantizedVectorStore(TableEmbeddings(90), quantization="int8")
+        store.add_texts([str(i) for i in range(90)], [row_metadata(i) for i in range(90)], ids=[str(i) for i in range(90)])
+
+    filter = {"department": "kimya-muhendisligi", "is_pdf_source": False}
+    results = store.similarity_search("4", k=50, filter=filter)
+    expected = {i for i in range(90) if i % 3 == 1 and i % 5 != 0}
+    assert {int(d.page_content) for d in results} == expected
+    assert results[0].page_content == "4"
+    assert store.similarity_search("4", k=3, filter={"department": "yok"}) == []
+
+
+def test_bm25_filter_and_department_inference():
+    """BM25 filtresini ve sorudaki bölüm adından filtre çıkarılmasını test eder."""
+    documents = [
+        Document(page_content="staj başvurusu", metadata={"department": department}, id=department)
+        for department in DEPARTMENTS
+    ]
+    bm25 = BM25Index()
+    bm25.update({d.id: d for d in documents}, [])
+    departments = bm25.values("department")
+
+    filter = infer_department_filter("Bilgisayar Mühendisliği staj başvurusu ne zaman?", departments)
+    assert filter == {"department": "bilgisayar-muhendisligi"}
+    assert [d.id for d, _ in bm25.search("staj başvurusu", filter=filter)] == ["bilgisayar-muhendisligi"]
+    assert infer_department_filter("KİMYA MÜHENDİSLİĞİ ve Makine Mühendisliği", departments) == {
+        "department": {"$in": ["kimya-muhendisligi", "makine-muhendisligi"]}
+    }
+    assert infer_department_filter("Yemekhane menüsü", departments) is None
+
+
+def test_page_to_document_metadata():
+    """Scraper kaydının filtrelenebilir metadata'ya çevrildiğini test eder."""
+    document = page_to_document({
+        "_id": "abc",
+        "url": "https://bil-muhendislik.omu.edu.tr/duyuru",
+        "title": "Duyuru",
+        "content": "Staj tarihleri",
+        "department": "bilgisayar-muhendisligi",
+        "faculty": None,
+        "date": datetime.datetime(2024, 3, 5, 10, 30),
+    })
+    assert document.metadata == {
+        "source": "https://bil-muhendislik.omu.edu.tr/duyuru",
+        "title": "Duyuru",
+        "department": "bilgisayar-muhendisligi",
+        "is_pdf_source": False,
+        "date": "2024-03-05",
+        "date_int": 20240305,
+    }
+
+    # Tarihi bulunamamış sayfanın yer tutucu tarihi metadata'ya yazılmaz
+    undated = page_to_document({"url": "https://a", "content": "Metin", "date": datetime.datetime(1000, 1, 1)})
+    assert "date" not in undated.metadata and "date_int" not in undated.metadata
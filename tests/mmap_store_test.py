@@ -0,0 +1,50 @@
+import numpy as np
+
+from retriever.mmap_store import MmapVectorStore
+from tests.quantized_store_test import TableEmbeddings
+
+
+def add_rows(store, rows):
+    store.add_texts([str(i) for i in rows], [{"row": i} for i in rows], ids=[f"id-{i}" for i in rows])
+
+
+def test_append_segment_is_searchable_and_compacted(tmp_path):
+    """Eklenen vektörlerin sıkıştırmadan önce ve sonra aynı sonuçları verdiğini test eder."""
+    embedding = TableEmbeddings(100)
+    store = MmapVectorStore(embedding, str(tmp_path), dtype="float16", auto_compact=False)
+    add_rows(store, range(60))
+    store.delete(ids=["id-5"])
+    before = [store.similarity_search(str(i), k=1)[0].id for i in (0, 30, 59)]
+
+    store.compact()
+    assert isinstance(store._snapshot.base, np.memmap)
+    assert store._snapshot.base.dtype == np.float16
+    assert len(store) == 59
+    assert [store.similarity_search(str(i), k=1)[0].id for i in (0, 30, 59)] == before == ["id-0", "id-30", "id-59"]
+    assert "id-5" not in store.get(include=[])["ids"]
+
+
+def test_other_process_sees_writes_and_new_generation(tmp_path):
+    """Aynı dizini açan ikinci deponun (ayrı worker) yazımları ve sıkıştırmayı gördüğünü test eder."""
+    embedding = TableEmbeddings(100)
+    writer = MmapVectorStore(embedding, str(tmp_path), auto_compact=False)
+    reader = MmapVectorStore(embedding, str(tmp_path), auto_compact=False)
+
+    add_rows(writer, range(10))
+    assert reader.similarity_search("3", k=1)[0].id == "id-3"
+
+    writer.compact()
+    add_rows(writer, range(10, 20))
+    writer.delete(ids=["id-3"])
+    assert len(reader) == 19
+    assert reader.similarity_search("15", k=1)[0].id == "id-15"
+    assert "id-3" not in reader.get(include=[])["ids"]
+
+
+def test_background_compaction_after_threshold(tmp_path):
+    """Ekleme segmenti eşiği geçince arka planda sıkıştırma yapıldığını test eder."""
+    store = MmapVectorStore(TableEmbeddings(100), str(tmp_path), compact_threshold=20)
+    add_rows(store, range(25))
+    store._compaction.join(timeout=10)
+    assert store._generation == 1
+    assert len(store._snapshot.append_ids) == 0 and len(store) == 25
@@ -0,0 +1,58 @@
+import threading
+import time
+
+import pytest
+
+from utils.model_registry import ModelRegistry
+
+
+def test_model_is_built_once_under_concurrency():
+    """Aynı anda istenen modelin yalnızca bir kez oluşturulduğunu test eder."""
+    calls = []
+
+    def factory():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    registry = ModelRegistry()
+    registry.register("chat/test", factory)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("chat/test"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len({id(result) for result in results}) == 1
+    assert registry.report()["chat/test"]["loaded"]
+
+
+def test_string_factory_is_imported_lazily():
+    """Metin olarak verilen fabrikanın ilk kullanıma kadar import edilip çağrılmadığını test eder."""
+    registry = ModelRegistry()
+    registry.register("embedding/test", "collections:OrderedDict")
+    assert not registry.is_loaded("embedding/test")
+    assert registry.report()["embedding/test"]["seconds"] is None
+    assert type(registry.get("embedding/test")).__name__ == "OrderedDict"
+
+
+def test_failed_load_is_retried():
+    """Yükleme hata verdiğinde sonucun saklanmadığını ve sonraki çağrının yeniden denediğini test eder."""
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("model indirilemedi")
+        return "model"
+
+    registry = ModelRegistry()
+    registry.register("chat/test", factory)
+    with pytest.raises(RuntimeError):
+        registry.get("chat/test")
+    assert "error" in registry.report()["chat/test"]
+
+    assert registry.get("chat/test") == "model"
+    assert "error" not in registry.report()["chat/test"]
@@ -0,0 +1,173 @@
+import time
+
+import pytest
+from bson import ObjectId
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+mongomock = pytest.importorskip("mongomock")
+import tests.mongomock_compat  # noqa: E402,F401  mongomock / pymongo bulk_write uyumu
+
+import scraper.scraper as scraper
+from utils.crawl_state import CrawlStateStore, content_hash
+from utils.mongo_writer import BulkWriter
+
+
+class CountingDatabase:
+    """Koleksiyonlara yapılan bulk_write çağrılarını sayan mongomock veritabanı sarmalayıcısı."""
+
+    def __init__(self, db):
+        self.db = db
+        self.calls = []
+
+    def __getitem__(self, name):
+        collection = self.db[name]
+        calls = self.calls
+
+        class Collection:
+            def bulk_write(self, operations, ordered=True):
+                calls.append((name, len(operations), ordered))
+                return collection.bulk_write(operations, ordered=ordered)
+
+        return Collection()
+
+
+@pytest.fixture
+def db(monkeypatch):
+    client = mongomock.MongoClient()
+    monkeypatch.setattr(scraper, "get_db_connection", lambda: client)
+    monkeypatch.setattr(scraper, "MONGO_FLUSH_INTERVAL", 0)
+    yield client[scraper.MONGO_DB_NAME]
+    scraper.close_bulk_writer()
+
+
+def test_buffer_is_written_in_unordered_batches_when_full():
+    """Tampon dolunca sırasız bulk_write ile yazıldığını, kalanın close() ile yazıldığını test eder."""
+    db = CountingDatabase(mongomock.MongoClient().db)
+    writer = BulkWriter(db, max_batch=10, flush_interval=0)
+    for i in range(25):
+        writer.add("page_contents", InsertOne({"url": f"http://a/{i}"}))
+
+    assert db.calls == [("page_contents", 10, False), ("page_contents", 10, False)]
+    assert writer.pending() == 5
+    writer.close()
+    assert db.db.page_contents.count_documents({}) == 25
+    assert writer.stats["written"] == 25 and writer.stats["batches"] == 3
+
+
+def test_buffer_is_written_when_interval_elapses():
+    """Tampon dolmasa da flush_interval dolunca arka planda yazıldığını test eder."""
+    collection = mongomock.MongoClient().db.page_contents
+    writer = BulkWriter(collection.database, max_batch=1000, flush_interval=0.05).start()
+    writer.add("page_contents", InsertOne({"url": "http://a/1"}))
+
+    deadline = time.time() + 2
+    while writer.pending() and time.time() < deadline:
+        time.sleep(0.01)
+    assert collection.count_documents({}) == 1
+    writer.close()
+
+
+def test_collections_are_flushed_in_given_order():
+    """Sayfaların, sonradan eklense de tarama durumundan önce yazıldığını test eder."""
+    db = CountingDatabase(mongomock.MongoClient().db)
+    writer = BulkWriter(db, flush_interval=0, order=("page_contents", "crawl_state"))
+    writer.add("crawl_state", UpdateOne({"_id": "http://a/1"}, {"$set": {"content_hash": "x"}}, upsert=True))
+    writer.add("page_contents", InsertOne({"url": "http://a/1"}))
+    writer.flush()
+    assert [name for name, _, _ in db.calls] == ["page_contents", "crawl_state"]
+
+
+def test_attachments_link_to_client_generated_page_ids(db):
+    """Eklerin sayfa yazılmadan önce üretilen id'ye bağlandığını ve tekrar kayıtta id'nin korunduğunu test eder."""
+    legacy_id = db["page_contents"].insert_one({"url": "http://a/eski", "title": "Eski"}).inserted_id
+    page_ids = {}
+    for url in ["http://a/eski", "http://a/yeni"]:
+        page_ids[url] = scraper.save_page_content_to_db(scraper.PageContent(title=url, content="Metin", url=url))
+        scraper.save_attachments_to_db([{"page_content_id": page_ids[url], "original_url": f"{url}.pdf"}])
+    assert db[scraper.ATTACHMENTS_COLLECTION].count_documents({}) == 0
+    scraper.close_bulk_writer()
+
+    assert page_ids["http://a/eski"] == str(legacy_id)
+    for url, page_id in page_ids.items():
+        page = db["page_contents"].find_one({"_id": ObjectId(page_id)})
+        assert page["url"] == url and page["content"] == "Metin"
+        attachment = db[scraper.ATTACHMENTS_COLLECTION].find_one({"original_url": f"{url}.pdf"})
+        assert attachment["page_content_id"] == page_id
+
+    again = scraper.save_page_content_to_db(scraper.PageContent(title="Yeni", content="Değişti", url="http://a/yeni"))
+    scraper.close_bulk_writer()
+    assert again == page_ids["http://a/yeni"]
+    assert db["page_contents"].count_documents({}) == 2
+
+
+def test_bulk_writes_report_documents_per_second(db):
+    """Toplu yazımın kaç doküman/sn yazdığını raporladığını ve tek tek yazımdan az istek attığını test eder."""
+    pages = [scraper.PageContent(title=f"Haber {i}", content="Metin", url=f"http://a/{i}") for i in range(600)]
+    for page in pages:
+        scraper.save_page_content_to_db(page)
+    writer = scraper.close_bulk_writer()
+
+    stats = writer.stats
+    docs_per_second = stats["written"] / stats["seconds"]
+    print(f"{stats['written']} doküman, {stats['batches']} batch, {docs_per_second:.0f} doküman/sn")
+    assert stats["written"] == 600 and stats["errors"] == 0
+    assert stats["batches"] == -(-600 // scraper.MONGO_BULK_SIZE)
+    assert db["page_contents"].count_documents({}) == 600
+
+
+class FailingPagesDatabase:
+    """page_contents'e yazılan işlemlerden URL'si failing_urls'de olanları reddeden veritabanı."""
+
+    def __init__(self, db, failing_urls):
+        self.db = db
+        self.failing_urls = failing_urls
+
+    def __getitem__(self, name):
+        collection = self.db[name]
+        if name != "page_contents":
+            return collection
+        failing_urls = self.failing_urls
+
+        class Collection:
+            def bulk_write(self, operations, ordered=True):
+                failed = [i for i, op in enumerate(operations) if op._filter["url"] in failing_urls]
+                ok = [op for i, op in enumerate(operations) if i not in failed]
+                result = collection.bulk_write(ok, ordered=ordered) if ok else None
+                if failed:
+                    raise BulkWriteError({
+                        "writeErrors": [{"index": i, "code": 11000, "errmsg": "yazılamadı"} for i in failed],
+                        "nUpserted": result.upserted_count if result else 0, "nMatched": 0, "nInserted": 0,
+                    })
+                return result
+
+        return Collection()
+
+
+def test_crawl_state_is_not_written_when_page_write_fails():
+    """Sayfası yazılamayan URL'nin tarama durumunun yazılmadığını, sonraki taramada tekrar işlendiğini test eder."""
+    client = mongomock.MongoClient()
+    db = FailingPagesDatabase(client.db, failing_urls={"http://a/2"})
+    writer = BulkWriter(db, flush_interval=0, order=("page_contents", "crawl_state"))
+    store = CrawlStateStore(client.db.crawl_state, writer=writer)
+    for i in (1, 2):
+        url = f"http://a/{i}"
+        writer.add("page_contents", UpdateOne({"url": url}, {"$set": {"url": url}}, upsert=True), key=url)
+        # Sayfa ayrı bir flush'ta başarısız olsa da durum sonradan eklenir
+        writer.flush()
+        store.record(url, {}, content_hash(f"metin {i}"))
+    writer.close()
+
+    assert client.db.page_contents.count_documents({}) == 1
+    assert writer.stats["errors"] == 1 and writer.stats["skipped"] == 1
+    reloaded = CrawlStateStore(client.db.crawl_state)
+    reloaded.load()
+    assert reloaded.is_unchanged("http://a/1", content_hash("metin 1"))
+    assert not reloaded.is_unchanged("http://a/2", content_hash("metin 2"))
+
+    # Sayfa sonradan başarıyla yazılırsa durumu da yazılır
+    db.failing_urls.clear()
+    writer.add("page_contents", UpdateOne({"url": "http://a/2"}, {"$set": {"url": "http://a/2"}}, upsert=True), key="http://a/2")
+    store.record("http://a/2", {}, content_hash("metin 2"))
+    writer.flush()
+    assert client.db.crawl_state.count_documents({"_id": "http://a/2"}) == 1
@@ -0,0 +1,23 @@
+"""
+mongomock 4.3, pymongo >= 4.11'in UpdateOne/ReplaceOne ile bulk_write'a geçirdiği sort
+parametresini tanımıyor. Bu modül import edildiğinde mongomock'un bulk builder'ı bu
+parametreyi yok sayacak şekilde yamalanır; mongomock kullanan testler ve benchmark'lar
+mongomock'tan hemen sonra import eder.
+"""
+import mongomock.collection
+
+_BulkOperationBuilder = mongomock.collection.BulkOperationBuilder
+_add_update = _BulkOperationBuilder.add_update
+_add_replace = _BulkOperationBuilder.add_replace
+
+
+def _add_update_without_sort(self, *args, sort=None, **kwargs):
+    return _add_update(self, *args, **kwargs)
+
+
+def _add_replace_without_sort(self, *args, sort=None, **kwargs):
+    return _add_replace(self, *args, **kwargs)
+
+
+_BulkOperationBuilder.add_update = _add_update_without_sort
+_BulkOperationBuilder.add_replace = _add_replace_without_sort
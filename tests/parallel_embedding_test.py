@@ -0,0 +1,34 @@
+import time
+
+from embeddings.parallel_embedding import ParallelEmbeddings
+
+
+class IndexEmbeddings:
+    """Metin olarak verilen sayıyı vektör yapan, erken batch'leri geç bitiren sahte model."""
+
+    def embed_documents(self, texts):
+        # Sonraki batch'ler önce biter; sıralama tamamlanma sırasına bağlı olmamalı
+        time.sleep(max(0.0, 0.05 - int(texts[0]) / 2000))
+        return [[float(text), float(len(texts))] for text in texts]
+
+    def embed_query(self, text):
+        return [float(text), 1.0]
+
+
+def index_embeddings(model_name):
+    return IndexEmbeddings()
+
+
+def test_parallel_embeddings_keep_input_order():
+    """Metinlerin birden fazla süreç ve batch'e dağıtılsa da girdi sırasıyla döndüğünü test eder."""
+    model = ParallelEmbeddings("sahte", workers=2, batch_size=16, model_factory=index_embeddings)
+    try:
+        texts = [str(i) for i in range(100)]
+        vectors = model.embed_documents(texts)
+        assert [vector[0] for vector in vectors] == [float(i) for i in range(100)]
+        # 100 metin 16'lık batch'lere bölünür (son batch 4 metin)
+        assert [vector[1] for vector in vectors] == [16.0] * 96 + [4.0] * 4
+        assert model.embed_query("7") == [7.0, 1.0]
+        assert model.embedded_texts == 100 and model.throughput > 0
+    finally:
+        model.close()
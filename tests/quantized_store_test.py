@@ -0,0 +1,77 @@
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from retriever.quantized_store import QuantizedVectorStore
+
+
+class TableEmbeddings(Embeddings):
+    """Metin olarak verilen satır numarasının sabit rastgele vektörünü döndürür."""
+
+    def __init__(self, n, dim=32, seed=0):
+        self.vectors = np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+    def embed_documents(self, texts):
+        return self.vectors[[int(text) for text in texts]].tolist()
+
+    def embed_query(self, text):
+        return self.vectors[int(text)].tolist()
+
+
+def make_store(quantization, n, tmp_path=None, **kwargs):
+    embedding = TableEmbeddings(n)
+    store = QuantizedVectorStore(
+        embedding, persist_directory=str(tmp_path) if tmp_path else None, quantization=quantization, **kwargs
+    )
+    ids = [f"id-{i}" for i in range(n)]
+    store.add_texts([str(i) for i in range(n)], [{"row": i} for i in range(n)], ids=ids)
+    return store
+
+
+def test_int8_search_finds_query_vector_first():
+    """int8 deposunda her vektörün kendisini ilk sırada bulduğunu test eder."""
+    store = make_store("int8", 300)
+    for i in (0, 17, 299):
+        assert store.similarity_search(str(i), k=3)[0].metadata["row"] == i
+
+
+def test_pq_trains_codebook_and_rescores(tmp_path):
+    """PQ kod kitabının eğitildiğini ve yeniden puanlamayla doğru sonucun döndüğünü test eder."""
+    store = make_store("pq", 1100, tmp_path, pq_subspaces=8)
+    assert store.codebook is not None
+    assert store.memory_usage() < store._state.vectors.nbytes
+    hits = sum(store.similarity_search(str(i), k=1)[0].metadata["row"] == i for i in range(50))
+    assert hits >= 48
+
+
+def test_persistence_and_delete(tmp_path):
+    """Silinen kayıtların diske yansıdığını ve depo yeniden açıldığında geri yüklendiğini test eder."""
+    store = make_store("int8", 50, tmp_path)
+    store.delete(ids=["id-3"])
+
+    reopened = QuantizedVectorStore(store.embeddings, persist_directory=str(tmp_path), quantization="int8")
+    assert len(reopened) == 49
+    assert "id-3" not in reopened.get(include=[])["ids"]
+    document, distance = reopened.similarity_search_with_score("7", k=1)[0]
+    assert document.id == "id-7" and abs(distance) < 1e-5
+
+
+def test_bulk_load_saves_once(tmp_path, monkeypatch):
+    """Toplu indekslemede batch'lerin diske her seferinde değil, sonda bir kez yazıldığını test eder."""
+    from langchain_core.documents import Document
+    from langchain_text_splitters import CharacterTextSplitter
+    from retriever.indexing import DocumentIndexer
+
+    store = QuantizedVectorStore(TableEmbeddings(40), persist_directory=str(tmp_path), quantization="int8")
+    saves = []
+    save = store._save
+    monkeypatch.setattr(store, "_save", lambda state: saves.append(len(state.ids)) or save(state))
+    indexer = DocumentIndexer(
+        store, str(tmp_path / "manifest.json"), CharacterTextSplitter(separator="\n", chunk_size=1, chunk_overlap=0),
+        write_batch_size=8,
+    )
+    indexer.index([Document(page_content="\n".join(str(i) for i in range(40)), metadata={"source": "a"})])
+    assert saves == [40]
+
+    reopened = QuantizedVectorStore(store.embeddings, persist_directory=str(tmp_path), quantization="int8")
+    assert len(reopened) == 40
+    assert reopened.similarity_search("7", k=1)[0].page_content == "7"
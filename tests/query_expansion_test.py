@@ -0,0 +1,98 @@
+import time
+
+from langchain_core.documents import Document
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.retrievers import BaseRetriever
+
+from retriever.expansion import ExpandingRetriever, QueryExpander, parse_queries
+
+
+class TableRetriever(BaseRetriever):
+    """Sorguya tabloda karşılık gelen parçaları döndüren, gelen sorguları kaydeden sahte retriever."""
+
+    table: dict
+    queries: list = []
+
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        self.queries.append(query)
+        return [Document(page_content=text, id=text) for text in self.table.get(query, [])]
+
+
+def test_parse_queries():
+    """Numaralı ve madde işaretli LLM çıktısının sorgu listesine çevrildiğini test eder."""
+    text = "1. Bütünleme sınavı ne zaman?\n2) Bütünleme tarihleri\n- \"Büt sınav takvimi\"\n\n4. fazla"
+    assert parse_queries(text, 3) == ["Bütünleme sınavı ne zaman?", "Bütünleme tarihleri", "Büt sınav takvimi"]
+
+
+def test_multi_query_fuses_and_caches():
+    """Yeniden yazımların sonuçlarının tekilleştirilip birleştirildiğini ve LLM çağrısının önbelleklendiğini test eder."""
+    llm = FakeListChatModel(responses=["1. bütünleme sınavı tarihi\n2. büt\n3. büt ne zaman", "kullanılmamalı"])
+    base = TableRetriever(table={
+        "Büt ne zaman?": ["a", "b"],
+        "bütünleme sınavı tarihi": ["c", "a"],
+        "büt": ["a", "d"],
+    }, queries=[])
+    retriever = ExpandingRetriever(base_retriever=base, expander=QueryExpander(llm, timeout=5), k=3)
+
+    results = retriever.invoke("Büt ne zaman?")
+    # "a" üç listede de var; "c" bir listede ilk sırada olduğu için "b"nin önüne geçer
+    assert [d.id for d in results] == ["a", "c", "b"]
+    # Orijinal soruyla aynı olan yeniden yazım tekrar aranmaz
+    assert sorted(base.queries) == sorted(["Büt ne zaman?", "bütünleme sınavı tarihi", "büt"])
+
+    retriever.invoke("büt NE zaman")
+    assert llm.i == 1
+    assert retriever.expander.stats()["hits"] == 1
+
+
+def test_hyde_uses_hypothetical_answer():
+    """HyDE modunda varsayımsal cevabın arama sorgusu olarak kullanıldığını test eder."""
+    answer = "Bütünleme sınavları yarıyıl sonu sınavlarından sonra yapılır."
+    base = TableRetriever(table={answer: ["yonetmelik-madde-20"]}, queries=[])
+    expander = QueryExpander(FakeListChatModel(responses=[answer]), mode="hyde", timeout=5)
+    retriever = ExpandingRetriever(base_retriever=base, expander=expander, k=3)
+
+    assert [d.id for d in retriever.invoke("büt?")] == ["yonetmelik-madde-20"]
+
+
+def test_slow_expansion_is_bounded_and_cached_later():
+    """Yavaş LLM'de aramanın zaman aşımıyla sınırlı kaldığını, sonucun sonradan önbelleğe yazıldığını test eder."""
+    llm = FakeListChatModel(responses=["harç iadesi", "kullanılmamalı"], sleep=0.3)
+    base = TableRetriever(table={"harç": ["a"], "harç iadesi": ["b"]}, queries=[])
+    expander = QueryExpander(llm, timeout=0.05)
+    retriever = ExpandingRetriever(base_retriever=base, expander=expander, k=3)
+
+    start = time.perf_counter()
+    assert [d.id for d in retriever.invoke("harç")] == ["a"]
+    assert time.perf_counter() - start < 0.25
+    assert expander.stats()["timeouts"] == 1
+
+    time.sleep(0.5)
+    assert {d.id for d in retriever.invoke("harç")} == {"a", "b"}
+    assert llm.i == 1
+
+
+class SlowTableRetriever(TableRetriever):
+    """Tablodaki gecikme kadar bekleyip cevap veren retriever (ör. yeniden sıralamalı arama)."""
+
+    delays: dict = {}
+
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        time.sleep(self.delays.get(query, 0))
+        return super()._get_relevant_documents(query, run_manager=run_manager)
+
+
+def test_expanded_searches_share_the_deadline():
+    """Genişletilmiş sorguların aramalarının da zaman aşımına dahil olduğunu, yetişenlerin birleştirildiğini test eder."""
+    llm = FakeListChatModel(responses=["1. harç iadesi\n2. harç ücreti"])
+    base = SlowTableRetriever(
+        table={"harç": ["a"], "harç iadesi": ["b"], "harç ücreti": ["c"]},
+        delays={"harç ücreti": 1.0},
+        queries=[],
+    )
+    expander = QueryExpander(llm, timeout=0.3)
+    retriever = ExpandingRetriever(base_retriever=base, expander=expander, k=3)
+
+    start = time.perf_counter()
+    assert {d.id for d in retriever.invoke("harç")} == {"a", "b"}
+    assert time.perf_counter() - start < 0.6
@@ -0,0 +1,65 @@
+import time
+from typing import List
+
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from retriever.rerank import CrossEncoderReranker, RerankingRetriever
+
+
+class KeywordModel:
+    """İçinde "mazeret" geçen metne yüksek puan veren, çağrıları sayan sahte cross-encoder."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.pairs = 0
+
+    def predict(self, pairs, batch_size=32):
+        self.pairs += len(pairs)
+        time.sleep(self.delay * len(pairs))
+        return [1.0 if "mazeret" in text else 0.0 for _, text in pairs]
+
+
+class ListRetriever(BaseRetriever):
+    documents: List[Document]
+
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        return self.documents
+
+
+def candidates(n, relevant_at):
+    return [
+        Document(page_content="mazeret sınavı" if i == relevant_at else f"madde {i}")
+        for i in range(n)
+    ]
+
+
+def test_reranker_moves_relevant_chunk_to_top():
+    """İlk aşamada sonda kalan ilgili parçanın yeniden sıralamayla ilk sıraya çıktığını test eder."""
+    reranker = CrossEncoderReranker("sahte", model=KeywordModel())
+    retriever = RerankingRetriever(base_retriever=ListRetriever(documents=candidates(20, 19)), reranker=reranker, k=3)
+    results = retriever.invoke("Mazeret sınavı nedir?")
+    assert len(results) == 3
+    assert results[0].page_content == "mazeret sınavı"
+
+
+def test_scores_are_cached_per_query_and_chunk():
+    """Aynı (soru, parça) çiftlerinin modele ikinci kez gönderilmediğini test eder."""
+    model = KeywordModel()
+    reranker = CrossEncoderReranker("sahte", model=model)
+    documents = candidates(10, 3)
+    reranker.score("Mazeret sınavı nedir?", documents)
+    reranker.score("mazeret  sınavı NEDİR?", documents)
+    assert model.pairs == 10
+
+
+def test_depth_shrinks_with_latency_budget():
+    """Çift başına süre arttığında yeniden sıralama derinliğinin bütçeye göre azaldığını test eder."""
+    reranker = CrossEncoderReranker("sahte", model=KeywordModel(delay=0.002))
+    retriever = RerankingRetriever(
+        base_retriever=ListRetriever(documents=candidates(50, 0)), reranker=reranker,
+        k=3, max_depth=50, latency_budget=0.02,
+    )
+    assert retriever.rerank_depth() == 50
+    retriever.invoke("mazeret")
+    assert 3 <= retriever.rerank_depth() < 50
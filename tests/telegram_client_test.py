@@ -0,0 +1,86 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from utils.telegram_client import TelegramClient
+
+
+def make_client(handler):
+    return TelegramClient("token", transport=httpx.MockTransport(handler), max_retries=3, backoff_base=0.0)
+
+
+def test_send_message_is_not_retried_after_read_timeout():
+    """Sunucu mesajı kabul edip cevap zaman aşımına uğradığında mesajın tekrar gönderilmediğini test eder."""
+    delivered = []
+
+    def handler(request: httpx.Request):
+        delivered.append(json.loads(request.content)["text"])
+        raise httpx.ReadTimeout("cevap gelmedi", request=request)
+
+    async def run():
+        client = make_client(handler)
+        await client.start()
+        try:
+            await client.send_message(1, "Merhaba")
+        finally:
+            await client.close()
+
+    with pytest.raises(httpx.ReadTimeout):
+        asyncio.run(run())
+    assert delivered == ["Merhaba"]
+
+
+def test_send_message_is_retried_on_connect_error_and_429_but_not_5xx():
+    """sendMessage'in bağlantı kurma hatası ve 429'da tekrarlandığını, 5xx'te tekrarlanmadığını test eder."""
+    responses = [
+        httpx.ConnectError("bağlantı kurulamadı"),
+        httpx.Response(429, json={"ok": False, "parameters": {"retry_after": 0}}),
+        httpx.Response(200, json={"ok": True, "result": {"message_id": 7}}),
+        httpx.Response(502),
+    ]
+    calls = []
+
+    def handler(request: httpx.Request):
+        calls.append(request.url.path.rsplit("/", 1)[-1])
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    async def run():
+        client = make_client(handler)
+        await client.start()
+        try:
+            result = await client.send_message(1, "Merhaba")
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.send_message(1, "İkinci")
+            return result
+        finally:
+            await client.close()
+
+    assert asyncio.run(run())["result"]["message_id"] == 7
+    assert calls == ["sendMessage"] * 4
+
+
+def test_get_file_is_retried_after_read_timeout():
+    """İdempotent getFile isteğinin okuma zaman aşımında tekrarlandığını test eder."""
+    attempts = []
+
+    def handler(request: httpx.Request):
+        attempts.append(request.method)
+        if len(attempts) == 1:
+            raise httpx.ReadTimeout("cevap gelmedi", request=request)
+        return httpx.Response(200, json={"ok": True, "result": {"file_path": "a.pdf"}})
+
+    async def run():
+        client = make_client(handler)
+        await client.start()
+        try:
+            return await client.get_file("f1")
+        finally:
+            await client.close()
+
+    assert asyncio.run(run()) == {"file_path": "a.pdf"}
+    assert attempts == ["GET", "GET"]
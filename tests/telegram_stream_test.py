@@ -0,0 +1,84 @@
+import asyncio
+import json
+
+import httpx
+
+from utils.telegram_client import TelegramClient
+from utils.telegram_stream import MessageStreamer
+
+
+def make_client(calls, fail_edits=0):
+    failures = {"left": fail_edits}
+
+    def handler(request: httpx.Request):
+        method = request.url.path.rsplit("/", 1)[-1]
+        body = json.loads(request.content)
+        calls.append((method, body["text"]))
+        if method == "editMessageText" and failures["left"]:
+            failures["left"] -= 1
+            return httpx.Response(400, json={"ok": False, "description": "Bad Request"})
+        return httpx.Response(200, json={"ok": True, "result": {"message_id": 42}})
+
+    return TelegramClient("token", transport=httpx.MockTransport(handler), max_retries=0)
+
+
+def test_tokens_are_coalesced_into_throttled_edits():
+    """Token'ların tek mesajda, aralıklı ve birleştirilmiş düzenlemelerle yazıldığını test eder."""
+    calls = []
+
+    async def run():
+        client = make_client(calls)
+        await client.start()
+        streamer = MessageStreamer(client, chat_id=1, min_interval=0.05)
+        for i in range(50):
+            streamer.append(f"t{i} ")
+            await asyncio.sleep(0.005)
+        await streamer.finish("tam cevap")
+        await client.close()
+        return streamer
+
+    streamer = asyncio.run(run())
+    methods = [method for method, _ in calls]
+    assert methods[0] == "sendMessage" and set(methods[1:]) == {"editMessageText"}
+    assert calls[0][1].startswith("t0")
+    # ~0.25 sn'lik akış, 50 ms aralıkla en fazla birkaç düzenleme
+    assert 1 <= streamer.edits <= 8
+    assert calls[-1] == ("editMessageText", "tam cevap")
+    texts = [text for _, text in calls]
+    assert all(a != b for a, b in zip(texts, texts[1:]))
+
+
+def test_failed_edit_does_not_lose_answer_and_threads_can_append():
+    """Ara düzenleme hatasının cevabı bozmadığını ve başka thread'den token eklenebildiğini test eder."""
+    calls = []
+
+    async def run():
+        client = make_client(calls, fail_edits=1)
+        await client.start()
+        streamer = MessageStreamer(client, chat_id=1, min_interval=0.01)
+        # Senkron LLM'ler token'ları executor thread'inden bildirir
+        await asyncio.to_thread(streamer.append, "Merhaba")
+        await asyncio.sleep(0.05)
+        streamer.append(" dünya")
+        await asyncio.sleep(0.05)
+        await streamer.finish()
+        await client.close()
+
+    asyncio.run(run())
+    assert calls[0] == ("sendMessage", "Merhaba")
+    assert calls[-1] == ("editMessageText", "Merhaba dünya")
+    assert len(calls) == 3
+
+
+def test_answer_without_tokens_is_sent_once():
+    """Önbellekten gelen (token akışı olmayan) cevabın tek sendMessage ile gönderildiğini test eder."""
+    calls = []
+
+    async def run():
+        client = make_client(calls)
+        await client.start()
+        await MessageStreamer(client, chat_id=1).finish("x" * 5000)
+        await client.close()
+
+    asyncio.run(run())
+    assert calls == [("sendMessage", "x" * 4096)]
@@ -0,0 +1,129 @@
+import hashlib
+import logging
+import threading
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(content):
+    """
+    Sayfa gövdesinin SHA-256 özeti.
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+class CrawlStateStore:
+    """
+    URL başına tarama durumu: ETag, Last-Modified, içerik hash'i ve son görülme zamanı.
+
+    Durumlar MongoDB koleksiyonunda _id=url olarak tutulur ve load() ile tek sorguda belleğe
+    alınır. Koşullu istek başlıkları (If-None-Match / If-Modified-Since) buradan üretilir;
+    değişmeyen sayfaların yalnızca son görülme zamanı flush() ile toplu güncellenir,
+    değişen sayfalar record() ile hemen (writer, yani BulkWriter verilirse onun tamponu
+    üzerinden) yazılır. Bölümlerin high-water mark'ları aynı
+    koleksiyonda _id="department:<ad>" ile tutulur. Thread-safe'tir.
+    """
+
+    def __init__(self, collection, writer=None):
+        self.collection = collection
+        self.writer = writer
+        self._states = {}
+        self._seen = []
+        self._lock = threading.Lock()
+        self.stats = {"not_modified": 0, "unchanged": 0, "changed": 0, "new": 0}
+
+    def load(self):
+        """
+        Koleksiyondaki tüm durumları belleğe alır; yüklenen kayıt sayısını döndürür.
+        """
+        states = {state["_id"]: state for state in self.collection.find({})}
+        with self._lock:
+            self._states = states
+        logger.info(f"{len(states)} URL'nin tarama durumu yüklendi.")
+        return len(states)
+
+    def get(self, url):
+        with self._lock:
+            return self._states.get(url)
+
+    def conditional_headers(self, url):
+        """
+        Önceki cevabın ETag/Last-Modified değerlerinden koşullu istek başlıkları.
+        """
+        state = self.get(url)
+        headers = {}
+        if state:
+            if state.get("etag"):
+                headers["If-None-Match"] = state["etag"]
+            if state.get("last_modified"):
+                headers["If-Modified-Since"] = state["last_modified"]
+        return headers
+
+    def is_unchanged(self, url, digest):
+        """
+        İçerik hash'i kayıtlı olanla aynıysa (sunucu 304 desteklemese de) True döner.
+        """
+        state = self.get(url)
+        return state is not None and state.get("content_hash") == digest
+
+    def mark_seen(self, url, not_modified=True):
+        """
+        Değişmeyen sayfayı işaretler; son görülme zamanı flush() ile toplu yazılır.
+        """
+        with self._lock:
+            self._seen.append(url)
+            self.stats["not_modified" if not_modified else "unchanged"] += 1
+
+    def record(self, url, headers, digest, **fields):
+        """
+        Değişen ya da yeni sayfanın durumunu upsert eder. fields (ör. links) duruma eklenir.
+        """
+        now = datetime.now()
+        state = {
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "content_hash": digest,
+            "last_seen": now,
+            "changed_at": now,
+            **fields,
+        }
+        self._upsert(url, state)
+        with self._lock:
+            self.stats["new" if url not in self._states else "changed"] += 1
+            self._states[url] = {"_id": url, **state}
+
+    def high_water_mark(self, department):
+        """
+        Bölümün önceki taramadaki en yeni haberi ({"url": ..., "recent": [...], "updated_at": ...})
+        ya da None. recent, o taramada ilk liste sayfasındaki haberlerdir.
+        """
+        return self.get(f"department:{department}")
+
+    def set_high_water_mark(self, department, url, recent=()):
+        key = f"department:{department}"
+        mark = {"url": url, "recent": list(recent), "updated_at": datetime.now()}
+        self._upsert(key, mark)
+        with self._lock:
+            self._states[key] = {"_id": key, **mark}
+
+    def _upsert(self, key, fields):
+        if self.writer is not None:
+            # key: sayfa kaydı başarısız olursa bu durum da yazılmaz
+            self.writer.add(self.collection.name, UpdateOne({"_id": key}, {"$set": fields}, upsert=True), key=key)
+        else:
+            self.collection.update_one({"_id": key}, {"$set": fields}, upsert=True)
+
+    def flush(self):
+        """
+        mark_seen ile biriken URL'lerin son görülme zamanını tek istekle günceller.
+        """
+        with self._lock:
+            seen, self._seen = self._seen, []
+        if seen:
+            self.collection.update_many({"_id": {"$in": seen}}, {"$set": {"last_seen": datetime.now()}})
+        return len(seen)
@@ -0,0 +1,242 @@
+import asyncio
+import contextlib
+import logging
+import os
+import time
+import urllib.parse
+
+import httpx
+
+from utils.http_session import ACCEPT_ENCODING, HttpMetrics, RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401  (httpx HTTP/2 desteği için gerekli)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class _Host:
+    """Tek bir host'un URL kuyruğu, eşzamanlılık sınırı ve nezaket beklemesi."""
+
+    def __init__(self, concurrency, delay):
+        self.queue = asyncio.Queue()
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.delay = delay
+        self.next_request = 0.0
+        self.lock = asyncio.Lock()
+        self.workers = []
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        async with self.semaphore:
+            # İki isteğin başlangıcı arasında en az delay saniye bırakılır
+            async with self.lock:
+                wait = self.next_request - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self.next_request = time.monotonic() + self.delay
+            yield
+
+
+class Crawler:
+    """
+    Asenkron web tarayıcı.
+
+    - Global URL frontier'ı: her URL yalnızca bir kez kuyruğa girer. Kuyruklar host
+      başınadır; yavaş bir host diğer host'ların işlerini bekletmez.
+    - Host başına en fazla per_host_concurrency eşzamanlı istek ve iki istek arasında
+      en az delay saniye nezaket beklemesi.
+    - Tek bir httpx.AsyncClient; bağlantılar host başına keep-alive ile havuzlanır.
+      Bağlantı tekrar kullanım oranı ve aktarılan bayt `metrics` (HttpMetrics) ile izlenir.
+    - 429/5xx cevapları ve bağlantı hataları RetryPolicy'ye göre (jitter'lı üstel bekleme)
+      yeniden denenir.
+
+    enqueue(url, handler, **context) ile eklenen her URL getirilince
+    `await handler(response, **context)` çağrılır; handler yeni URL'ler ekleyebilir.
+    Koşullu isteklerde 304 cevabı da handler'a iletilir.
+    """
+
+    def __init__(self, per_host_concurrency=4, delay=0.2, max_connections=100, timeout=20.0,
+                 max_retries=2, backoff_base=0.5, backoff_max=10.0, headers=None, transport=None):
+        self.per_host_concurrency = per_host_concurrency
+        self.delay = delay
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.retry = RetryPolicy(max_retries=max_retries, backoff_base=backoff_base, backoff_max=backoff_max)
+        self.headers = {"Accept-Encoding": ACCEPT_ENCODING, **(headers or {})}
+        self.transport = transport
+        self.stats = {"pages": 0, "downloads": 0, "retries": 0, "errors": 0}
+        self.metrics = HttpMetrics()
+        self._client = None
+        self._loop = None
+        self._hosts = {}
+        self._seen = set()
+        self._pending = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    async def start(self):
+        if self._client is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE and self.transport is None,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=60.0,
+            ),
+            timeout=httpx.Timeout(self.timeout),
+            headers=self.headers,
+            follow_redirects=True,
+            transport=self.transport,
+        )
+
+    async def close(self):
+        for host in self._hosts.values():
+            for worker in host.workers:
+                worker.cancel()
+            await asyncio.gather(*host.workers, return_exceptions=True)
+        self._hosts.clear()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    @property
+    def client(self):
+        if self._client is None:
+            raise RuntimeError("Crawler başlatılmadı; önce start() çağrılmalı.")
+        return self._client
+
+    def _host(self, url):
+        name = urllib.parse.urlsplit(url).netloc
+        host = self._hosts.get(name)
+        if host is None:
+            host = self._hosts[name] = _Host(self.per_host_concurrency, self.delay)
+            host.workers = [
+                asyncio.ensure_future(self._worker(name, host)) for _ in range(self.per_host_concurrency)
+            ]
+        return host
+
+    def enqueue(self, url, handler, /, headers=None, **context):
+        """
+        URL'yi kendi host'unun kuyruğuna ekler. Daha önce eklenmişse False döner.
+        headers (ör. If-None-Match) yalnızca bu URL'nin isteğine eklenir.
+        """
+        if url in self._seen:
+            return False
+        self._seen.add(url)
+        self._pending += 1
+        self._idle.clear()
+        self._host(url).queue.put_nowait((url, handler, headers, context))
+        return True
+
+    async def join(self):
+        """
+        Kuyruktaki ve handler'ların eklediği tüm URL'ler işlenene kadar bekler.
+        """
+        await self._idle.wait()
+
+    async def _worker(self, name, host):
+        while True:
+            url, handler, headers, context = await host.queue.get()
+            try:
+                response = await self.fetch(url, headers)
+                self.stats["pages"] += 1
+                await handler(response, **context)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"{url} işlenemedi: {e!r}")
+            finally:
+                self._pending -= 1
+                if not self._pending:
+                    self._idle.set()
+
+    def _trace(self, url):
+        host = urllib.parse.urlsplit(url).hostname
+
+        async def trace(event_name, info):
+            # httpcore yeni TCP bağlantısı açtığında bildirir; havuzdan gelen bağlantıda bu olay yoktur
+            if event_name == "connection.connect_tcp.complete":
+                self.metrics.record_connection(host)
+
+        return {"trace": trace}
+
+    async def fetch(self, url, headers=None):
+        """
+        URL'yi host sınırları içinde getirir; 429/5xx ve bağlantı hatalarında yeniden dener.
+        Başarısız cevapta (304 hariç) httpx.HTTPStatusError fırlatır.
+        """
+        host = self._host(url)
+        attempt = 0
+        while True:
+            response = None
+            async with host.slot():
+                try:
+                    response = await self.client.get(url, headers=headers, extensions=self._trace(url))
+                except httpx.TransportError:
+                    if not self.retry.should_retry(attempt):
+                        raise
+            if response is not None:
+                self.metrics.record_response(
+                    response.url.host, response.num_bytes_downloaded, len(response.content)
+                )
+                if not self.retry.should_retry(attempt, response.status_code):
+                    # 304: koşullu istekte sayfa değişmemiş; hata değildir
+                    if response.status_code != 304:
+                        response.raise_for_status()
+                    return response
+            delay = self.retry.delay(attempt, response.headers.get("Retry-After") if response is not None else None)
+            logger.warning(f"{url} {response.status_code if response is not None else 'bağlantı hatası'}, "
+                           f"{delay:.2f} sn sonra tekrar denenecek.")
+            self.stats["retries"] += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def download(self, url, destination, chunk_size=64 * 1024):
+        """
+        Dosyayı host sınırları içinde parça parça diske yazar; yazılan bayt sayısını döndürür.
+        Hata durumunda yarım dosya silinir.
+        """
+        host = self._host(url)
+        written = 0
+        async with host.slot():
+            try:
+                async with self.client.stream("GET", url, extensions=self._trace(url)) as response:
+                    response.raise_for_status()
+                    os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+                    with open(destination, "wb") as file:
+                        async for chunk in response.aiter_bytes(chunk_size):
+                            written += len(chunk)
+                            file.write(chunk)
+                    self.metrics.record_response(response.url.host, response.num_bytes_downloaded, written)
+            except BaseException:
+                if os.path.exists(destination):
+                    os.remove(destination)
+                raise
+        self.stats["downloads"] += 1
+        return written
+
+    def download_from_thread(self, url, destination):
+        """
+        download'un senkron karşılığı; handler'ın asyncio.to_thread ile çalıştırdığı
+        senkron koddan çağrılır. İndirme yine tarayıcının event loop'unda ve host
+        sınırları içinde yapılır.
+        """
+        return asyncio.run_coroutine_threadsafe(self.download(url, destination), self._loop).result()
+
+    def host_stats(self):
+        """
+        Host başına gönderilen istek sayısı.
+        """
+        return {host: entry["requests"] for host, entry in self.metrics.snapshot()["hosts"].items()}
@@ -0,0 +1,229 @@
+import asyncio
+import json
+import logging
+import os
+import time
+
+import numpy as np
+from langchain_core.callbacks import BaseCallbackHandler
+
+from utils.evaluator import serialize_response
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRateLimiter:
+    """
+    Dakikada en fazla requests_per_minute istek (token bucket) ve aynı anda en fazla
+    max_concurrency istek. async with ile kullanılır.
+    """
+
+    def __init__(self, requests_per_minute=60, max_concurrency=4, burst=1):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _acquire_token(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) / self.interval)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * self.interval)
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        try:
+            await self._acquire_token()
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc):
+        self._semaphore.release()
+
+
+class UsageCallback(BaseCallbackHandler):
+    """
+    LLM çağrılarının token kullanımını toplar (usage_metadata ya da llm_output["token_usage"]).
+    """
+
+    def __init__(self):
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.reported = False
+
+    def on_llm_end(self, response, **kwargs):
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    self.input_tokens += usage.get("input_tokens", 0)
+                    self.output_tokens += usage.get("output_tokens", 0)
+                    self.reported = True
+                    return
+        usage = (response.llm_output or {}).get("token_usage")
+        if usage:
+            self.input_tokens += usage.get("prompt_tokens", 0)
+            self.output_tokens += usage.get("completion_tokens", 0)
+            self.reported = True
+
+
+def _key(embedding_name, chat_name, index):
+    return f"{embedding_name}|{chat_name}|{index}"
+
+
+def load_checkpoint(path):
+    """
+    Checkpoint dosyasındaki başarılı sonuçları anahtar -> sonuç olarak döndürür.
+    Yarım yazılmış son satır (kesilen çalışma) atlanır.
+    """
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("error") is None:
+                done[_key(record["embedding_model"], record["chat_model"], record["index"])] = record
+    return done
+
+
+def summarize(results):
+    """
+    (embedding, chat) kombinasyonu başına gecikme ve token kullanımı özeti.
+    """
+    combinations = {}
+    for result in results:
+        combinations.setdefault((result["embedding_model"], result["chat_model"]), []).append(result)
+
+    summary = []
+    for (embedding_name, chat_name), rows in combinations.items():
+        ok = [row for row in rows if row.get("error") is None]
+        latencies = np.array([row["latency"] for row in ok]) if ok else np.array([0.0])
+        with_usage = [row for row in ok if row.get("input_tokens") is not None]
+        summary.append({
+            "embedding_model": embedding_name,
+            "chat_model": chat_name,
+            "questions": len(rows),
+            "errors": len(rows) - len(ok),
+            "latency_mean": round(float(latencies.mean()), 3),
+            "latency_p50": round(float(np.percentile(latencies, 50)), 3),
+            "latency_p95": round(float(np.percentile(latencies, 95)), 3),
+            "input_tokens": sum(row["input_tokens"] for row in with_usage) if with_usage else None,
+            "output_tokens": sum(row["output_tokens"] for row in with_usage) if with_usage else None,
+        })
+    return summary
+
+
+class EvaluationRunner:
+    """
+    Soruları embedding × chat modeli matrisinin her kombinasyonunda çalıştırır.
+
+    - Her embedding modeli için indeks (retriever) bir kez kurulur ve tüm chat modelleri
+      tarafından paylaşılır.
+    - Sorular eşzamanlı çalıştırılır; her chat sağlayıcısının kendi hız ve eşzamanlılık
+      sınırı (AsyncRateLimiter) vardır.
+    - Biten her soru checkpoint dosyasına (JSONL) hemen yazılır; yarıda kalan çalışma
+      aynı dosyayla tekrar başlatılınca yalnızca eksik (ya da hata alan) sorular çalışır.
+
+    build_retriever(embedding_adı) retriever, get_chat_model(chat_adı) chat modeli,
+    build_chain(retriever, chat_model) ainvoke destekleyen QA zinciri döndürür.
+    """
+
+    def __init__(self, build_retriever, get_chat_model, build_chain, checkpoint_path,
+                 rate_limits=None, default_rpm=60, max_concurrency=4):
+        self.build_retriever = build_retriever
+        self.get_chat_model = get_chat_model
+        self.build_chain = build_chain
+        self.checkpoint_path = checkpoint_path
+        self.rate_limits = rate_limits or {}
+        self.default_rpm = default_rpm
+        self.max_concurrency = max_concurrency
+
+    def _limiter(self, chat_name):
+        return AsyncRateLimiter(self.rate_limits.get(chat_name, self.default_rpm), self.max_concurrency)
+
+    async def _ask(self, chain, limiter, embedding_name, chat_name, index, question, checkpoint):
+        usage = UsageCallback()
+        record = {
+            "embedding_model": embedding_name,
+            "chat_model": chat_name,
+            "index": index,
+            "question": question["query"],
+        }
+        async with limiter:
+            start = time.perf_counter()
+            try:
+                response = await chain.ainvoke({"query": question["query"]}, config={"callbacks": [usage]})
+                record.update(response=serialize_response(response), error=None)
+            except Exception as e:
+                logger.warning(f"{embedding_name} + {chat_name}, soru {index} başarısız: {e!r}")
+                record.update(response=None, error=repr(e))
+            record["latency"] = round(time.perf_counter() - start, 3)
+        record["input_tokens"] = usage.input_tokens if usage.reported else None
+        record["output_tokens"] = usage.output_tokens if usage.reported else None
+        checkpoint.write(json.dumps(record, ensure_ascii=False) + "\n")
+        checkpoint.flush()
+        return record
+
+    async def run(self, questions, embedding_names, chat_names):
+        """
+        Tüm kombinasyonları çalıştırır ve (sonuçlar, özet) döndürür; sonuçlar
+        embedding, chat modeli ve soru sırasıyladır.
+        """
+        done = load_checkpoint(self.checkpoint_path)
+        if done:
+            logger.info(f"Checkpoint'ten {len(done)} sonuç yüklendi: {self.checkpoint_path}")
+        directory = os.path.dirname(self.checkpoint_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        limiters = {chat_name: self._limiter(chat_name) for chat_name in chat_names}
+        chat_models = {}
+        tasks = []
+        with open(self.checkpoint_path, "a", encoding="utf-8") as checkpoint:
+            for embedding_name in embedding_names:
+                missing = [
+                    (chat_name, index) for chat_name in chat_names for index in range(len(questions))
+                    if _key(embedding_name, chat_name, index) not in done
+                ]
+                if not missing:
+                    continue
+                # İndeks kurulumu CPU yoğun; event loop'u bloklamasın
+                retriever = await asyncio.to_thread(self.build_retriever, embedding_name)
+                for chat_name in sorted({chat_name for chat_name, _ in missing}, key=chat_names.index):
+                    if chat_name not in chat_models:
+                        chat_models[chat_name] = await asyncio.to_thread(self.get_chat_model, chat_name)
+                    chain = self.build_chain(retriever, chat_models[chat_name])
+                    for missing_chat, index in missing:
+                        if missing_chat == chat_name:
+                            # Sorular hemen başlar; sonraki embedding'in indeksi bu sırada kurulur
+                            tasks.append(asyncio.ensure_future(self._ask(
+                                chain, limiters[chat_name], embedding_name, chat_name, index,
+                                questions[index], checkpoint,
+                            )))
+            records = await asyncio.gather(*tasks)
+
+        by_key = dict(done)
+        by_key.update({_key(r["embedding_model"], r["chat_model"], r["index"]): r for r in records})
+        results = [
+            by_key[_key(embedding_name, chat_name, index)]
+            for embedding_name in embedding_names
+            for chat_name in chat_names
+            for index in range(len(questions))
+            if _key(embedding_name, chat_name, index) in by_key
+        ]
+        return results, summarize(results)
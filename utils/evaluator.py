@@ -1,18 +1,27 @@
 import json
 
+def serialize_document(doc):
+    if isinstance(doc, dict):  # Checkpoint'ten okunan sonuçlar zaten serileştirilmiştir
+        return doc
+    return {
+        "page_content": doc.page_content,  # Belgenin içeriği
+        "metadata": doc.metadata           # Belgeye ait metadata
+    }
+
+def serialize_response(response):
+    """
+    Zincir cevabındaki `source_documents` belgelerini JSON'a yazılabilir hale getirir.
+    """
+    response = dict(response)
+    if "source_documents" in response:
+        response["source_documents"] = [serialize_document(doc) for doc in response["source_documents"]]
+    return response
+
 def evaluate_responses(results, output_path):
-    def serialize_document(doc):
-        return {
-            "page_content": doc.page_content,  # Belgenin içeriği
-            "metadata": doc.metadata           # Belgeye ait metadata
-        }
-    
     # `source_documents` içindeki `Document` nesnelerini serileştirilebilir hale getir
     for result in results:
-        if "source_documents" in result["response"]:
-            result["response"]["source_documents"] = [
-                serialize_document(doc) for doc in result["response"]["source_documents"]
-            ]
+        if result.get("response") is not None:
+            result["response"] = serialize_response(result["response"])
     
     # Sonuçları JSON dosyasına yaz
     with open(output_path, "w", encoding="utf-8") as file:
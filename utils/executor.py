@@ -0,0 +1,58 @@
+import asyncio
+import concurrent.futures
+import functools
+import threading
+
+from config import BLOCKING_WORKERS, BLOCKING_QUEUE_LIMIT
+
+_executor = None
+_executor_lock = threading.Lock()
+# Her event loop için ayrı semafor (asyncio.Semaphore bir loop'a bağlanır)
+_semaphores = {}
+
+
+def get_executor():
+    """
+    Senkron işler için paylaşılan, sınırlı boyutlu ThreadPoolExecutor döndürür.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=BLOCKING_WORKERS, thread_name_prefix="Blocking"
+                )
+    return _executor
+
+
+def _get_semaphore():
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(BLOCKING_QUEUE_LIMIT)
+        _semaphores[loop] = semaphore
+    return semaphore
+
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Senkron bir fonksiyonu event loop'u bloklamadan paylaşılan executor'da çalıştırır.
+    Aynı anda bekleyen iş sayısı BLOCKING_QUEUE_LIMIT ile sınırlıdır.
+    """
+    loop = asyncio.get_running_loop()
+    async with _get_semaphore():
+        return await loop.run_in_executor(
+            get_executor(), functools.partial(func, *args, **kwargs)
+        )
+
+
+def shutdown_executor(wait=True):
+    """
+    Executor'ı kapatır (uygulama kapanırken çağrılır).
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait)
+            _executor = None
+    _semaphores.clear()
@@ -0,0 +1,206 @@
+import logging
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli  # noqa: F401  (requests/urllib3 ve httpx "br" çözümlemesi için gerekli)
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+# Sunucuya bildirilen sıkıştırma yöntemleri; br yalnızca çözülebiliyorsa istenir
+ACCEPT_ENCODING = "gzip, deflate, br" if BROTLI_AVAILABLE else "gzip, deflate"
+
+# Yeniden denenecek HTTP durum kodları
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class RetryPolicy:
+    """
+    Crawler (httpx) ve PooledSession (requests) için ortak yeniden deneme kuralı: 429/5xx
+    cevapları ve bağlantı hataları en fazla max_retries kez, Retry-After'a uyularak ya da
+    full jitter'lı üstel beklemeyle tekrar denenir. Yalnızca GET gibi idempotent istekler için.
+    """
+
+    def __init__(self, max_retries=2, backoff_base=0.5, backoff_max=10.0):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def should_retry(self, attempt, status_code=None):
+        """
+        attempt. denemenin sonucu tekrar denenmeli mi; status_code None ise bağlantı hatası.
+        """
+        return attempt < self.max_retries and (status_code is None or status_code in RETRY_STATUS_CODES)
+
+    def delay(self, attempt, retry_after=None):
+        if retry_after and retry_after.isdigit():
+            return min(self.backoff_max, float(retry_after))
+        # Full jitter: [0, min(max, base * 2^attempt)]
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+
+class HttpMetrics:
+    """
+    Thread-safe istek, yeni bağlantı ve aktarılan bayt sayaçları (host başına ve toplam).
+    wire_bytes ağdan gelen (sıkıştırılmış), content_bytes çözülmüş gövde boyutudur.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self.wire_bytes = 0
+        self.content_bytes = 0
+        self.hosts = {}
+
+    def _host(self, host):
+        return self.hosts.setdefault(host, {"requests": 0, "connections": 0, "wire_bytes": 0})
+
+    def record_connection(self, host):
+        with self._lock:
+            self.connections += 1
+            self._host(host)["connections"] += 1
+
+    def record_response(self, host, wire_bytes, content_bytes):
+        with self._lock:
+            self.requests += 1
+            self.wire_bytes += wire_bytes
+            self.content_bytes += content_bytes
+            entry = self._host(host)
+            entry["requests"] += 1
+            entry["wire_bytes"] += wire_bytes
+
+    @property
+    def reuse_rate(self):
+        """İsteklerin yeni bağlantı açmadan (keep-alive) gönderilme oranı."""
+        if not self.requests:
+            return 0.0
+        return max(0.0, 1 - self.connections / self.requests)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "connections": self.connections,
+                "reuse_rate": round(self.reuse_rate, 3),
+                "wire_bytes": self.wire_bytes,
+                "content_bytes": self.content_bytes,
+                "hosts": {host: dict(entry) for host, entry in self.hosts.items()},
+            }
+
+
+class _CountingAdapter(HTTPAdapter):
+    """Açılan her yeni bağlantıyı HttpMetrics'e bildiren HTTPAdapter."""
+
+    def __init__(self, metrics, **kwargs):
+        self.metrics = metrics
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        metrics = self.metrics
+
+        class CountingHTTPConnectionPool(HTTPConnectionPool):
+            def _new_conn(self):
+                metrics.record_connection(self.host)
+                return super()._new_conn()
+
+        class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+            def _new_conn(self):
+                metrics.record_connection(self.host)
+                return super()._new_conn()
+
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": CountingHTTPConnectionPool,
+            "https": CountingHTTPSConnectionPool,
+        }
+
+
+class PooledSession:
+    """
+    Thread-safe, host başına havuzlanmış senkron requests katmanı.
+
+    Asıl tarama utils.crawler.Crawler üzerinden yapılır; bu sınıf senkron yardımcılar
+    (ör. scraper.get_data_from_page) içindir. Her thread kendi requests.Session'ını
+    (çerezler ve başlıklar thread'e özel) kullanır; tüm session'lar aynı HTTPAdapter'ı
+    paylaşır. Böylece bağlantılar thread'ler arasında host başına tek havuzda tekrar
+    kullanılır. Yeniden denemeler Crawler ile aynı RetryPolicy'ye göre yapılır; metrikler
+    aynı HttpMetrics ile tutulur. gzip/deflate (ve kuruluysa brotli) istenir.
+    """
+
+    def __init__(self, pool_connections=16, pool_maxsize=8, max_retries=3, backoff_factor=0.5,
+                 timeout=20.0, headers=None):
+        self.timeout = timeout
+        self.headers = {"Accept-Encoding": ACCEPT_ENCODING, **(headers or {})}
+        self.metrics = HttpMetrics()
+        self.retry = RetryPolicy(max_retries=max_retries, backoff_base=backoff_factor)
+        self.adapter = _CountingAdapter(
+            self.metrics,
+            # pool_connections: havuzu tutulan host sayısı, pool_maxsize: host başına bağlantı
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+        )
+        self._local = threading.local()
+
+    def session(self):
+        """
+        Bu thread'in session'ı (ilk çağrıda oluşturulur).
+        """
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers.update(self.headers)
+            session.mount("http://", self.adapter)
+            session.mount("https://", self.adapter)
+        return session
+
+    def get(self, url, **kwargs):
+        """
+        GET isteği gönderir; son denemenin cevabı döndürülür (raise_for_status çağıranın
+        işidir). stream=True ile alınan cevaplar okunduktan sonra record_transfer ile
+        bildirilmelidir.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+        while True:
+            response = None
+            try:
+                response = self.session().get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if not self.retry.should_retry(attempt):
+                    raise
+            if response is not None:
+                if not kwargs.get("stream"):
+                    self.record_transfer(response)
+                if not self.retry.should_retry(attempt, response.status_code):
+                    return response
+                response.close()
+            delay = self.retry.delay(attempt, response.headers.get("Retry-After") if response is not None else None)
+            logger.warning(f"{url} {response.status_code if response is not None else 'bağlantı hatası'}, "
+                           f"{delay:.2f} sn sonra tekrar denenecek.")
+            attempt += 1
+            time.sleep(delay)
+
+    def record_transfer(self, response, content_bytes=None):
+        """
+        Cevabın ağdan okunan ve çözülmüş boyutunu metriklere ekler.
+        """
+        content_bytes = len(response.content) if content_bytes is None else content_bytes
+        raw = getattr(response, "raw", None)
+        wire_bytes = raw.tell() if raw is not None and hasattr(raw, "tell") else content_bytes
+        self.metrics.record_response(requests.utils.urlparse(response.url).hostname, wire_bytes, content_bytes)
+
+    def close(self):
+        self.adapter.close()
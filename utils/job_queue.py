@@ -0,0 +1,139 @@
+import asyncio
+import logging
+from collections import OrderedDict, deque
+
+logger = logging.getLogger(__name__)
+
+# submit() dönüş değerleri
+QUEUED = "queued"
+DUPLICATE = "duplicate"
+REJECTED = "rejected"
+
+
+class ChatJobQueue:
+    """
+    Telegram güncellemelerini arka planda işleyen iş kuyruğu.
+
+    - Aynı sohbetin işleri sırayla, farklı sohbetlerin işleri paralel işlenir.
+    - Eşzamanlılık worker sayısı ile sınırlıdır.
+    - Kuyruk dolduğunda yeni işler reddedilir (backpressure).
+    - Aynı update_id ikinci kez gelirse (Telegram yeniden denemesi) yok sayılır.
+    - handler hata fırlatırsa on_error(chat_id, payload, error) çağrılır (ör. kullanıcıya
+      hata mesajı göndermek için).
+    """
+
+    def __init__(self, handler, workers=8, max_pending=1000, max_pending_per_chat=20, dedup_size=10000,
+                 on_error=None):
+        self.handler = handler
+        self.on_error = on_error
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_pending_per_chat = max_pending_per_chat
+        self.dedup_size = dedup_size
+
+        self._pending = {}  # chat_id -> deque(payload)
+        self._pending_count = 0
+        self._ready = asyncio.Queue()  # bekleyen işi olan ve şu an işlenmeyen sohbetler
+        self._seen_updates = OrderedDict()
+        self._tasks = []
+
+    @property
+    def pending_count(self):
+        return self._pending_count
+
+    def start(self):
+        """
+        Worker görevlerini başlatır. Çalışan bir event loop içinden çağrılmalıdır.
+        """
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"ChatJobWorker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self, timeout=None):
+        """
+        Kuyruktaki işlerin bitmesini en fazla timeout saniye bekler, sonra worker'ları durdurur.
+        """
+        if timeout:
+            try:
+                await asyncio.wait_for(self.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Kuyruk {timeout} sn içinde boşalmadı, {self._pending_count} iş iptal ediliyor.")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def join(self):
+        """
+        Kuyruktaki tüm işler tamamlanana kadar bekler.
+        """
+        await self._ready.join()
+
+    def _mark_seen(self, update_id):
+        if update_id is None:
+            return False
+        if update_id in self._seen_updates:
+            self._seen_updates.move_to_end(update_id)
+            return True
+        self._seen_updates[update_id] = None
+        if len(self._seen_updates) > self.dedup_size:
+            self._seen_updates.popitem(last=False)
+        return False
+
+    def submit(self, chat_id, payload, update_id=None):
+        """
+        İşi kuyruğa ekler; QUEUED, DUPLICATE ya da REJECTED döndürür.
+        """
+        if update_id is not None and update_id in self._seen_updates:
+            return DUPLICATE
+
+        chat_jobs = self._pending.get(chat_id)
+        if self._pending_count >= self.max_pending or (
+            chat_jobs is not None and len(chat_jobs) >= self.max_pending_per_chat
+        ):
+            logger.warning(f"Kuyruk dolu, güncelleme reddedildi (chat_id: {chat_id}, update_id: {update_id}).")
+            return REJECTED
+
+        self._mark_seen(update_id)
+        self._pending_count += 1
+        if chat_jobs is None:
+            # Sohbetin işlenmekte olan işi yok, worker'lara bildir
+            self._pending[chat_id] = deque([payload])
+            self._ready.put_nowait(chat_id)
+        else:
+            chat_jobs.append(payload)
+        return QUEUED
+
+    async def _notify_error(self, chat_id, payload, error):
+        if self.on_error is None:
+            return
+        try:
+            await self.on_error(chat_id, payload, error)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Hata bildirimi gönderilemedi (chat_id: {chat_id}): {e}")
+
+    async def _worker(self):
+        while True:
+            chat_id = await self._ready.get()
+            chat_jobs = self._pending[chat_id]
+            payload = chat_jobs.popleft()
+            try:
+                await self.handler(payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"İş işlenirken hata (chat_id: {chat_id}): {e}")
+                await self._notify_error(chat_id, payload, e)
+            finally:
+                self._pending_count -= 1
+                if chat_jobs:
+                    # Aynı sohbetin sıradaki işi, diğer sohbetlerin arkasına eklenir
+                    self._ready.put_nowait(chat_id)
+                else:
+                    del self._pending[chat_id]
+                self._ready.task_done()
@@ -1,6 +1,10 @@
 from langchain_community.document_loaders import PyPDFLoader
+from langchain_core.documents import Document
 import json
 
+# Scraper'ın tarihi bulunamayan sayfalara yazdığı yer tutucu; tarih filtrelerine girmemeli
+PLACEHOLDER_DATE = "1000-01-01"
+
 def load_pdf(pdf_path):
     loader = PyPDFLoader(pdf_path)
     return loader.load()
@@ -8,3 +12,34 @@ def load_pdf(pdf_path):
 def load_questions(json_path):
     with open(json_path, "r") as file:
         return json.load(file)
+
+def page_to_document(page):
+    """
+    Scraper'ın page_contents kaydını, filtrelenebilir metadata ile Document'a çevirir.
+    Parçalar metadata'yı dokümandan devralır; Chroma None kabul etmediği için boş alanlar
+    ve tarihi bulunamamış sayfaların yer tutucu tarihi atlanır.
+    """
+    metadata = {
+        "source": page.get("url") or str(page.get("_id")),
+        "title": page.get("title"),
+        "department": page.get("department"),
+        "faculty": page.get("faculty"),
+        "is_pdf_source": bool(page.get("is_pdf_source", False)),
+    }
+    date = page.get("date")
+    if date:
+        date = date.strftime("%Y-%m-%d") if hasattr(date, "strftime") else str(date)[:10]
+    if date and date != PLACEHOLDER_DATE:
+        metadata["date"] = date
+        # Chroma aralık filtreleri yalnızca sayılarda çalışır
+        metadata["date_int"] = int(date.replace("-", ""))
+    return Document(
+        page_content=page.get("content") or "",
+        metadata={key: value for key, value in metadata.items() if value is not None},
+    )
+
+def load_scraped_pages(collection, query=None):
+    """
+    MongoDB'deki taranmış sayfaları Document listesi olarak yükler.
+    """
+    return [page_to_document(page) for page in collection.find(query or {}) if page.get("content")]
@@ -0,0 +1,112 @@
+import importlib
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def _resolve(factory):
+    """
+    "modul.yolu:fonksiyon" biçimindeki fabrikayı ancak çağrılacağı an import eder.
+    """
+    if callable(factory):
+        return factory
+    module_name, _, attr = factory.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+class ModelRegistry:
+    """
+    Embedding/chat modelleri gibi pahalı nesneleri ilk kullanımda, süreç başına
+    bir kez oluşturur ve paylaşır.
+
+    - Fabrika bir fonksiyon ya da "modul:fonksiyon" metni olabilir; metin verilirse
+      modül de ilk kullanımda import edilir.
+    - Aynı ada eş zamanlı gelen çağrılardan yalnızca biri nesneyi oluşturur, diğerleri bekler.
+    - Oluşturma hata verirse sonuç saklanmaz; sonraki çağrı yeniden dener.
+    - Yükleme süreleri report() ile alınabilir.
+    """
+
+    def __init__(self):
+        self._factories = {}
+        self._instances = {}
+        self._locks = {}
+        self._timings = {}
+        self._errors = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, factory):
+        with self._lock:
+            self._factories[name] = factory
+            self._locks.setdefault(name, threading.Lock())
+            self._instances.pop(name, None)
+            self._timings.pop(name, None)
+
+    def names(self):
+        return list(self._factories)
+
+    def is_loaded(self, name):
+        return name in self._instances
+
+    def get(self, name):
+        """
+        Nesneyi döndürür; henüz oluşturulmamışsa oluşturur.
+        """
+        # Yüklenmiş nesneler kilitsiz döner
+        if name in self._instances:
+            return self._instances[name]
+        if name not in self._factories:
+            raise KeyError(f"Kayıtlı olmayan model: {name}")
+
+        with self._locks[name]:
+            if name in self._instances:
+                return self._instances[name]
+
+            start = time.perf_counter()
+            try:
+                instance = _resolve(self._factories[name])()
+            except Exception as e:
+                self._errors[name] = str(e)
+                logger.exception(f"{name} yüklenemedi.")
+                raise
+            elapsed = time.perf_counter() - start
+
+            self._timings[name] = elapsed
+            self._errors.pop(name, None)
+            self._instances[name] = instance
+            logger.info(f"{name} {elapsed:.2f} sn'de yüklendi.")
+            return instance
+
+    def warm_up(self, names=None):
+        """
+        Verilen (varsayılan: tüm) modelleri önceden yükler. Hatalar loglanır, yükleme durmaz.
+        """
+        for name in names or self.names():
+            try:
+                self.get(name)
+            except Exception:
+                pass
+        return self.report()
+
+    def report(self):
+        """
+        Model başına yüklenme durumu ve süresi.
+        """
+        return {
+            name: {
+                "loaded": name in self._instances,
+                "seconds": round(self._timings[name], 3) if name in self._timings else None,
+                **({"error": self._errors[name]} if name in self._errors else {}),
+            }
+            for name in self._factories
+        }
+
+    def clear(self):
+        """
+        Oluşturulmuş nesneleri bırakır (testler ve yeniden yükleme için).
+        """
+        with self._lock:
+            self._instances.clear()
+            self._timings.clear()
+            self._errors.clear()
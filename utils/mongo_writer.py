@@ -0,0 +1,139 @@
+import logging
+import threading
+import time
+
+from pymongo.errors import BulkWriteError, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+
+class BulkWriter:
+    """
+    MongoDB için write-behind tamponu.
+
+    Yazma işlemleri (UpdateOne, InsertOne, ...) koleksiyon başına biriktirilir; bir koleksiyonda
+    max_batch işlem birikince ya da arka plan thread'inde flush_interval saniye dolunca
+    sırasız (ordered=False) bulk_write ile yazılır. Her flush'ta koleksiyonlar order'daki
+    sırayla, diğerleri ilk eklenme sırasıyla yazılır (ör. sayfalar, tarama durumundan önce).
+    Hatalar loglanır ve sayılır; çağıran taraf beklemez. Thread-safe'tir.
+
+    add()'e key (ör. sayfa URL'si) verilirse, o key'in bir koleksiyondaki yazımı başarısız
+    olduğunda sıralamada sonra gelen koleksiyonlardaki aynı key'li işlemler (bu ya da sonraki
+    flush'larda) yazılmaz; ör. kaydedilemeyen sayfanın tarama durumu "görüldü" olarak işaretlenmez.
+    """
+
+    def __init__(self, db, max_batch=500, flush_interval=2.0, order=()):
+        self.db = db
+        self.order = list(order)
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.stats = {"operations": 0, "written": 0, "batches": 0, "errors": 0, "skipped": 0, "seconds": 0.0}
+        self._buffers = {}
+        # Yazımı başarısız olan key -> koleksiyonun order'daki sırası
+        self._failed = {}
+        self._lock = threading.Lock()
+        # Flush'lar sırayla yapılır; aynı dokümana ait işlemler batch'ler arasında yer değiştirmez
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Süre dolunca tamponu boşaltan arka plan thread'ini başlatır.
+        """
+        if self._thread is None and self.flush_interval:
+            self._thread = threading.Thread(target=self._run, name="BulkWriter", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def add(self, collection_name, operation, key=None):
+        """
+        İşlemi tampona ekler; koleksiyonun tamponu dolduysa tüm tamponu hemen yazar.
+        """
+        with self._lock:
+            if collection_name not in self.order:
+                self.order.append(collection_name)
+            buffer = self._buffers.setdefault(collection_name, [])
+            buffer.append((operation, key))
+            self.stats["operations"] += 1
+            full = len(buffer) >= self.max_batch
+        if full:
+            self.flush()
+
+    def pending(self):
+        with self._lock:
+            return sum(len(buffer) for buffer in self._buffers.values())
+
+    def flush(self):
+        """
+        Tamponu yazar; yazılan işlem sayısını döndürür.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batches = [(name, self._buffers.pop(name)) for name in self.order if name in self._buffers]
+            written = 0
+            for name, operations in batches:
+                operations = self._without_failed(name, operations)
+                for start in range(0, len(operations), self.max_batch):
+                    written += self._write(name, operations[start:start + self.max_batch])
+            return written
+
+    def _without_failed(self, collection_name, operations):
+        # Önceki bir koleksiyonda yazılamayan key'lerin işlemleri atlanır
+        if not self._failed:
+            return operations
+        rank = self.order.index(collection_name)
+        kept = [(op, key) for op, key in operations if key is None or self._failed.get(key, rank) >= rank]
+        skipped = len(operations) - len(kept)
+        if skipped:
+            self.stats["skipped"] += skipped
+            logger.warning(f"{collection_name}: önceki yazımı başarısız olan {skipped} işlem atlandı.")
+        return kept
+
+    def _write(self, collection_name, operations):
+        if not operations:
+            return 0
+        failed = set()
+        start = time.perf_counter()
+        try:
+            result = self.db[collection_name].bulk_write([op for op, _ in operations], ordered=False)
+            written = result.upserted_count + result.matched_count + result.inserted_count + result.deleted_count
+        except BulkWriteError as bwe:
+            details = bwe.details
+            written = details.get("nUpserted", 0) + details.get("nMatched", 0) + details.get("nInserted", 0)
+            errors = details.get("writeErrors", [])
+            failed = {operations[error["index"]][1] for error in errors if "index" in error}
+            self.stats["errors"] += len(errors)
+            logger.error(f"{collection_name} toplu yazma hatası: {errors[:3]}")
+        except PyMongoError as e:
+            written = 0
+            failed = {key for _, key in operations}
+            self.stats["errors"] += len(operations)
+            logger.error(f"{collection_name} koleksiyonuna {len(operations)} işlem yazılamadı: {e}")
+        rank = self.order.index(collection_name)
+        for _, key in operations:
+            # Aynı koleksiyona sonradan başarıyla yazılan key tekrar serbest kalır
+            if key is not None and key not in failed and self._failed.get(key) == rank:
+                del self._failed[key]
+        for key in failed:
+            if key is not None:
+                self._failed[key] = min(rank, self._failed.get(key, rank))
+        self.stats["seconds"] += time.perf_counter() - start
+        self.stats["batches"] += 1
+        self.stats["written"] += written
+        return written
+
+    def close(self):
+        """
+        Arka plan thread'ini durdurur ve kalan işlemleri yazar.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        logger.info(f"BulkWriter kapatıldı: {self.stats}")
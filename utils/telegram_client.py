@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import os
+import random
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401  (httpx HTTP/2 desteği için gerekli)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Yeniden denenecek HTTP durum kodları
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# İstek sunucuya ulaşmadan oluşan hatalar; idempotent olmayan istekler yalnızca bunlarda tekrarlanır
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class FileTooLargeError(Exception):
+    """İndirilen dosya izin verilen boyutu aştığında fırlatılır."""
+
+    def __init__(self, size, max_bytes):
+        self.size = size
+        self.max_bytes = max_bytes
+        super().__init__(
+            f"Dosya çok büyük ({size / 1024 / 1024:.1f} MB), en fazla {max_bytes / 1024 / 1024:.1f} MB yüklenebilir."
+        )
+
+
+class TelegramClient:
+    """
+    Uygulama ömrü boyunca tek bir httpx.AsyncClient kullanan Telegram Bot API istemcisi.
+    Bağlantılar keep-alive ile havuzlanır, mümkünse HTTP/2 kullanılır ve geçici
+    hatalar jitter'lı üstel bekleme ile yeniden denenir (idempotent olmayan istekler
+    yalnızca gönderilmedikleri kesinse; bkz. request).
+    """
+
+    def __init__(self, token, api_base="https://api.telegram.org", max_connections=20,
+                 connect_timeout=5.0, read_timeout=30.0, max_retries=3, backoff_base=0.5,
+                 backoff_max=10.0, transport=None):
+        self.token = token
+        self.api_base = api_base.rstrip("/")
+        self.max_connections = max_connections
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.transport = transport
+        self._client = None
+
+    @property
+    def api_url(self):
+        return f"{self.api_base}/bot{self.token}"
+
+    @property
+    def file_url(self):
+        return f"{self.api_base}/file/bot{self.token}"
+
+    async def start(self):
+        """
+        Paylaşılan istemciyi oluşturur (FastAPI lifespan başlangıcında çağrılır).
+        """
+        if self._client is not None:
+            return
+        self._client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE and self.transport is None,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=60.0,
+            ),
+            timeout=httpx.Timeout(
+                self.read_timeout, connect=self.connect_timeout, pool=self.connect_timeout
+            ),
+            transport=self.transport,
+        )
+        logger.info(f"Telegram istemcisi başlatıldı (HTTP/2: {HTTP2_AVAILABLE}, en fazla {self.max_connections} bağlantı).")
+
+    async def close(self):
+        """
+        Havuzdaki bağlantıları kapatır (FastAPI lifespan bitişinde çağrılır).
+        """
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            raise RuntimeError("TelegramClient başlatılmadı; önce start() çağrılmalı.")
+        return self._client
+
+    def _backoff(self, attempt, response=None):
+        # Telegram 429 cevabında beklenecek süreyi parameters.retry_after ile bildirir
+        if response is not None and response.status_code == 429:
+            try:
+                retry_after = response.json().get("parameters", {}).get("retry_after")
+                if retry_after:
+                    return float(retry_after)
+            except ValueError:
+                pass
+        # Full jitter: [0, min(max, base * 2^attempt)]
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def request(self, method, url, idempotent=None, **kwargs):
+        """
+        İsteği gönderir; bağlantı hatalarında ve 429/5xx cevaplarında yeniden dener.
+
+        idempotent olmayan istekler (varsayılan: GET/HEAD dışındakiler, ör. sendMessage)
+        yalnızca sunucuya hiç ulaşmadıkları kesin olan bağlantı kurma hatalarında ve
+        Telegram'ın isteği işlemeden reddettiği 429'da tekrarlanır. Okuma zaman aşımı ya da
+        5xx'te istek işlenmiş olabilir; tekrarlamak mesajı ikinci kez gönderir.
+        """
+        if idempotent is None:
+            idempotent = method.upper() in ("GET", "HEAD")
+        retry_status_codes = RETRY_STATUS_CODES if idempotent else {429}
+        attempt = 0
+        while True:
+            try:
+                response = await self.client.request(method, url, **kwargs)
+                if response.status_code not in retry_status_codes or attempt >= self.max_retries:
+                    response.raise_for_status()
+                    return response
+                delay = self._backoff(attempt, response)
+                logger.warning(f"Telegram {response.status_code} döndü, {delay:.2f} sn sonra tekrar denenecek.")
+            except httpx.TransportError as e:
+                if attempt >= self.max_retries or not (idempotent or isinstance(e, NOT_SENT_ERRORS)):
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"Telegram bağlantı hatası ({e!r}), {delay:.2f} sn sonra tekrar denenecek.")
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def send_message(self, chat_id, text):
+        response = await self.request(
+            "POST", f"{self.api_url}/sendMessage", json={"chat_id": chat_id, "text": text}
+        )
+        return response.json()
+
+    async def edit_message_text(self, chat_id, message_id, text):
+        response = await self.request(
+            "POST",
+            f"{self.api_url}/editMessageText",
+            json={"chat_id": chat_id, "message_id": message_id, "text": text},
+        )
+        return response.json()
+
+    async def get_file(self, file_id):
+        """
+        getFile ile dosya bilgisini (file_path, file_size) döndürür.
+        """
+        response = await self.request("GET", f"{self.api_url}/getFile", params={"file_id": file_id})
+        return response.json()["result"]
+
+    async def download_file(self, file_path_tg, destination, max_bytes=None, chunk_size=64 * 1024):
+        """
+        Dosyayı parça parça doğrudan diske yazar; dosyanın tamamı bellekte tutulmaz.
+        max_bytes aşılırsa indirme kesilir, yarım dosya silinir ve FileTooLargeError fırlatılır.
+        Yazılan bayt sayısını döndürür.
+        """
+        written = 0
+        try:
+            async with self.client.stream("GET", f"{self.file_url}/{file_path_tg}") as response:
+                response.raise_for_status()
+                content_length = response.headers.get("Content-Length")
+                if max_bytes and content_length and int(content_length) > max_bytes:
+                    raise FileTooLargeError(int(content_length), max_bytes)
+
+                with open(destination, "wb") as file:
+                    async for chunk in response.aiter_bytes(chunk_size):
+                        written += len(chunk)
+                        if max_bytes and written > max_bytes:
+                            raise FileTooLargeError(written, max_bytes)
+                        file.write(chunk)
+        except BaseException:
+            if os.path.exists(destination):
+                os.remove(destination)
+            raise
+        return written
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+
+import httpx
+from langchain_core.callbacks import AsyncCallbackHandler
+
+logger = logging.getLogger(__name__)
+
+# Telegram mesaj uzunluğu sınırı (karakter)
+MAX_MESSAGE_LENGTH = 4096
+
+
+class MessageStreamer:
+    """
+    LLM token'larını tek bir Telegram mesajına kademeli olarak yazar.
+
+    - İlk token'lar gelince sendMessage ile mesaj açılır, sonrası editMessageText ile güncellenir.
+    - Düzenlemeler arasında en az min_interval saniye beklenir; bu sürede gelen token'lar
+      tek düzenlemede birleşir (Telegram sohbet başına saniyede ~1 mesaj sınırı uygular).
+    - Metin değişmediyse düzenleme gönderilmez ("message is not modified" hatası alınmaz).
+    - Ara düzenlemelerdeki hatalar cevabı bozmaz; finish() son metni her durumda yazar.
+    """
+
+    def __init__(self, telegram, chat_id, min_interval=1.0, max_length=MAX_MESSAGE_LENGTH):
+        self.telegram = telegram
+        self.chat_id = chat_id
+        self.min_interval = min_interval
+        self.max_length = max_length
+
+        self.text = ""
+        self.message_id = None
+        self.edits = 0
+        self._sent = ""
+        self._last_sent_at = None
+        self._changed = asyncio.Event()
+        self._done = False
+        self._task = None
+        self._send_lock = asyncio.Lock()
+        # Senkron LLM'ler token'ları başka thread'den bildirir; ekleme bu loop'ta yapılır
+        self._loop = asyncio.get_running_loop()
+
+    def append(self, token):
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is not self._loop:
+            self._loop.call_soon_threadsafe(self._append, token)
+        else:
+            self._append(token)
+
+    def _append(self, token):
+        self.text += token
+        self._changed.set()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _wait_interval(self):
+        if self._last_sent_at is None:
+            return
+        delay = self._last_sent_at + self.min_interval - asyncio.get_running_loop().time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _flush(self, text):
+        text = text[:self.max_length]
+        async with self._send_lock:
+            if not text.strip() or text == self._sent:
+                return
+            if self.message_id is None:
+                result = await self.telegram.send_message(self.chat_id, text)
+                self.message_id = result["result"]["message_id"]
+            else:
+                await self.telegram.edit_message_text(self.chat_id, self.message_id, text)
+                self.edits += 1
+            self._sent = text
+            self._last_sent_at = asyncio.get_running_loop().time()
+
+    async def _run(self):
+        while not self._done:
+            await self._changed.wait()
+            await self._wait_interval()
+            self._changed.clear()
+            if self._done:
+                return
+            try:
+                await self._flush(self.text)
+            except (httpx.HTTPError, KeyError) as e:
+                logger.warning(f"Akış düzenlemesi gönderilemedi (chat {self.chat_id}): {e!r}")
+
+    async def finish(self, text=None):
+        """
+        Akışı durdurur ve mesajı son metinle (verilmezse biriken token'larla) günceller.
+        """
+        self._done = True
+        self._changed.set()
+        if self._task is not None:
+            await self._task
+        await self._wait_interval()
+        await self._flush(self.text if text is None else text)
+
+    async def cancel(self):
+        """
+        Hata durumunda arka plandaki düzenleme görevini durdurur.
+        """
+        self._done = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    @property
+    def callback(self):
+        return StreamingCallbackHandler(self)
+
+
+class StreamingCallbackHandler(AsyncCallbackHandler):
+    """
+    Chat modelinin ürettiği token'ları MessageStreamer'a iletir.
+    """
+
+    # Token'lar sırayla, LLM çağrısının loop'unda işlenir
+    run_inline = True
+
+    def __init__(self, streamer):
+        self.streamer = streamer
+
+    async def on_llm_new_token(self, token, **kwargs):
+        self.streamer.append(token)